@@ -24,6 +24,17 @@ ANTHROPIC_API_KEY = get_env_var("KEY", "")
 # Qwen VL Series API (Aliyun Bailian)
 QWEN_API_KEY = get_env_var("KEY", "")
 
+# Google Gemini API
+GOOGLE_API_KEY = get_env_var("GOOGLE_API_KEY", "")
+
+# Yi API (01.AI)
+YI_API_KEY = get_env_var("YI_API_KEY", "")
+
+# Baidu Qianfan API
+QIANFAN_ACCESS_KEY = get_env_var("QIANFAN_ACCESS_KEY", "")
+QIANFAN_SECRET_KEY = get_env_var("QIANFAN_SECRET_KEY", "")
+APPBUILDER_TOKEN = get_env_var("APPBUILDER_TOKEN", "")
+
 
 # Default LLM to use (can be changed at runtime)
 # Options: openai, claude, gemini, yi, qianfan
@@ -34,10 +45,23 @@ DEFAULT_VISION_MODEL = get_env_var(
 # ==================== Robot Configuration ====================
 
 ROBOT_CONFIG = {
+    "port": "/dev/ttyAMA0",     # Serial port of the arm
+    "baudrate": 1000000,        # Serial baud rate
+    "command_timeout": 5.0,     # Seconds to wait for a command response
+    # Arm backend: "auto" (hardware if available), "hardware" or "sim"
+    "backend": get_env_var("ROBOT_BACKEND", "auto"),
+    "sim_realtime": False,      # Simulator follows the wall clock instead of virtual time
+    "sim_serial_latency": 0.0,  # Simulated serial round trip per command (seconds)
     "safe_height": 220,         # Safe height for arm movement
     "default_speed": 40,        # Default movement speed
     "coordinate_speed": 20,     # Speed for coordinate-based movement
-    "default_gripper_angle": 90  # Default gripper angle
+    "max_linear_speed": 200,    # Tool speed at speed setting 100 (mm/s)
+    "settle_time": 0.3,         # Extra wait after a coordinate move settles (seconds)
+    "default_gripper_angle": 90,  # Default gripper angle
+    "state_poll_rate": 10,      # Background joint/coordinate polling rate (Hz)
+    "state_max_age": 2.0,       # Age bound of a cached state read of a still arm (seconds)
+    "state_still_tolerance": 0.5,  # Change between reads counted as standing still (deg / mm)
+    "control_rate": 20          # Setpoint rate for streamed trajectories (Hz)
 }
 
 # ==================== System Paths ====================
@@ -56,5 +80,89 @@ AUDIO_CONFIG = {
     "sample_rate": 16000,      # Audio sample rate
     "quiet_threshold": 700,    # Threshold for silence detection
     "channels": 1,             # Audio channels
-    "chunk_size": 1024         # Audio chunk size
+    "chunk_size": 1024,        # Audio chunk size
+    "vad_frame_ms": 20,        # Frame length for voice activity detection (ms)
+    "pre_roll": 0.3,           # Audio kept from before speech starts (seconds)
+    "trailing_silence": 0.8,   # Silence that ends an utterance (seconds)
+    "speech_timeout": 5.0,     # Give up if no speech starts within this time (seconds)
+    "segment_pause": 0.4       # Pause that lets streaming recognition close a segment (seconds)
+}
+
+TTS_CONFIG = {
+    "cache_dir": "temp/tts_cache/",  # On-disk store of synthesized speech
+    "cache_max_mb": 50,        # Size cap of the on-disk store
+    "memory_items": 32,        # Decoded phrases kept in memory
+    "decode_rate": 24000,      # Sample rate MP3 speech is decoded to (gTTS native rate)
+    "synthesis_workers": 3,    # Phrases synthesized in parallel while a reply is spoken
+    "max_unit_chars": 80,      # Sentences longer than this are split at commas
+    "min_unit_chars": 20,      # Shorter phrases are joined to the next one
+    # Fixed phrases synthesized at startup so their first use is a cache hit
+    "prewarm_phrases": [
+        "Home sweet home, back to the beginning",
+        "I couldn't understand what was said. Please try again.",
+        "Sorry, the speech recognition service is unavailable at the moment."
+    ]
+}
+
+# ==================== Teaching Configuration ====================
+
+TEACHING_CONFIG = {
+    "sample_rate": 30,         # Demonstration sampling rate (Hz)
+    "max_duration": 300,       # Longest demonstration (seconds)
+    "chunk_samples": 32,       # Samples buffered before they are written to disk
+    "sync_interval": 1.0,      # Seconds between fsyncs of a demonstration being recorded
+    "replay_speed": 80,        # Speed argument for replayed setpoints
+    # Largest deviation per joint allowed when simplifying recordings (degrees)
+    "simplify_tolerance": [0.5, 0.5, 0.5, 1.0, 1.0, 1.0],
+    "keep_raw": True           # Keep the unsimplified recording next to the simplified one
+}
+
+# ==================== Telemetry Configuration ====================
+
+TELEMETRY_CONFIG = {
+    "enabled": False,          # Record arm telemetry whenever a robot is connected
+    "capacity": 6000,          # Ring buffer size in samples (10 minutes at the 10 Hz state poll)
+    "flush_chunk": 200,        # Samples appended to disk at a time
+    "directory": "temp/telemetry/",  # One session subdirectory per run
+    "keep_sessions": 10        # Newest sessions kept on disk
+}
+
+# ==================== Camera Configuration ====================
+
+CAMERA_CONFIG = {
+    # Approximate affine map from image coordinates [u, v, 1] returned by the
+    # vision model to robot [X, Y] (mm) at the overhead viewing position,
+    # used until a calibration has been fitted from markers
+    "pixel_to_robot": [[0.0, -0.25, 325.0],
+                       [-0.25, 0.0, 125.0]],
+    # Approximate camera center in robot coordinates at the overhead viewing
+    # position (mm); refined by calibration when raised markers are used
+    "camera_position": [265.0, 45.0, 400.0],
+    "calibration_file": "assets/camera_calibration.json",  # Saved calibration
+    "table_height": 0,         # Robot Z of the table surface (mm)
+    "object_height": 20        # Assumed height of objects above the table (mm)
+}
+
+# ==================== Workspace Configuration ====================
+
+WORKSPACE_CONFIG = {
+    # Occupancy grid extent in robot coordinates, (min, max) per axis (mm)
+    "bounds": ((-300, 300), (-300, 300), (0, 300)),
+    "resolution": 10,          # Voxel edge length (mm)
+    # Assumed height of unmapped items on the table; transits never go lower,
+    # so mapped obstacles only matter above it (mm)
+    "clutter_height": 40,
+    "clearance": 30,           # Vertical margin kept above obstacles (mm)
+    "tool_radius": 30,         # Horizontal margin around the tool path (mm)
+    "object_size": 40,         # Footprint of a detected object (mm)
+    "tool_orientation": [180, 0, 0],  # Suction cup pointing down [rx, ry, rz] (deg)
+    # Precomputed IK grid for the tool-down orientation
+    "ik_table_file": "assets/ik_table.npy",
+    "ik_table_heights": [30, 40, 50, 70, 90, 120, 150, 180, 220],  # Grid heights (mm)
+    "ik_table_step": 10,       # XY grid spacing (mm)
+    "ik_table_reach": 280,     # Grid covers |X|, |Y| up to this distance (mm)
+    "ik_table_anchor": [200, 0],  # Cell the grid is solved outward from (mm)
+    # Largest joint difference between the arm and the first table setpoint
+    # before a move is streamed; larger means another IK branch (degrees)
+    "ik_table_max_jump": 5.0
 }
@@ -5,80 +5,145 @@
 from agent.agent_coordinator import coordinate_actions
 from models.llm_interface import SYSTEM_PROMPT
 from action.actuators import pump_off
-from action.robot_control import back_to_zero, check_camera
-from perception.speech import record, speech_recognition, play_wav, tts
+from action.execution import Console, MotionCancelled, set_console
+from action.robot_control import back_to_zero, check_camera, preempt_motion, resume_motion
+from action.teaching import replay_closest_teaching, teaching_mode
+from perception.speech import get_tts_cache, listen, play_wav, prewarm_tts, speak, stop_playback
 import os
 import sys
 import time
+import threading
 
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 
+def execute_plan(action_plan, message_history):
+    """
+    Speak the response and run the planned actions (runs on a worker thread).
+    
+    Args:
+        action_plan: Plan with 'function' and 'response' from the agent
+        message_history: Conversation history to record the outcome in
+    """
+    try:
+        response = action_plan['response']
+        print('Synthesizing speech...')
+        # Speak while the actions run
+        speak(response)
+
+        additional_output = ''
+        for action in action_plan['function']:
+            print('Executing action:', action)
+            result = eval(action)
+            if result is not None:
+                additional_output = result
+
+        action_plan['response'] += '. ' + additional_output
+        message_history.append(
+            {"role": "assistant", "content": str(action_plan)})
+
+        back_to_zero()
+
+    except MotionCancelled as e:
+        print(f"Action plan preempted: {e}")
+        action_plan['response'] += '. (interrupted before completion)'
+        message_history.append(
+            {"role": "assistant", "content": str(action_plan)})
+    except Exception as e:
+        print(f"Error executing action plan: {e}")
+
+
 def main():
     """
     Main function that orchestrates the embodied agent's perception-action cycle.
+    
+    Action plans run on a worker thread. Typing while a plan runs preempts it:
+    's' just stops the arm, a menu choice starts the next instruction as at
+    the prompt, and any other text is itself the next instruction.
     """
     print('\nEmbodied Agent: Listen, See, Act - Multimodal Robotic Control')
     print('Copyright (c) 2025 Zihao Mu, Tongji University\n')
 
     pump_off()
-    play_wav('assets/audio/welcome.wav')
+    play_wav('assets/audio/welcome.wav', wait=False)
+    # Synthesize the fixed phrases while the arm homes
+    threading.Thread(target=prewarm_tts, name="tts-prewarm", daemon=True).start()
 
     message_history = []
     message_history.append({"role": "system", "content": SYSTEM_PROMPT})
 
-    try:
-        while True:
+    # The console owns stdin so input can arrive while a plan is running
+    console = Console()
+    set_console(console)
+    plan_thread = None
 
-            back_to_zero()
+    try:
+        back_to_zero()
 
-            instruction_input = input(
-                'Start recording? Enter duration in seconds, k for keyboard input, c for default: ')
+        while True:
 
-            if str.isnumeric(instruction_input):
-                duration = int(instruction_input)
-                record(duration=duration)
-                instruction = speech_recognition()
+            if plan_thread is not None and plan_thread.is_alive():
+                instruction_input = console.read_line(timeout=0.1)
+                if instruction_input is None or not instruction_input.strip():
+                    continue
+
+                # Any input preempts the running plan
+                stop_only = instruction_input.strip() == 's'
+                stop_playback()
+                stats = preempt_motion('stop' if stop_only else 'new instruction')
+                plan_thread.join()
+                if stats['abort_latency'] is not None:
+                    print(f"Plan aborted {stats['abort_latency'] * 1000:.1f} ms after the request")
+                if stop_only:
+                    continue
+                interrupted = True
+            else:
+                plan_thread = None
+                instruction_input = console.read_line(
+                    'Start recording? Enter duration in seconds, k for keyboard input, c for default: ')
+                interrupted = False
+
+            choice = instruction_input.strip()
+            if str.isnumeric(choice):
+                duration = int(choice)
+                instruction = listen(duration=duration)
                 print(f"Recognized instruction: {instruction}")
-            elif instruction_input == 'k':
-                instruction = input('Please enter your instruction: ')
-            elif instruction_input == 'c':
+            elif choice == 'k':
+                instruction = console.read_line('Please enter your instruction: ')
+            elif choice == 'c':
                 instruction = 'First return to zero, then shake head, and put the green block on the basketball'
+            elif interrupted:
+                # A command typed over a running plan is the next instruction itself
+                instruction = choice
             else:
-                print('No valid instruction provided, exiting')
-                raise ValueError('No instruction provided')
+                print('No valid option, please try again')
+                continue
 
             message_history.append({"role": "user", "content": instruction})
             action_plan = coordinate_actions(message_history)
 
             print('Action plan generated:', action_plan)
 
-            try:
-                response = action_plan['response']
-                print('Synthesizing speech...')
-                tts(response)
-                play_wav('temp/tts.wav')
-
-                additional_output = ''
-                for action in action_plan['function']:
-                    print('Executing action:', action)
-                    result = eval(action)
-                    if result is not None:
-                        additional_output = result
-
-                action_plan['response'] += '. ' + additional_output
-                message_history.append(
-                    {"role": "assistant", "content": str(action_plan)})
-
-            except Exception as e:
-                print(f"Error executing action plan: {e}")
+            # Clear any previous preemption before running the new plan
+            resume_motion()
+            plan_thread = threading.Thread(
+                target=execute_plan, args=(action_plan, message_history), daemon=True)
+            plan_thread.start()
+            print("Running plan - type s to stop, or enter a new command to interrupt")
 
     except KeyboardInterrupt:
+        if plan_thread is not None and plan_thread.is_alive():
+            preempt_motion('stop')
         print("\nProgram terminated by user")
+    except EOFError:
+        print("\nInput closed, exiting")
     except Exception as e:
         print(f"Error: {e}")
-
+    finally:
+        stats = get_tts_cache().stats()
+        print(f"Speech cache: {stats['hit_rate']:.0%} hit rate "
+              f"({stats['memory_hits']} memory, {stats['disk_hits']} disk, {stats['misses']} misses)")
 
 if __name__ == '__main__':
     main()
@@ -10,6 +10,8 @@ import time
 import os
 from typing import Optional, Tuple
 
+from action.execution import get_context
+
 # Assuming hardware control is available
 try:
     from pymycobot.mycobot import MyCobot
@@ -57,6 +59,9 @@ def pump_on() -> None:
     """
     Turn on the vacuum pump for object grasping.
     """
+    # Never start grasping once the plan has been preempted
+    get_context().check()
+    
     if not HARDWARE_AVAILABLE:
         print("[SIM] Vacuum pump activated")
         return
@@ -181,11 +186,11 @@ def flash_led(color: Tuple[int, int, int], times: int = 3, interval: float = 0.3
         for _ in range(times):
             # Turn on with specified color
             set_led_rgb(color[0], color[1], color[2])
-            time.sleep(interval)
+            get_context().sleep(interval)
             
             # Turn off
             turn_off_leds()
-            time.sleep(interval)
+            get_context().sleep(interval)
             
         print(f"LED flashed {times} times.")
     except Exception as e:
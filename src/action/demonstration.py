@@ -0,0 +1,249 @@
+"""
+Demonstration Capture Module for Embodied Agent
+
+This module records manual demonstrations for teaching mode. A dedicated
+thread samples the joint angles at a fixed rate against absolute deadlines
+on the robot's clock, so the serial round trip does not stretch the sampling
+period and replay follows the timing of the arm (simulated or real). Samples are
+collected in a small fixed-size chunk that is handed to a writer thread and
+appended to a trajectory file when full, so memory use does not grow with
+the length of the demonstration and a crash loses at most the last second.
+
+"""
+
+import math
+import queue
+import threading
+import numpy as np
+from typing import Callable, Dict, Optional, Tuple
+
+# Import system configuration
+from config import TEACHING_CONFIG
+from action.simulator import SystemClock
+from action.trajectory_store import TrajectoryWriter, read_trajectory
+
+
+class DemonstrationRecorder:
+    """
+    Samples joint angles on a background thread between start() and stop().
+
+    Args:
+        robot: Robot connection (must expose get_angles; samples are timed on
+            its clock when it has one)
+        rate: Sampling rate in Hz
+        max_duration: Longest recording in seconds
+        path: Trajectory file to stream the samples to; None keeps them in memory
+        chunk: Samples buffered before they are handed to the writer
+        on_reading: Called with each joint reading (as angles, latency=seconds),
+            e.g. RobotStateCache.record_angles while the cache's polling is paused
+    """
+
+    def __init__(self, robot, rate: float = None, max_duration: float = None,
+                 path: Optional[str] = None, chunk: int = None, on_reading: Optional[Callable] = None):
+        self.robot = robot
+        self.clock = getattr(robot, "clock", None) or SystemClock()
+        self.on_reading = on_reading
+        self.rate = rate or TEACHING_CONFIG["sample_rate"]
+        self.max_duration = max_duration or TEACHING_CONFIG["max_duration"]
+        self.path = path
+        self.chunk = chunk or TEACHING_CONFIG["chunk_samples"]
+        self.max_samples = int(math.ceil(self.rate * self.max_duration)) + 1
+
+        self._times = np.zeros(self.chunk)
+        self._angles = np.zeros((self.chunk, 6), dtype=np.float32)
+        self._fill = 0
+        self._chunks = []   # Handed-off chunks when recording to memory
+        self.count = 0
+        self.missed = 0     # Ticks skipped because a read overran its period
+
+        # Running timing statistics, so nothing has to be kept per sample
+        self._last_time = 0.0
+        self._dt_sum = 0.0
+        self._dt_square_sum = 0.0
+        self._dt_deviation_max = 0.0
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Start recording (no-op if already running).
+        """
+        if self.running:
+            return
+        self.count = 0
+        self.missed = 0
+        self._fill = 0
+        self._chunks = []
+        self._last_time = self._dt_sum = self._dt_square_sum = self._dt_deviation_max = 0.0
+        self._latency_sum = self._latency_max = 0.0
+
+        if self.path:
+            self._writer = TrajectoryWriter(self.path, self.rate, TEACHING_CONFIG["sync_interval"])
+            self._writer_thread = threading.Thread(target=self._write_loop, name="demonstration-writer",
+                                                   daemon=True)
+            self._writer_thread.start()
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._record_loop, name="demonstration", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> int:
+        """
+        Stop recording and complete the trajectory file.
+
+        Waits for the recording thread to exit even if a joint read is slow,
+        so its last samples are handed off before the file is closed.
+
+        Args:
+            timeout: Time to wait before reporting that a slow read delays the stop
+
+        Returns:
+            Number of recorded samples
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                print("Waiting for the last joint read to finish...")
+                self._thread.join()
+            self._thread = None
+        self._hand_off()
+
+        if self._writer_thread is not None:
+            self._queue.put(None)
+            self._writer_thread.join()
+            self._writer_thread = None
+            self._writer.close()
+        return self.count
+
+    def _record_loop(self) -> None:
+        period = 1.0 / self.rate
+        clock = self.clock
+        start = clock.now()
+        next_tick = start
+
+        while not self._stop_event.is_set() and self.count < self.max_samples:
+            try:
+                # Stamp before the read so the timestamp never lags its data
+                stamp = clock.now()
+                angles = self.robot.get_angles()
+                latency = clock.now() - stamp
+                if isinstance(angles, (list, tuple)) and len(angles) == 6:
+                    self._add(stamp - start, angles, latency, period)
+                    if self.on_reading is not None:
+                        self.on_reading(angles, latency=latency)
+            except Exception as e:
+                print(f"Error recording demonstration: {e}")
+
+            # Absolute deadlines: a slow read shortens the next wait instead
+            # of delaying every later sample
+            next_tick += period
+            delay = next_tick - clock.now()
+            if delay < 0:
+                skipped = int(-delay // period) + 1
+                self.missed += skipped
+                next_tick += skipped * period
+                delay = next_tick - clock.now()
+            self._wait(delay)
+
+        if self.count >= self.max_samples:
+            print(f"\nDemonstration reached {self.max_duration} s, recording stopped.")
+
+    def _wait(self, seconds: float) -> None:
+        if hasattr(self.clock, "realtime"):
+            # Simulated clock: waiting is what advances virtual time
+            self.clock.sleep(seconds)
+        else:
+            # Wall clock: stop() wakes the wait
+            self._stop_event.wait(max(seconds, 0.0))
+
+    def _add(self, t: float, angles, latency: float, period: float) -> None:
+        if self.count > 0:
+            dt = t - self._last_time
+            self._dt_sum += dt
+            self._dt_square_sum += dt * dt
+            self._dt_deviation_max = max(self._dt_deviation_max, abs(dt - period))
+        self._latency_sum += latency
+        self._latency_max = max(self._latency_max, latency)
+        self._last_time = t
+
+        self._times[self._fill] = t
+        self._angles[self._fill] = angles
+        self._fill += 1
+        self.count += 1
+        if self._fill == self.chunk:
+            self._hand_off()
+
+    def _hand_off(self) -> None:
+        # Pass the filled part of the chunk on and start a new one
+        if self._fill == 0:
+            return
+        chunk = (self._times[:self._fill].copy(), self._angles[:self._fill].copy())
+        self._fill = 0
+        if self._writer is not None:
+            self._queue.put(chunk)
+        else:
+            self._chunks.append(chunk)
+
+    def _write_loop(self) -> None:
+        # Appends run here so a slow disk or fsync never delays a sample
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            try:
+                self._writer.append(*chunk)
+            except Exception as e:
+                print(f"Error writing demonstration: {e}")
+
+    def samples(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the recorded samples (call after stop()).
+
+        Returns:
+            Tuple of (seconds since start, shape (N,); joint angles, shape (N, 6));
+            memory-mapped from the trajectory file when recording to a file
+        """
+        if self.path:
+            trajectory = read_trajectory(self.path)
+            return trajectory.times, trajectory.angles
+        if not self._chunks:
+            return np.zeros(0), np.zeros((0, 6), dtype=np.float32)
+        return (np.concatenate([times for times, _ in self._chunks]),
+                np.concatenate([angles for _, angles in self._chunks]))
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Summarize the achieved sampling rate and timing jitter.
+
+        Returns:
+            Dictionary with sample count, duration, achieved rate, period
+            jitter (standard deviation and worst deviation from the nominal
+            period), missed ticks and serial read latency
+        """
+        n = self.count
+        if n < 2:
+            return {"samples": n}
+
+        intervals = n - 1
+        mean = self._dt_sum / intervals
+        return {
+            "samples": n,
+            "duration": self._last_time,
+            "rate": intervals / self._last_time,
+            "jitter_std": math.sqrt(max(self._dt_square_sum / intervals - mean * mean, 0.0)),
+            "jitter_max": self._dt_deviation_max,
+            "missed_ticks": self.missed,
+            "mean_read_latency": self._latency_sum / n,
+            "max_read_latency": self._latency_max
+        }
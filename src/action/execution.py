@@ -0,0 +1,250 @@
+"""
+Execution Context Module for Embodied Agent
+
+This module makes running action plans preemptible. Motion code waits through
+the current execution context, which raises MotionCancelled within one control
+period once a stop or a new instruction arrives. It also routes console input,
+so the main loop can accept new instructions while a plan is running and
+interactive steps (such as teaching mode) still get their own prompts.
+
+"""
+
+import sys
+import time
+import queue
+import threading
+from typing import Callable, Optional
+
+# Import system configuration
+from config import ROBOT_CONFIG
+
+
+class MotionCancelled(BaseException):
+    """
+    Raised inside a running plan when it has been preempted.
+
+    Derives from BaseException (like KeyboardInterrupt) so the broad
+    ``except Exception`` handlers around each action do not swallow it and
+    the whole plan unwinds instead of continuing with the next step.
+    """
+
+
+class ExecutionContext:
+    """
+    Cancellation state shared by every step of one action plan.
+
+    Args:
+        control_period: Longest time between cancellation checks in seconds
+    """
+
+    def __init__(self, control_period: float = None):
+        self.control_period = control_period or 1.0 / ROBOT_CONFIG.get("control_rate", 20)
+        self._event = threading.Event()
+        self.reason = None
+        self.requested_at = None      # time.monotonic() of cancel()
+        self.acknowledged_at = None   # time.monotonic() when the plan noticed
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "stop") -> None:
+        """
+        Request cancellation of the running plan.
+
+        Args:
+            reason: Why the plan is being preempted
+        """
+        if not self._event.is_set():
+            self.reason = reason
+            self.requested_at = time.monotonic()
+            self._event.set()
+
+    def check(self) -> None:
+        """
+        Raise MotionCancelled if cancellation has been requested.
+        """
+        if self._event.is_set():
+            if self.acknowledged_at is None:
+                self.acknowledged_at = time.monotonic()
+            raise MotionCancelled(self.reason)
+
+    def sleep(self, seconds: float, clock=None) -> None:
+        """
+        Wait while staying responsive to cancellation.
+
+        Args:
+            seconds: Time to wait
+            clock: Clock to wait on (robot clock); None uses the wall clock
+        """
+        self.check()
+        if seconds <= 0:
+            return
+
+        if clock is None or not hasattr(clock, "realtime"):
+            # Wall clock: the event wakes the wait as soon as cancel() is called
+            self._event.wait(seconds)
+        else:
+            # Simulated clock: advance in control-period slices
+            remaining = seconds
+            while remaining > 0:
+                step = min(remaining, self.control_period)
+                clock.sleep(step)
+                remaining -= step
+                if self._event.is_set():
+                    break
+        self.check()
+
+    def wait_acknowledged(self, timeout: float) -> bool:
+        """
+        Wait until the running plan has observed the cancellation.
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            True if the plan acknowledged within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while self.acknowledged_at is None and time.monotonic() < deadline:
+            time.sleep(min(0.005, self.control_period))
+        return self.acknowledged_at is not None
+
+
+# Context of the plan currently executing
+_context = ExecutionContext()
+
+
+def get_context() -> ExecutionContext:
+    """
+    Get the execution context of the current plan.
+    """
+    return _context
+
+
+def new_context() -> ExecutionContext:
+    """
+    Start a fresh execution context for the next plan.
+
+    Returns:
+        The new current context
+    """
+    global _context
+    _context = ExecutionContext()
+    return _context
+
+
+def enter_only(line: str) -> bool:
+    """
+    Accept only a bare Enter (the default for step prompts).
+    """
+    return not line.strip()
+
+
+class Console:
+    """
+    Owns stdin and routes each line to the main loop or a waiting step.
+
+    A background thread reads lines from stdin. When a plan step is waiting
+    for operator confirmation and the line is an answer the step accepts, it
+    goes to that step; otherwise it is queued for the main loop as the next
+    instruction, so the plan can still be preempted while a step waits.
+    """
+
+    def __init__(self):
+        self._main_lines = queue.Queue()
+        self._step_lines = queue.Queue()
+        self._step_waiting = threading.Event()
+        self._step_accepts = enter_only
+        self._thread = threading.Thread(target=self._reader, name="console-reader", daemon=True)
+        self._thread.start()
+
+    def _reader(self) -> None:
+        while True:
+            line = sys.stdin.readline()
+            if not line:
+                self._main_lines.put(None)
+                return
+            line = line.rstrip("\n")
+            if self._step_waiting.is_set() and self._step_accepts(line):
+                self._step_lines.put(line)
+            else:
+                self._main_lines.put(line)
+
+    def read_line(self, prompt: str = "", timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Read the next line meant for the main loop.
+
+        Args:
+            prompt: Text to print before waiting (printed only when given)
+            timeout: Seconds to wait; None waits forever
+
+        Returns:
+            The line, or None on timeout
+
+        Raises:
+            EOFError: If stdin has been closed
+        """
+        if prompt:
+            print(prompt, end="", flush=True)
+        try:
+            line = self._main_lines.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if line is None:
+            raise EOFError
+        return line
+
+    def read_for_step(self, prompt: str = "", accept: Callable[[str], bool] = enter_only) -> str:
+        """
+        Read a line for the running plan step, honouring cancellation.
+
+        Args:
+            prompt: Text to print before waiting
+            accept: Which lines answer the step; other lines go to the main loop
+
+        Returns:
+            The line entered by the operator
+        """
+        context = get_context()
+        print(prompt, end="", flush=True)
+        self._step_accepts = accept
+        self._step_waiting.set()
+        try:
+            while True:
+                context.check()
+                try:
+                    return self._step_lines.get(timeout=context.control_period)
+                except queue.Empty:
+                    continue
+        finally:
+            self._step_waiting.clear()
+
+
+# Console installed by the main loop, if any
+_console = None
+
+
+def set_console(console: Optional[Console]) -> None:
+    """
+    Install the console that owns stdin (None restores plain input()).
+    """
+    global _console
+    _console = console
+
+
+def step_input(prompt: str = "", accept: Callable[[str], bool] = enter_only) -> str:
+    """
+    Ask the operator for input from inside a running plan step.
+
+    Args:
+        prompt: Text to show
+        accept: Which lines answer the step (default: Enter only); anything
+            else typed meanwhile is a new instruction and preempts the plan
+
+    Returns:
+        The line entered by the operator
+    """
+    if _console is None:
+        return input(prompt)
+    return _console.read_for_step(prompt, accept)
@@ -0,0 +1,337 @@
+"""
+IK Lookup Table Module for Embodied Agent
+
+This module precomputes joint solutions for the tool-down orientation over a
+grid of table positions at a few fixed heights. The grid is built offline,
+stored as a memory-mapped array and loaded lazily, so motion code can turn
+Cartesian waypoints into joint setpoints by interpolation instead of solving
+inverse kinematics online.
+
+Build the configured table once with: python ik_table.py --build
+
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+# Import system configuration
+from config import WORKSPACE_CONFIG
+from action.kinematics import euler_to_rotation, forward_kinematics, inverse_kinematics
+
+
+class IKTable:
+    """
+    Joint solutions on a regular (z, x, y) grid for one tool orientation.
+
+    Cells without a solution hold NaN. Queries interpolate trilinearly
+    between the eight surrounding cells and verify the result with forward
+    kinematics; results off by more than the tolerance are refined with a few
+    warm-started IK iterations.
+
+    Args:
+        angles: Joint angles in degrees, shape (nz, nx, ny, 6) (may be a memmap)
+        heights: Grid heights in mm, shape (nz,), increasing
+        xs: Grid X positions in mm, shape (nx,), evenly spaced
+        ys: Grid Y positions in mm, shape (ny,), evenly spaced
+        orientation: Tool orientation [rx, ry, rz] the table was built for
+    """
+
+    def __init__(self, angles: np.ndarray, heights, xs, ys, orientation):
+        self.angles = angles
+        self.heights = np.asarray(heights, dtype=float)
+        self.xs = np.asarray(xs, dtype=float)
+        self.ys = np.asarray(ys, dtype=float)
+        self.orientation = np.asarray(orientation, dtype=float)
+        self._rotation = euler_to_rotation(self.orientation)
+
+    def matches(self, orientation, tolerance: float = 2.0) -> bool:
+        """
+        Check whether the table applies to a tool orientation.
+
+        Args:
+            orientation: Tool orientation [rx, ry, rz] in degrees
+            tolerance: Largest rotation difference in degrees
+
+        Returns:
+            True if the orientation is within the tolerance of the table's
+        """
+        relative = self._rotation.T @ euler_to_rotation(np.asarray(orientation, dtype=float))
+        angle = np.degrees(np.arccos(np.clip((np.trace(relative) - 1.0) / 2.0, -1.0, 1.0)))
+        return bool(angle <= tolerance)
+
+    def _cells(self, values: np.ndarray, axis: np.ndarray, uniform: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Lower cell index, blend weight and in-range mask along one axis
+        if uniform:
+            position = (values - axis[0]) / (axis[1] - axis[0])
+        else:
+            position = np.interp(values, axis, np.arange(len(axis)), left=-1.0, right=len(axis))
+        index = np.clip(np.floor(position).astype(int), 0, len(axis) - 2)
+        inside = (position >= 0) & (position <= len(axis) - 1)
+        return index, position - index, inside
+
+    def interpolate(self, points) -> np.ndarray:
+        """
+        Interpolate joint angles at tool positions without verification.
+
+        Args:
+            points: Tool positions [x, y, z] in mm, shape (N, 3)
+
+        Returns:
+            Joint angles in degrees, shape (N, 6); NaN outside the table
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        ix, wx, in_x = self._cells(points[:, 0], self.xs, True)
+        iy, wy, in_y = self._cells(points[:, 1], self.ys, True)
+        iz, wz, in_z = self._cells(points[:, 2], self.heights, False)
+
+        result = np.zeros((len(points), 6))
+        for dz in (0, 1):
+            for dx in (0, 1):
+                for dy in (0, 1):
+                    weight = ((wz if dz else 1.0 - wz) * (wx if dx else 1.0 - wx) *
+                              (wy if dy else 1.0 - wy))
+                    result += weight[:, None] * self.angles[iz + dz, ix + dx, iy + dy]
+        result[~(in_x & in_y & in_z)] = np.nan
+        return result
+
+    def lookup(self, points, tol: float = 0.5, refine_iter: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Joint solutions for tool positions at the table orientation.
+
+        Args:
+            points: Tool positions [x, y, z] in mm, shape (N, 3)
+            tol: Allowed position error in mm
+            refine_iter: IK iterations spent on points the interpolation misses
+
+        Returns:
+            Tuple of (joint angles in degrees, success mask), shapes (N, 6) and (N,)
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        angles = self.interpolate(points)
+        known = ~np.isnan(angles).any(axis=1)
+
+        success = np.zeros(len(points), dtype=bool)
+        if known.any():
+            pose = forward_kinematics(angles[known])
+            error = np.linalg.norm(pose[:, :3, 3] - points[known], axis=1)
+            # Rotation angle between the reached and the table orientation
+            cosine = (np.einsum("ij,nij->n", self._rotation, pose[:, :3, :3]) - 1.0) / 2.0
+            rotation_error = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+            success[known] = (error <= tol) & (rotation_error <= 1.0)
+
+        # Interpolated seeds are close, so a short warm solve fixes the rest
+        retry = known & ~success
+        if retry.any() and refine_iter > 0:
+            targets = np.hstack([points[retry], np.tile(self.orientation, (retry.sum(), 1))])
+            refined, ok = inverse_kinematics(targets, seed=angles[retry], max_iter=refine_iter,
+                                             tol=tol, restarts=0)
+            angles[retry] = refined
+            success[retry] = ok
+
+        return angles, success
+
+
+def build_ik_table(heights=None, step: float = None, orientation=None,
+                   path: str = None) -> Dict[str, float]:
+    """
+    Solve the IK grid offline and save it as a memory-mapped array.
+
+    Each height layer is solved as a wavefront growing out from an anchor
+    cell in front of the arm. Every cell is warm-started from its already
+    solved neighbour towards the anchor, which keeps adjacent cells on the
+    same IK branch so that interpolating between them stays meaningful.
+
+    Args:
+        heights: Tool heights in mm (defaults to the configured table heights)
+        step: XY grid spacing in mm
+        orientation: Tool orientation [rx, ry, rz] in degrees
+        path: Output .npy file; a .json header is written next to it
+
+    Returns:
+        Dictionary with grid size, solved fraction and build time
+    """
+    heights = np.asarray(WORKSPACE_CONFIG["ik_table_heights"] if heights is None else heights, dtype=float)
+    step = step or WORKSPACE_CONFIG["ik_table_step"]
+    orientation = np.asarray(WORKSPACE_CONFIG["tool_orientation"] if orientation is None else orientation,
+                             dtype=float)
+    path = path or WORKSPACE_CONFIG["ik_table_file"]
+    reach = WORKSPACE_CONFIG["ik_table_reach"]
+
+    start = time.perf_counter()
+    xs = np.arange(-reach, reach + step / 2, step)
+    ys = np.arange(-reach, reach + step / 2, step)
+    nx, ny = len(xs), len(ys)
+    gx, gy = np.meshgrid(np.arange(nx), np.arange(ny), indexing="ij")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    angles = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32,
+                                       shape=(len(heights), nx, ny, 6))
+    angles[:] = np.nan
+
+    # Anchor in front of the arm, where the tool-down pose is well conditioned
+    ax = int(np.argmin(np.abs(xs - WORKSPACE_CONFIG["ik_table_anchor"][0])))
+    ay = int(np.argmin(np.abs(ys - WORKSPACE_CONFIG["ik_table_anchor"][1])))
+    ring = np.maximum(np.abs(gx - ax), np.abs(gy - ay))
+    # Neighbour one ring closer to the anchor
+    toward_x = gx - np.sign(gx - ax)
+    toward_y = gy - np.sign(gy - ay)
+
+    anchor_seed = None
+    for k, z in enumerate(heights):
+        layer = np.full((nx, ny, 6), np.nan)
+        anchor_pose = np.concatenate([[xs[ax], ys[ay], z], orientation])
+        anchor_angles, ok = inverse_kinematics(anchor_pose, seed=anchor_seed)
+        if not ok:
+            print(f"IK table: no solution at the anchor for height {z}")
+            continue
+        layer[ax, ay] = anchor_angles
+        anchor_seed = anchor_angles
+
+        for r in range(1, ring.max() + 1):
+            cx, cy = np.nonzero(ring == r)
+            seeds = layer[toward_x[cx, cy], toward_y[cx, cy]]
+            missing = np.isnan(seeds).any(axis=1)
+            seeds[missing] = anchor_angles
+            targets = np.column_stack([xs[cx], ys[cy], np.full(len(cx), z),
+                                       np.tile(orientation, (len(cx), 1))])
+            solved, ok = inverse_kinematics(targets, seed=seeds, restarts=0)
+            layer[cx[ok], cy[ok]] = solved[ok]
+
+        angles[k] = layer
+    angles.flush()
+    solved_fraction = float((~np.isnan(angles).any(axis=3)).mean())
+    del angles
+
+    with open(os.path.splitext(path)[0] + ".json", "w") as f:
+        json.dump({
+            "heights": heights.tolist(),
+            "xs": xs.tolist(),
+            "ys": ys.tolist(),
+            "orientation": orientation.tolist(),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S")
+        }, f)
+
+    return {
+        "cells": int(len(heights) * nx * ny),
+        "solved_fraction": solved_fraction,
+        "build_time_s": time.perf_counter() - start
+    }
+
+
+def load_ik_table(path: str = None) -> IKTable:
+    """
+    Open a saved IK table without reading it into memory.
+
+    Args:
+        path: Table .npy file (defaults to the configured file)
+
+    Returns:
+        IKTable backed by a read-only memory map
+    """
+    path = path or WORKSPACE_CONFIG["ik_table_file"]
+    with open(os.path.splitext(path)[0] + ".json", "r") as f:
+        header = json.load(f)
+    angles = np.load(path, mmap_mode="r")
+    return IKTable(angles, header["heights"], header["xs"], header["ys"], header["orientation"])
+
+
+# Table of the current session: None until first use, False if unavailable
+_table = None
+
+
+def get_ik_table() -> Optional[IKTable]:
+    """
+    Get the session IK table, loading it on first use.
+
+    Returns:
+        The table, or None if it has not been built (motion code then
+        solves online or lets the firmware do it)
+    """
+    global _table
+    if _table is None:
+        try:
+            _table = load_ik_table()
+        except FileNotFoundError:
+            print("IK table not built yet (run ik_table.py --build), "
+                  "Cartesian moves will be solved online")
+            _table = False
+        except Exception as e:
+            print(f"Error loading IK table: {e}")
+            _table = False
+    return _table or None
+
+
+def benchmark_ik_table(n: int = 2000, seed: int = 0, path: str = None) -> Dict[str, float]:
+    """
+    Measure table build, load and query times against online IK.
+
+    Args:
+        n: Number of query points
+        seed: Random seed
+        path: Where to build the table (defaults to a temporary file, so the
+            configured table is never overwritten)
+
+    Returns:
+        Dictionary with build, load and query timings and success rates
+    """
+    directory = None
+    if path is None:
+        directory = tempfile.mkdtemp(prefix="ik_table_")
+        path = os.path.join(directory, "ik_table.npy")
+    try:
+        results = build_ik_table(path=path)
+
+        start = time.perf_counter()
+        table = load_ik_table(path)
+        results["load_time_s"] = time.perf_counter() - start
+        return _benchmark_queries(table, n, seed, results)
+    finally:
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def _benchmark_queries(table: IKTable, n: int, seed: int, results: Dict[str, float]) -> Dict[str, float]:
+    # Time table lookups against online IK on random reachable table points
+
+    rng = np.random.default_rng(seed)
+    radius = rng.uniform(150.0, 260.0, n)
+    bearing = rng.uniform(-np.pi / 2, np.pi / 2, n)
+    z = rng.uniform(table.heights[0], table.heights[-1], n)
+    points = np.column_stack([radius * np.cos(bearing), radius * np.sin(bearing), z])
+
+    start = time.perf_counter()
+    _, ok = table.lookup(points)
+    query_time = time.perf_counter() - start
+
+    targets = np.hstack([points, np.tile(table.orientation, (n, 1))])
+    start = time.perf_counter()
+    _, online_ok = inverse_kinematics(targets)
+    online_time = time.perf_counter() - start
+
+    results.update({
+        "queries": n,
+        "table_per_second": n / query_time,
+        "table_success": float(ok.mean()),
+        "online_per_second": n / online_time,
+        "online_success": float(online_ok.mean())
+    })
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: python ik_table.py --build  builds the configured table used by the arm;
+    # without arguments a table is built in a temporary file and benchmarked
+    if "--build" in sys.argv[1:]:
+        results = build_ik_table()
+        print(f"IK table saved to {WORKSPACE_CONFIG['ik_table_file']}")
+    else:
+        results = benchmark_ik_table()
+    for name, value in results.items():
+        print(f"{name}: {value:.3f}" if isinstance(value, float) else f"{name}: {value}")
@@ -0,0 +1,348 @@
+"""
+Kinematics Module for Embodied Agent
+
+This module implements batched forward and inverse kinematics for the
+myCobot 280 using NumPy, so reachability can be checked and joint solutions
+chosen locally instead of delegating every Cartesian move to the firmware.
+
+Poses are expressed as [x, y, z, rx, ry, rz] in millimetres and degrees, with
+the rotation R = Rz(rz) @ Ry(ry) @ Rx(rx) (fixed-axis XYZ).
+
+"""
+
+import time
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+# Standard Denavit-Hartenberg parameters of the myCobot 280 (J1-J6)
+# Columns: theta offset (deg), d (mm), a (mm), alpha (deg)
+DH_PARAMS = np.array([
+    [0.0,   131.22,    0.0,   90.0],
+    [-90.0,   0.0,  -110.4,    0.0],
+    [0.0,     0.0,   -96.0,    0.0],
+    [-90.0,  63.4,     0.0,   90.0],
+    [90.0,   75.05,    0.0,  -90.0],
+    [0.0,    45.6,     0.0,    0.0]
+])
+
+# Joint limits in degrees (J1-J6)
+JOINT_LIMITS = np.array([
+    [-168.0, 168.0],
+    [-135.0, 135.0],
+    [-150.0, 150.0],
+    [-145.0, 145.0],
+    [-165.0, 165.0],
+    [-180.0, 180.0]
+])
+
+# Joint speed at speed setting 100 (degrees per second)
+MAX_JOINT_SPEED = 160.0
+
+# Millimetres of position error treated as equal to one radian of orientation error
+ORIENTATION_WEIGHT = 100.0
+
+
+def _as_batch(values, width: int) -> Tuple[np.ndarray, bool]:
+    array = np.asarray(values, dtype=float)
+    single = array.ndim == 1
+    return array.reshape(-1, width), single
+
+
+def forward_kinematics(angles) -> np.ndarray:
+    """
+    Compute the tool flange pose for one or many joint configurations.
+
+    Args:
+        angles: Joint angles in degrees, shape (6,) or (N, 6)
+
+    Returns:
+        Homogeneous transforms, shape (4, 4) or (N, 4, 4)
+    """
+    q, single = _as_batch(angles, 6)
+    n = q.shape[0]
+
+    theta = np.radians(q + DH_PARAMS[:, 0])
+    d = DH_PARAMS[:, 1]
+    a = DH_PARAMS[:, 2]
+    alpha = np.radians(DH_PARAMS[:, 3])
+    ca, sa = np.cos(alpha), np.sin(alpha)
+    ct, st = np.cos(theta), np.sin(theta)
+
+    # Per-joint link transforms, shape (N, 6, 4, 4)
+    links = np.zeros((n, 6, 4, 4))
+    links[:, :, 0, 0] = ct
+    links[:, :, 0, 1] = -st * ca
+    links[:, :, 0, 2] = st * sa
+    links[:, :, 0, 3] = a * ct
+    links[:, :, 1, 0] = st
+    links[:, :, 1, 1] = ct * ca
+    links[:, :, 1, 2] = -ct * sa
+    links[:, :, 1, 3] = a * st
+    links[:, :, 2, 1] = sa
+    links[:, :, 2, 2] = ca
+    links[:, :, 2, 3] = d
+    links[:, :, 3, 3] = 1.0
+
+    pose = links[:, 0]
+    for j in range(1, 6):
+        pose = pose @ links[:, j]
+
+    return pose[0] if single else pose
+
+
+def rotation_to_euler(rotation: np.ndarray) -> np.ndarray:
+    """
+    Convert rotation matrices to [rx, ry, rz] in degrees.
+
+    Args:
+        rotation: Rotation matrices, shape (..., 3, 3)
+
+    Returns:
+        Euler angles in degrees, shape (..., 3)
+    """
+    r = np.asarray(rotation)
+    ry = np.arcsin(np.clip(-r[..., 2, 0], -1.0, 1.0))
+    rx = np.arctan2(r[..., 2, 1], r[..., 2, 2])
+    rz = np.arctan2(r[..., 1, 0], r[..., 0, 0])
+    return np.degrees(np.stack([rx, ry, rz], axis=-1))
+
+
+def euler_to_rotation(euler) -> np.ndarray:
+    """
+    Convert [rx, ry, rz] in degrees to rotation matrices.
+
+    Args:
+        euler: Euler angles in degrees, shape (..., 3)
+
+    Returns:
+        Rotation matrices, shape (..., 3, 3)
+    """
+    e = np.radians(np.asarray(euler, dtype=float))
+    cx, sx = np.cos(e[..., 0]), np.sin(e[..., 0])
+    cy, sy = np.cos(e[..., 1]), np.sin(e[..., 1])
+    cz, sz = np.cos(e[..., 2]), np.sin(e[..., 2])
+
+    r = np.empty(e.shape[:-1] + (3, 3))
+    r[..., 0, 0] = cz * cy
+    r[..., 0, 1] = cz * sy * sx - sz * cx
+    r[..., 0, 2] = cz * sy * cx + sz * sx
+    r[..., 1, 0] = sz * cy
+    r[..., 1, 1] = sz * sy * sx + cz * cx
+    r[..., 1, 2] = sz * sy * cx - cz * sx
+    r[..., 2, 0] = -sy
+    r[..., 2, 1] = cy * sx
+    r[..., 2, 2] = cy * cx
+    return r
+
+
+def angles_to_coords(angles) -> np.ndarray:
+    """
+    Forward kinematics in the arm's coordinate format.
+
+    Args:
+        angles: Joint angles in degrees, shape (6,) or (N, 6)
+
+    Returns:
+        Poses [x, y, z, rx, ry, rz], shape (6,) or (N, 6)
+    """
+    q, single = _as_batch(angles, 6)
+    pose = forward_kinematics(q)
+    coords = np.concatenate([pose[:, :3, 3], rotation_to_euler(pose[:, :3, :3])], axis=1)
+    return coords[0] if single else coords
+
+
+def _rotation_error(target: np.ndarray, current: np.ndarray) -> np.ndarray:
+    # Rotation vector of target @ current.T, shape (N, 3), in radians.
+    # Goes through a quaternion so errors near 180 degrees keep a usable axis.
+    delta = target @ np.swapaxes(current, 1, 2)
+    r00, r11, r22 = delta[:, 0, 0], delta[:, 1, 1], delta[:, 2, 2]
+    w = 0.5 * np.sqrt(np.maximum(0.0, 1.0 + r00 + r11 + r22))
+    v = 0.5 * np.stack([
+        np.copysign(np.sqrt(np.maximum(0.0, 1.0 + r00 - r11 - r22)), delta[:, 2, 1] - delta[:, 1, 2]),
+        np.copysign(np.sqrt(np.maximum(0.0, 1.0 - r00 + r11 - r22)), delta[:, 0, 2] - delta[:, 2, 0]),
+        np.copysign(np.sqrt(np.maximum(0.0, 1.0 - r00 - r11 + r22)), delta[:, 1, 0] - delta[:, 0, 1])
+    ], axis=1)
+    sin_half = np.linalg.norm(v, axis=1)
+    angle = 2.0 * np.arctan2(sin_half, w)
+    # Small-angle limit of angle / sin(angle / 2) is 2
+    scale = np.where(sin_half > 1e-9, angle / np.maximum(sin_half, 1e-12), 2.0)
+    return v * scale[:, None]
+
+
+def _pose_error(q: np.ndarray, target_pos: np.ndarray, target_rot: Optional[np.ndarray]) -> np.ndarray:
+    pose = forward_kinematics(q)
+    position_error = target_pos - pose[:, :3, 3]
+    if target_rot is None:
+        return position_error
+    rotation_error = _rotation_error(target_rot, pose[:, :3, :3]) * ORIENTATION_WEIGHT
+    return np.concatenate([position_error, rotation_error], axis=1)
+
+
+def inverse_kinematics(coords, seed=None, position_only: bool = False,
+                       max_iter: int = 100, tol: float = 0.5, restarts: int = 8,
+                       rng: Optional[np.random.Generator] = None
+                       ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Solve inverse kinematics for many targets at once.
+
+    Uses Levenberg-Marquardt steps with a finite-difference Jacobian evaluated
+    for the whole batch in one forward-kinematics call. Each target keeps its
+    own damping, which shrinks after an improving step and grows after a
+    rejected one. Targets that fail to converge are retried from random seeds.
+
+    Args:
+        coords: Target poses [x, y, z, rx, ry, rz] (or [x, y, z] with position_only),
+                shape (k,) or (N, k)
+        seed: Initial joint angles in degrees, shape (6,) or (N, 6); zeros by default
+        position_only: Ignore the orientation part of the target
+        max_iter: Iteration limit per attempt
+        tol: Convergence tolerance in mm (orientation is weighted by ORIENTATION_WEIGHT)
+        restarts: Number of random restarts for unconverged targets
+        rng: Random generator for restarts
+
+    Returns:
+        Tuple of (joint angles in degrees, success mask), shapes (N, 6) and (N,),
+        or (6,) and () for a single target
+    """
+    width = 3 if position_only else 6
+    target = np.asarray(coords, dtype=float)
+    single = target.ndim == 1
+    target = target.reshape(-1, target.shape[-1])[:, :width]
+    n = target.shape[0]
+
+    target_pos = target[:, :3]
+    target_rot = None if position_only else euler_to_rotation(target[:, 3:6])
+
+    if seed is None:
+        q = np.zeros((n, 6))
+    else:
+        q = np.broadcast_to(np.asarray(seed, dtype=float), (n, 6)).copy()
+
+    rng = rng or np.random.default_rng(0)
+    lower, upper = JOINT_LIMITS[:, 0], JOINT_LIMITS[:, 1]
+    eps = 1e-3          # Finite-difference step in degrees
+    max_step = 20.0     # Largest joint change per iteration in degrees
+    offsets = np.concatenate([np.zeros((1, 6)), np.eye(6) * eps])  # (7, 6)
+    identity = np.eye(width)
+
+    solution = q.copy()
+    success = np.zeros(n, dtype=bool)
+    active = np.arange(n)
+
+    for attempt in range(restarts + 1):
+        if attempt > 0:
+            active = np.flatnonzero(~success)
+            if active.size == 0:
+                break
+            q = rng.uniform(lower * 0.9, upper * 0.9, size=(active.size, 6))
+
+        pos = target_pos[active]
+        rot = None if target_rot is None else target_rot[active]
+        damping = np.full(active.size, 10.0)
+        converged = np.zeros(active.size, dtype=bool)
+
+        for _ in range(max_iter):
+            todo = np.flatnonzero(~converged)
+            if todo.size == 0:
+                break
+
+            # Evaluate the current pose and all six perturbations in one batch
+            probes = (q[todo, None, :] + offsets[None]).reshape(-1, 6)
+            probe_pos = np.repeat(pos[todo], 7, axis=0)
+            probe_rot = None if rot is None else np.repeat(rot[todo], 7, axis=0)
+            errors = _pose_error(probes, probe_pos, probe_rot).reshape(todo.size, 7, width)
+
+            error = errors[:, 0]
+            norm = np.linalg.norm(error, axis=1)
+            done = norm < tol
+            converged[todo[done]] = True
+
+            # Jacobian of the pose with respect to joint angles (per radian)
+            jacobian = -(errors[:, 1:] - errors[:, :1]).transpose(0, 2, 1) / np.radians(eps)
+            jacobian_t = jacobian.transpose(0, 2, 1)
+            lam = damping[todo, None, None] ** 2
+            step = jacobian_t @ np.linalg.solve(jacobian @ jacobian_t + lam * identity, error[..., None])
+            step = np.degrees(step[..., 0])
+
+            # Limit the step so linearization errors cannot throw the arm around
+            largest = np.max(np.abs(step), axis=1, keepdims=True)
+            step *= np.minimum(1.0, max_step / np.maximum(largest, 1e-12))
+
+            candidate = np.clip(q[todo] + step, lower, upper)
+            new_norm = np.linalg.norm(_pose_error(candidate, pos[todo], None if rot is None else rot[todo]), axis=1)
+
+            improved = (new_norm < norm) & ~done
+            q[todo[improved]] = candidate[improved]
+            damping[todo] = np.where(improved, damping[todo] * 0.5, damping[todo] * 4.0)
+            np.clip(damping, 1e-2, 1e4, out=damping)
+
+        solution[active] = q
+        success[active] = converged
+
+    if single:
+        return solution[0], success[0]
+    return solution, success
+
+
+def is_reachable(coords, seed=None, position_only: bool = True) -> np.ndarray:
+    """
+    Check whether targets can be reached within the joint limits.
+
+    Args:
+        coords: Target poses, shape (k,) or (N, k)
+        seed: Initial joint angles in degrees for the solver
+        position_only: Only require the tool position to be reachable
+
+    Returns:
+        Boolean mask of reachable targets
+    """
+    _, success = inverse_kinematics(coords, seed=seed, position_only=position_only)
+    return success
+
+
+def benchmark_kinematics(n: int = 2000, seed: int = 0) -> Dict[str, float]:
+    """
+    Measure forward and inverse kinematics throughput on random reachable targets.
+
+    Args:
+        n: Number of targets
+        seed: Random seed
+
+    Returns:
+        Dictionary with timings, rates and IK success rate
+    """
+    rng = np.random.default_rng(seed)
+    q = rng.uniform(JOINT_LIMITS[:, 0] * 0.7, JOINT_LIMITS[:, 1] * 0.7, size=(n, 6))
+
+    start = time.perf_counter()
+    targets = angles_to_coords(q)
+    fk_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, success = inverse_kinematics(targets, position_only=True, rng=rng)
+    ik_position_time = time.perf_counter() - start
+
+    # Full pose from a cold start (zero seed), then warm-started near the answer
+    start = time.perf_counter()
+    _, cold_success = inverse_kinematics(targets, rng=rng)
+    ik_pose_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, warm_success = inverse_kinematics(targets, seed=q + rng.normal(0, 10, q.shape), rng=rng)
+    ik_warm_time = time.perf_counter() - start
+
+    return {
+        "targets": n,
+        "fk_per_second": n / fk_time,
+        "ik_position_per_second": n / ik_position_time,
+        "ik_position_success": float(success.mean()),
+        "ik_pose_per_second": n / ik_pose_time,
+        "ik_pose_success": float(cold_success.mean()),
+        "ik_warm_per_second": n / ik_warm_time,
+        "ik_warm_success": float(warm_success.mean())
+    }
+
+
+if __name__ == "__main__":
+    for name, value in benchmark_kinematics().items():
+        print(f"{name}: {value:.3f}" if isinstance(value, float) else f"{name}: {value}")
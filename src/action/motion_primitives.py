@@ -0,0 +1,412 @@
+"""
+Motion Primitives Module for Embodied Agent
+
+This module defines gestures as keyframe tables and compiles them once into
+time-parameterized joint trajectories. A fixed-rate executor streams the
+trajectory to the arm with optional tempo scaling, so adding a gesture is a
+data change rather than new control code.
+
+"""
+
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Import system configuration
+from config import ROBOT_CONFIG
+from action.execution import get_context
+from action.kinematics import JOINT_LIMITS, MAX_JOINT_SPEED
+
+# Keyframe value meaning "go back to the pose the gesture started from"
+START_POSE = "start"
+
+# Gesture keyframe tables.
+# Each keyframe is (time in seconds, {joint id (1-6): angle in degrees}) or
+# (time, START_POSE). Joints not named in a keyframe hold their previous value;
+# before the first mention they hold the start pose.
+GESTURES = {
+    "head_shake": {
+        "speed": 80,
+        "keyframes": [
+            (0.6, {1: 30}),
+            (1.4, {1: -30}),
+            (2.2, {1: 30}),
+            (3.0, {1: -30}),
+            (3.8, START_POSE)
+        ]
+    },
+    "head_nod": {
+        "speed": 80,
+        "keyframes": [
+            (0.5, {2: -20}),
+            (1.1, {2: 20}),
+            (1.7, {2: -20}),
+            (2.3, {2: 20}),
+            (3.0, START_POSE)
+        ]
+    },
+    "head_dance": {
+        "speed": 100,
+        "keyframes": [
+            (0.7, {1: 45}),
+            (1.9, {1: -45}),
+            (2.4, {2: 30}),
+            (2.9, {3: -30}),
+            (4.0, {6: 90}),
+            (6.2, {6: -90}),
+            (7.4, START_POSE)
+        ]
+    }
+}
+
+
+def _min_jerk(s: np.ndarray) -> np.ndarray:
+    # Minimum-jerk blend: zero velocity and acceleration at both keyframes
+    return s * s * s * (10.0 - 15.0 * s + 6.0 * s * s)
+
+
+def interpolate_cubic(times: np.ndarray, values: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    Evaluate a C1 cubic Hermite spline through samples at query times.
+
+    Tangents are shape-preserving (weighted harmonic mean of the neighbouring
+    slopes, zero at local extrema and at both ends), so the curve passes
+    through every sample without overshooting it, holds still wherever the
+    samples do and needs no global solve.
+
+    Args:
+        times: Sample times, shape (N,), strictly increasing
+        values: Sample values, shape (N, D)
+        query: Times to evaluate, shape (M,); clamped to the sample range
+
+    Returns:
+        Interpolated values, shape (M, D)
+    """
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float).reshape(len(times), -1)
+    query = np.clip(np.asarray(query, dtype=float), times[0], times[-1])
+    if len(times) < 2:
+        return np.repeat(values[:1], len(query), axis=0)
+
+    h = np.diff(times)
+    slope = np.diff(values, axis=0) / h[:, None]
+    tangent = np.zeros_like(values)
+    # Interior tangents: zero where the slope changes sign or vanishes,
+    # otherwise the harmonic mean weighted for uneven spacing
+    w1 = (2 * h[1:] + h[:-1])[:, None]
+    w2 = (h[1:] + 2 * h[:-1])[:, None]
+    before, after = slope[:-1], slope[1:]
+    monotone = before * after > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        harmonic = (w1 + w2) / (w1 / before + w2 / after)
+    tangent[1:-1] = np.where(monotone, harmonic, 0.0)
+
+    segment = np.clip(np.searchsorted(times, query, side="right") - 1, 0, len(times) - 2)
+    dt = h[segment][:, None]
+    s = ((query - times[segment]) / h[segment])[:, None]
+    s2, s3 = s * s, s * s * s
+    return ((2 * s3 - 3 * s2 + 1) * values[segment] + (s3 - 2 * s2 + s) * dt * tangent[segment] +
+            (-2 * s3 + 3 * s2) * values[segment + 1] + (s3 - s2) * dt * tangent[segment + 1])
+
+
+def _check_tempo(tempo: float) -> None:
+    if not tempo > 0:
+        raise ValueError(f"Tempo must be positive, got {tempo}")
+
+
+def peak_joint_speed(setpoints: np.ndarray, rate: float) -> float:
+    """
+    Highest joint speed a setpoint sequence commands.
+
+    Args:
+        setpoints: Joint angles sent at the control rate, shape (M, 6)
+        rate: Control rate in Hz
+
+    Returns:
+        Largest change of any joint between consecutive setpoints, in degrees per second
+    """
+    return float(np.abs(np.diff(setpoints, axis=0)).max(initial=0.0)) * rate
+
+
+def resample_trajectory(times, angles, rate: float, tempo: float = 1.0
+                        ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resample a recorded joint trajectory for fixed-rate playback.
+
+    Args:
+        times: Recorded sample times in seconds, shape (N,)
+        angles: Recorded joint angles, shape (N, 6)
+        rate: Playback control rate in Hz
+        tempo: Playback speed factor (2.0 plays twice as fast)
+
+    Returns:
+        Tuple of (send times in playback seconds, joint setpoints of shape (M, 6))
+    """
+    _check_tempo(tempo)
+    times = np.asarray(times, dtype=float)
+    # Drop repeated timestamps, which would make a zero-length segment
+    keep = np.concatenate([[True], np.diff(times) > 0])
+    times = times[keep] - times[0]
+    angles = np.asarray(angles, dtype=float).reshape(-1, 6)[keep]
+
+    duration = times[-1] / tempo
+    playback = np.append(np.arange(0.0, duration, 1.0 / rate), duration)
+    setpoints = interpolate_cubic(times, angles, playback * tempo)
+    return playback, np.clip(setpoints, JOINT_LIMITS[:, 0], JOINT_LIMITS[:, 1])
+
+
+class CompiledTrajectory:
+    """
+    A gesture compiled into keyframe arrays plus cached sampling tables.
+
+    Keyframe positions are stored as a (K, 6) array in which NaN marks values
+    that come from the start pose. Sampling a control rate is precomputed as
+    segment indices and blend weights, so resolving against the live start
+    pose at play time is a couple of vectorized operations.
+
+    Args:
+        name: Gesture name
+        times: Keyframe times in seconds, shape (K,), starting at 0
+        positions: Keyframe joint angles with NaN for start-pose values, shape (K, 6)
+        speed: Speed argument sent with each setpoint
+    """
+
+    def __init__(self, name: str, times: np.ndarray, positions: np.ndarray, speed: int):
+        self.name = name
+        self.times = times
+        self.positions = positions
+        self.speed = speed
+        self._sampling = {}
+
+    @property
+    def duration(self) -> float:
+        return float(self.times[-1])
+
+    def sampling(self, rate: float, tempo: float = 1.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get (cached) sample times, segment indices and blend weights.
+
+        Args:
+            rate: Control rate in Hz
+            tempo: Playback speed factor (2.0 plays twice as fast)
+
+        Returns:
+            Tuple of (sample times in playback seconds, segment index, blend weight)
+        """
+        _check_tempo(tempo)
+        key = (float(rate), float(tempo))
+        if key not in self._sampling:
+            playback = np.arange(0.0, self.duration / tempo, 1.0 / rate)
+            playback = np.append(playback, self.duration / tempo)
+            t = np.minimum(playback * tempo, self.duration)
+
+            segment = np.clip(np.searchsorted(self.times, t, side="right") - 1, 0, len(self.times) - 2)
+            span = self.times[segment + 1] - self.times[segment]
+            weight = _min_jerk(np.clip((t - self.times[segment]) / span, 0.0, 1.0))
+            self._sampling[key] = (playback, segment, weight)
+        return self._sampling[key]
+
+    def resolve(self, start_angles: Sequence[float], rate: float, tempo: float = 1.0
+                ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Produce the joint setpoints for a given start pose.
+
+        The setpoints are checked against the joint speed limit at the
+        requested tempo, including the blends from and back to the start pose.
+
+        Args:
+            start_angles: Joint angles the gesture starts from
+            rate: Control rate in Hz
+            tempo: Playback speed factor
+
+        Returns:
+            Tuple of (sample times in seconds, joint setpoints of shape (M, 6))
+
+        Raises:
+            ValueError: If the tempo is not positive or the joints would move too fast
+        """
+        start = np.asarray(start_angles, dtype=float)
+        keyframes = np.where(np.isnan(self.positions), start, self.positions)
+        playback, segment, weight = self.sampling(rate, tempo)
+        w = weight[:, None]
+        setpoints = keyframes[segment] * (1.0 - w) + keyframes[segment + 1] * w
+
+        peak = peak_joint_speed(setpoints, rate)
+        if peak > MAX_JOINT_SPEED:
+            raise ValueError(f"Gesture '{self.name}' at tempo {tempo} needs {peak:.0f} deg/s, "
+                             f"above the joint speed limit of {MAX_JOINT_SPEED:.0f} deg/s")
+        return playback, setpoints
+
+
+def compile_gesture(name: str, spec: Dict[str, Any]) -> CompiledTrajectory:
+    """
+    Compile a keyframe table into a trajectory.
+
+    Args:
+        name: Gesture name
+        spec: Dictionary with 'keyframes' and optional 'speed'
+
+    Returns:
+        CompiledTrajectory for the gesture
+    """
+    times = [0.0]
+    rows = [np.full(6, np.nan)]
+
+    for t, values in spec["keyframes"]:
+        if t <= times[-1]:
+            raise ValueError(f"Gesture '{name}': keyframe times must increase ({t} <= {times[-1]})")
+
+        if values == START_POSE:
+            row = np.full(6, np.nan)
+        else:
+            row = rows[-1].copy()
+            for joint_id, angle in values.items():
+                if joint_id < 1 or joint_id > 6:
+                    raise ValueError(f"Gesture '{name}': invalid joint id {joint_id}")
+                row[joint_id - 1] = angle
+
+        times.append(float(t))
+        rows.append(row)
+
+    times = np.array(times)
+    positions = np.array(rows)
+
+    # Minimum-jerk peak speed is 1.875 * distance / duration; only segments
+    # with both ends known at compile time can be checked here, the rest are
+    # checked on the resolved setpoints at play time
+    delta = np.abs(np.diff(positions, axis=0))
+    peak = 1.875 * delta / np.diff(times)[:, None]
+    if np.nanmax(np.where(np.isnan(peak), 0.0, peak)) > MAX_JOINT_SPEED:
+        raise ValueError(f"Gesture '{name}' exceeds the joint speed limit of {MAX_JOINT_SPEED} deg/s")
+
+    speed = spec.get("speed", ROBOT_CONFIG.get("default_speed", 40))
+    return CompiledTrajectory(name, times, positions, speed)
+
+
+class TrajectoryExecutor:
+    """
+    Streams joint setpoints to the arm on a fixed-rate schedule.
+
+    Setpoints are released against absolute deadlines on the robot's clock,
+    so serial latency does not accumulate into the timing. Late ticks are
+    counted as deadline misses, and a setpoint equal to the previous one is
+    not sent again. Every tick checks the execution context, so
+    a preempted trajectory stops within one control period.
+
+    Args:
+        robot: Robot connection (must expose send_angles and a clock)
+        rate: Control rate in Hz
+    """
+
+    def __init__(self, robot, rate: float = None):
+        self.robot = robot
+        self.rate = rate or ROBOT_CONFIG.get("control_rate", 20)
+
+    def run(self, times: np.ndarray, setpoints: np.ndarray, speed: int) -> Dict[str, float]:
+        """
+        Send each setpoint at its scheduled time.
+
+        Args:
+            times: Scheduled send times in seconds from start, shape (M,)
+            setpoints: Joint angles, shape (M, 6)
+            speed: Speed argument for send_angles
+
+        Returns:
+            Dictionary with sample count, commands sent, duration, deadline
+            misses and worst lateness
+        """
+        clock = self.robot.clock
+        context = get_context()
+        period = 1.0 / self.rate
+        t0 = clock.now()
+        misses = 0
+        max_late = 0.0
+        sent = 0
+        last = None
+
+        for t, angles in zip(times.tolist(), setpoints):
+            delay = t0 + t - clock.now()
+            if delay > 0:
+                context.sleep(delay, clock)
+            else:
+                context.check()
+                late = -delay
+                max_late = max(max_late, late)
+                if late > period:
+                    misses += 1
+            command = [round(float(a), 2) for a in angles]
+            if command == last:
+                # The arm is already holding this setpoint
+                continue
+            self.robot.send_angles(command, speed)
+            last = command
+            sent += 1
+
+        return {
+            "samples": len(times),
+            "commands": sent,
+            "duration": clock.now() - t0,
+            "deadline_misses": misses,
+            "max_lateness": max_late
+        }
+
+
+# Compiled gestures, filled by preload_gestures()
+_compiled = {}
+
+
+def preload_gestures(gestures: Optional[Dict[str, Dict[str, Any]]] = None,
+                     rate: float = None) -> List[str]:
+    """
+    Compile gestures and their default sampling tables ahead of time.
+
+    Args:
+        gestures: Keyframe tables to compile (defaults to GESTURES)
+        rate: Control rate to precompute sampling for
+
+    Returns:
+        Names of the compiled gestures
+    """
+    rate = rate or ROBOT_CONFIG.get("control_rate", 20)
+    for name, spec in (gestures or GESTURES).items():
+        trajectory = compile_gesture(name, spec)
+        trajectory.sampling(rate)
+        _compiled[name] = trajectory
+    return list(_compiled)
+
+
+def get_gesture(name: str) -> CompiledTrajectory:
+    """
+    Get a compiled gesture, compiling it on first use if needed.
+
+    Args:
+        name: Gesture name
+
+    Returns:
+        CompiledTrajectory for the gesture
+    """
+    if name not in _compiled:
+        if name not in GESTURES:
+            raise KeyError(f"Unknown gesture: {name}")
+        _compiled[name] = compile_gesture(name, GESTURES[name])
+    return _compiled[name]
+
+
+def play_gesture(robot, name: str, start_angles: Sequence[float], tempo: float = 1.0,
+                 rate: float = None) -> Dict[str, float]:
+    """
+    Play a gesture from the given start pose.
+
+    Args:
+        robot: Robot connection
+        name: Gesture name
+        start_angles: Current joint angles of the arm
+        tempo: Playback speed factor (2.0 plays twice as fast)
+        rate: Control rate in Hz
+
+    Returns:
+        Execution statistics from TrajectoryExecutor.run
+    """
+    executor = TrajectoryExecutor(robot, rate)
+    trajectory = get_gesture(name)
+    times, setpoints = trajectory.resolve(start_angles, executor.rate, tempo)
+    return executor.run(times, setpoints, trajectory.speed)
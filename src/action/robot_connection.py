@@ -0,0 +1,393 @@
+"""
+Robot Connection Module for Embodied Agent
+
+This module owns the single serial connection to the 6-DOF robotic arm.
+All modules share one broker that serializes commands through a priority
+queue on a dedicated thread, so concurrent callers never interleave frames
+on the port.
+
+"""
+
+import time
+import heapq
+import atexit
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Any, Dict, Optional
+
+# Assuming the MyCobot 280 Pi library is available
+try:
+    from pymycobot.mycobot import MyCobot
+    HARDWARE_AVAILABLE = True
+except ImportError:
+    print("Warning: MyCobot library not available. Running in simulation mode.")
+    HARDWARE_AVAILABLE = False
+
+# Import system configuration
+from config import ROBOT_CONFIG
+from action.simulator import SimClock, SimulatedMyCobot, SystemClock
+from action.execution import MotionCancelled, get_context
+
+# Command priorities (lower value is served first)
+PRIORITY_STOP = 0      # Emergency stop, pause, power off
+PRIORITY_MOVE = 10     # Motion and configuration commands
+PRIORITY_QUERY = 20    # State reads
+
+# Commands that must pre-empt everything already queued
+STOP_COMMANDS = {"stop", "pause", "power_off", "release_all_servos"}
+
+# Command name prefixes that move the arm (refused while halted)
+MOTION_PREFIXES = ("send_", "jog_")
+
+
+def command_priority(method: str) -> int:
+    """
+    Get the default priority for a MyCobot method name.
+
+    Args:
+        method: Name of the MyCobot method
+
+    Returns:
+        Queue priority for the command
+    """
+    if method in STOP_COMMANDS:
+        return PRIORITY_STOP
+    if method.startswith("get_") or method.startswith("is_"):
+        return PRIORITY_QUERY
+    return PRIORITY_MOVE
+
+
+class _Request:
+    """
+    A queued command and the future that receives its response.
+    """
+    __slots__ = ("priority", "seq", "method", "args", "kwargs", "future", "submitted")
+
+    def __init__(self, priority: int, seq: int, method: str, args: tuple, kwargs: dict):
+        self.priority = priority
+        self.seq = seq
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.submitted = time.monotonic()
+
+    def __lt__(self, other: "_Request") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RobotConnection:
+    """
+    Thread-safe command broker in front of a MyCobot-compatible backend.
+
+    Every command is tagged with a sequence number and resolved through its
+    own future, so responses are always matched to the caller that issued
+    the request. Attribute access is forwarded as a blocking call, which lets
+    the broker stand in for a MyCobot instance (``robot.get_angles()``).
+
+    Args:
+        backend: Object implementing the MyCobot API (real or simulated)
+        timeout: Default time in seconds to wait for a response
+    """
+
+    def __init__(self, backend, timeout: float = None):
+        self.backend = backend
+        # Motion timing follows the backend's clock (simulated or wall time)
+        self.clock = getattr(backend, "clock", None) or SystemClock()
+        self.timeout = timeout or ROBOT_CONFIG.get("command_timeout", 5.0)
+
+        self._heap = []
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._halted = False
+        self._thread = None
+
+        # Throughput and latency counters
+        self._stats_lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self._completed = 0
+        self._errors = 0
+        self._dropped = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+        self._total_service = 0.0
+        self._method_counts = {}
+
+        # Callbacks notified of every executed command (e.g. telemetry)
+        self._listeners = []
+
+    # ------------------------------------------------------------------
+    # Worker lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """
+        Start the worker thread that owns the serial port.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._closed = False
+        self._thread = threading.Thread(target=self._worker, name="robot-connection", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """
+        Stop the worker thread; queued requests are cancelled.
+
+        Args:
+            timeout: Maximum time to wait for the worker to exit
+        """
+        with self._cond:
+            self._closed = True
+            pending, self._heap = self._heap, []
+            self._cond.notify_all()
+        for request in pending:
+            request.future.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                request = heapq.heappop(self._heap)
+
+            if not request.future.set_running_or_notify_cancel():
+                continue
+
+            service_start = time.monotonic()
+            try:
+                result = getattr(self.backend, request.method)(*request.args, **request.kwargs)
+                request.future.set_result(result)
+                failed = False
+            except Exception as e:
+                request.future.set_exception(e)
+                failed = True
+            self._record(request, service_start, failed)
+            if not failed:
+                self._notify(request)
+
+    def _notify(self, request: _Request) -> None:
+        for listener in self._listeners:
+            try:
+                listener(request.method, request.args)
+            except Exception as e:
+                print(f"Error in robot command listener: {e}")
+
+    def _record(self, request: _Request, service_start: float, failed: bool) -> None:
+        now = time.monotonic()
+        latency = now - request.submitted
+        with self._stats_lock:
+            self._completed += 1
+            self._errors += int(failed)
+            self._total_latency += latency
+            self._max_latency = max(self._max_latency, latency)
+            self._total_service += now - service_start
+            self._method_counts[request.method] = self._method_counts.get(request.method, 0) + 1
+
+    # ------------------------------------------------------------------
+    # Command submission
+    # ------------------------------------------------------------------
+
+    def submit(self, method: str, *args, priority: Optional[int] = None, **kwargs) -> Future:
+        """
+        Queue a command without waiting for its response.
+
+        Stop-priority commands also drop every queued motion command, since
+        moves issued before a stop must not run after it.
+
+        Args:
+            method: Name of the MyCobot method to call
+            *args: Positional arguments for the method
+            priority: Queue priority; defaults to command_priority(method)
+            **kwargs: Keyword arguments for the method
+
+        Returns:
+            Future resolved with the method's return value
+        """
+        if priority is None:
+            priority = command_priority(method)
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Robot connection is closed")
+            if self._halted and method.startswith(MOTION_PREFIXES):
+                # A preempted plan unwinds with its own reason
+                get_context().check()
+                raise MotionCancelled(f"Robot is halted, refusing {method}")
+
+            dropped = []
+            if priority == PRIORITY_STOP:
+                dropped = [r for r in self._heap if r.priority == PRIORITY_MOVE]
+                if dropped:
+                    self._heap = [r for r in self._heap if r.priority != PRIORITY_MOVE]
+                    heapq.heapify(self._heap)
+
+            self._seq += 1
+            request = _Request(priority, self._seq, method, args, kwargs)
+            heapq.heappush(self._heap, request)
+            self._cond.notify()
+
+        for r in dropped:
+            r.future.cancel()
+        if dropped:
+            with self._stats_lock:
+                self._dropped += len(dropped)
+
+        return request.future
+
+    def call(self, method: str, *args, priority: Optional[int] = None,
+             timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Queue a command and block until its response arrives.
+
+        Args:
+            method: Name of the MyCobot method to call
+            *args: Positional arguments for the method
+            priority: Queue priority; defaults to command_priority(method)
+            timeout: Seconds to wait for the response; None uses the default
+            **kwargs: Keyword arguments for the method
+
+        Returns:
+            The method's return value
+
+        Raises:
+            MotionCancelled: The command was refused or dropped by a halt()
+        """
+        future = self.submit(method, *args, priority=priority, **kwargs)
+        try:
+            return future.result(timeout if timeout is not None else self.timeout)
+        except CancelledError:
+            pass
+        # Queued moves are dropped when a stop jumps the queue
+        get_context().check()
+        raise MotionCancelled(f"{method} dropped by a stop")
+
+    def halt(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the arm now and refuse further motion until resume().
+
+        The stop command jumps the queue and drops queued moves; motion
+        commands submitted afterwards raise MotionCancelled, so a plan that
+        is still unwinding cannot start the arm again.
+
+        Args:
+            timeout: Seconds to wait for the stop to be acknowledged
+        """
+        with self._cond:
+            self._halted = True
+        self.call("stop", timeout=timeout)
+
+    def resume(self) -> None:
+        """
+        Accept motion commands again after halt().
+        """
+        with self._cond:
+            self._halted = False
+
+    @property
+    def halted(self) -> bool:
+        return self._halted
+
+    def add_listener(self, listener) -> None:
+        """
+        Register a callback run on the worker thread after each executed command.
+
+        Args:
+            listener: Callable taking (method name, positional arguments); must be cheap
+        """
+        self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener) -> None:
+        """
+        Unregister a callback added with add_listener().
+        """
+        self._listeners = [l for l in self._listeners if l != listener]
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes not defined on the broker itself
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if not callable(getattr(self.backend, name, None)):
+            raise AttributeError(f"Robot backend has no command '{name}'")
+
+        def command(*args, **kwargs):
+            return self.call(name, *args, **kwargs)
+
+        command.__name__ = name
+        return command
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get throughput and latency counters for the connection.
+
+        Returns:
+            Dictionary with command counts, rates and latencies (seconds)
+        """
+        with self._cond:
+            queue_depth = len(self._heap)
+        with self._stats_lock:
+            elapsed = max(time.monotonic() - self._started_at, 1e-9)
+            completed = self._completed
+            return {
+                "completed": completed,
+                "errors": self._errors,
+                "dropped": self._dropped,
+                "queue_depth": queue_depth,
+                "commands_per_second": completed / elapsed,
+                "mean_latency": self._total_latency / completed if completed else 0.0,
+                "max_latency": self._max_latency,
+                "mean_service_time": self._total_service / completed if completed else 0.0,
+                "per_method": dict(self._method_counts)
+            }
+
+
+# Shared connection instance
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def get_connection() -> Optional[RobotConnection]:
+    """
+    Get the shared robot connection, opening the serial port on first use.
+
+    Returns:
+        The shared RobotConnection, or None if no robot is available
+    """
+    global _connection
+
+    backend_name = ROBOT_CONFIG.get("backend", "auto")
+
+    with _connection_lock:
+        if _connection is not None:
+            return _connection
+
+        try:
+            if backend_name == "sim":
+                clock = SimClock(realtime=ROBOT_CONFIG.get("sim_realtime", False))
+                backend = SimulatedMyCobot(clock, ROBOT_CONFIG.get("sim_serial_latency", 0.0))
+                print("Using simulated robot arm.")
+            elif HARDWARE_AVAILABLE:
+                backend = MyCobot(ROBOT_CONFIG.get("port", "/dev/ttyAMA0"),
+                                  ROBOT_CONFIG.get("baudrate", 1000000))
+                print("Robot connection established.")
+            else:
+                return None
+
+            _connection = RobotConnection(backend)
+            _connection.start()
+            atexit.register(_connection.close)
+        except Exception as e:
+            print(f"Error connecting to robot: {e}")
+            return None
+
+    return _connection
@@ -7,31 +7,111 @@ including basic movements, joint control, and predefined motion sequences.
 """
 
 import time
+import atexit
 import numpy as np
 from typing import Tuple, List, Optional, Dict, Any
 
-# Assuming the MyCobot 280 Pi library is available
-try:
-    from pymycobot.mycobot import MyCobot
-    HARDWARE_AVAILABLE = True
-except ImportError:
-    print("Warning: MyCobot library not available. Running in simulation mode.")
-    HARDWARE_AVAILABLE = False
-
 # Import system configuration
-from config import ROBOT_CONFIG
+from config import ROBOT_CONFIG, CAMERA_CONFIG, WORKSPACE_CONFIG, TELEMETRY_CONFIG
+from action.robot_connection import get_connection
+from action.robot_state import RobotStateCache
+from action.kinematics import inverse_kinematics
+from action.ik_table import get_ik_table
+from action.motion_primitives import TrajectoryExecutor, play_gesture, preload_gestures
+from action.sequencing import order_tasks
+from action.execution import get_context, new_context
+from action.workspace import OccupancyGrid
+from action.telemetry import TelemetryRecorder, new_session_directory
+
+# Share the single serial connection to the arm with the other modules
+robot = get_connection()
+HARDWARE_AVAILABLE = robot is not None
 
-# Initialize the robot connection
-# For actual hardware, replace with your serial port
 if HARDWARE_AVAILABLE:
+    # Poll joints and coordinates in the background so motion
+    # primitives do not pay a serial round trip before each move
+    state_cache = RobotStateCache(robot)
+    state_cache.start()
+    # Compile the gesture trajectories once at startup
+    preload_gestures()
+else:
+    state_cache = None
+
+telemetry = None
+if HARDWARE_AVAILABLE and TELEMETRY_CONFIG["enabled"]:
+    # Record measured and commanded joint angles for post-mortem analysis
+    telemetry = TelemetryRecorder(robot, state_cache, directory=new_session_directory())
+    telemetry.start()
+    atexit.register(telemetry.stop)
+
+# Obstacles known from the last scene observation, used to plan transit heights
+workspace = OccupancyGrid()
+
+# Height of the object hanging below the suction cup while one is carried
+_payload_height = 0.0
+
+
+def _wait(seconds: float) -> None:
+    """
+    Wait for a motion to settle on the robot's clock.
+
+    On hardware this is a plain sleep; with the simulator it advances the
+    simulated clock so motion timing stays faithful. The wait goes through
+    the execution context and raises MotionCancelled if the plan is
+    preempted meanwhile.
+    """
+    get_context().sleep(seconds, robot.clock if robot is not None else None)
+
+
+def preempt_motion(reason: str = "stop") -> Dict[str, Optional[float]]:
+    """
+    Preempt the running plan and put the arm and pump into a safe state.
+    
+    The arm is halted through the connection broker (stop jumps the queue and
+    further motion is refused) and the pump is switched off.
+    
+    Args:
+        reason: Why the plan is being preempted (e.g. "stop", "new instruction")
+        
+    Returns:
+        Dictionary with 'safe_state_latency' (until arm and pump are safe) and
+        'abort_latency' (until the running step unwound, None if nothing was running)
+    """
+    from action.actuators import pump_off
+    
+    context = get_context()
+    context.cancel(reason)
+    
     try:
-        robot = MyCobot("/dev/ttyAMA0", 1000000)
-        print("Robot connection established.")
+        if robot is not None:
+            robot.halt()
     except Exception as e:
-        print(f"Error connecting to robot: {e}")
-        HARDWARE_AVAILABLE = False
-else:
-    robot = None
+        print(f"Error stopping robot: {e}")
+    pump_off()
+    safe_state_latency = time.monotonic() - context.requested_at
+    
+    # The running step notices within one control period
+    abort_latency = None
+    if context.wait_acknowledged(timeout=4 * context.control_period):
+        abort_latency = context.acknowledged_at - context.requested_at
+    
+    print(f"Motion preempted ({reason}): safe state after {safe_state_latency * 1000:.1f} ms")
+    return {"safe_state_latency": safe_state_latency, "abort_latency": abort_latency}
+
+
+def resume_motion() -> None:
+    """
+    Start a fresh execution context and accept motion commands again.
+    
+    The workspace map is dropped as well, since the scene may have changed
+    between plans; until it is observed again moves use the safe height.
+    """
+    global _payload_height
+    new_context()
+    workspace.clear()
+    _payload_height = 0.0
+    if robot is not None:
+        robot.resume()
 
 
 def back_to_zero() -> None:
@@ -48,7 +128,7 @@ def back_to_zero() -> None:
         # Set all 6 joints to their zero positions
         robot.send_angles([0, 0, 0, 0, 0, 0], ROBOT_CONFIG["default_speed"])
         # Wait for movement to complete
-        time.sleep(2)
+        _wait(2)
         print("Robot returned to zero position.")
     except Exception as e:
         print(f"Error returning to zero: {e}")
@@ -69,117 +149,176 @@ def release_servos() -> None:
         print(f"Error releasing servos: {e}")
 
 
-def head_shake() -> None:
+def head_shake(tempo: float = 1.0) -> None:
     """
     Perform a head shake motion (left-right movement).
+    
+    Args:
+        tempo: Playback speed factor (2.0 shakes twice as fast)
     """
     if not HARDWARE_AVAILABLE:
         print("[SIM] Performing head shake motion")
         return
     
     try:
-        # Store current position
-        current_angles = robot.get_angles()
-        
-        # Head shake motion (moving joint 1 left and right)
-        for _ in range(2):  # Shake twice
-            # Move left
-            robot.send_angle(1, 30, 20)
-            time.sleep(0.5)
-            # Move right
-            robot.send_angle(1, -30, 20)
-            time.sleep(0.5)
-        
-        # Return to original position
-        robot.send_angles(current_angles, 20)
-        time.sleep(1)
+        # Play the keyframed gesture from the current position and back
+        current_angles = state_cache.get_angles()
+        play_gesture(robot, "head_shake", current_angles, tempo)
         
         print("Head shake completed.")
     except Exception as e:
         print(f"Error in head shake: {e}")
 
 
-def head_nod() -> None:
+def head_nod(tempo: float = 1.0) -> None:
     """
     Perform a head nod motion (up-down movement).
+    
+    Args:
+        tempo: Playback speed factor (2.0 nods twice as fast)
     """
     if not HARDWARE_AVAILABLE:
         print("[SIM] Performing head nod motion")
         return
     
     try:
-        # Store current position
-        current_angles = robot.get_angles()
-        
-        # Head nod motion (moving joint 2 up and down)
-        for _ in range(2):  # Nod twice
-            # Move up
-            robot.send_angle(2, -20, 20)
-            time.sleep(0.5)
-            # Move down
-            robot.send_angle(2, 20, 20)
-            time.sleep(0.5)
-        
-        # Return to original position
-        robot.send_angles(current_angles, 20)
-        time.sleep(1)
+        # Play the keyframed gesture from the current position and back
+        current_angles = state_cache.get_angles()
+        play_gesture(robot, "head_nod", current_angles, tempo)
         
         print("Head nod completed.")
     except Exception as e:
         print(f"Error in head nod: {e}")
 
 
-def head_dance() -> None:
+def head_dance(tempo: float = 1.0) -> None:
     """
     Perform a dance motion combining multiple joint movements.
+    
+    Args:
+        tempo: Playback speed factor (2.0 dances twice as fast)
     """
     if not HARDWARE_AVAILABLE:
         print("[SIM] Performing dance motion sequence")
         return
     
     try:
-        # Store current position
-        current_angles = robot.get_angles()
-        
-        # Set a faster speed for the dance
-        robot.set_speed(60)
-        
-        # Sequence of dance moves
-        # Move joint 1 (base rotation)
-        robot.send_angle(1, 45, 60)
-        time.sleep(0.5)
-        robot.send_angle(1, -45, 60)
-        time.sleep(0.5)
-        
-        # Move joints 2 and 3 (arm positions)
-        robot.send_angle(2, 30, 60)
-        time.sleep(0.3)
-        robot.send_angle(3, -30, 60)
-        time.sleep(0.3)
-        
-        # Rotate gripper (joint 6)
-        robot.send_angle(6, 90, 60)
-        time.sleep(0.3)
-        robot.send_angle(6, -90, 60)
-        time.sleep(0.3)
-        
-        # Return to original position
-        robot.send_angles(current_angles, 40)
-        time.sleep(1)
+        # Play the keyframed gesture from the current position and back
+        current_angles = state_cache.get_angles()
+        play_gesture(robot, "head_dance", current_angles, tempo)
         
         print("Dance sequence completed.")
     except Exception as e:
         print(f"Error in dance sequence: {e}")
 
 
-def move_to_coords(X: float, Y: float, Z: Optional[float] = None) -> None:
+def _transit_path(current: List[float], X: float, Y: float, Z: float) -> List[List[float]]:
+    """
+    Plan the tool positions of a move: climb, traverse, descend.
+    
+    The traverse runs at the lowest height that clears the mapped obstacles
+    along the way (the safe height if the workspace has not been mapped).
+    Moves without lateral travel go straight to the target, and climbs or
+    descents that are not needed are left out. A tool already above the
+    transit height moves across and down in one straight segment, which
+    stays above the transit height the whole way.
+    
+    Args:
+        current: Current tool position [x, y, z] in mm
+        X, Y, Z: Target position in mm
+        
+    Returns:
+        Tool positions [x, y, z] to visit in order, ending at the target
+    """
+    if np.hypot(X - current[0], Y - current[1]) < 1.0:
+        return [[X, Y, Z]]
+    
+    transit = max(workspace.transit_height(current[:2], [X, Y], _payload_height), Z)
+    path = []
+    if transit > current[2]:
+        path.append([current[0], current[1], transit])
+    path.append([X, Y, transit])
+    if Z < transit:
+        path.append([X, Y, Z])
+    return path
+
+
+def _travel_time(start: List[float], end: List[float]) -> float:
+    """
+    Time for a coordinate move between two tool positions to complete and settle.
+    """
+    speed = ROBOT_CONFIG["max_linear_speed"] * ROBOT_CONFIG["coordinate_speed"] / 100.0
+    distance = float(np.linalg.norm(np.subtract(end[:3], start[:3])))
+    return distance / speed + ROBOT_CONFIG["settle_time"]
+
+
+def _stream_path(start: List[float], path: List[List[float]]) -> bool:
+    """
+    Follow straight tool segments with joint setpoints from the IK table.
+    
+    The segments are sampled at the control rate at the coordinate speed,
+    converted to joint angles by one vectorized table lookup and streamed
+    with the trajectory executor, so no inverse kinematics runs online.
+    The first setpoint must match the current joint angles; if the table
+    holds a different IK branch, streaming would jump the joints within one
+    control period, so the move is left to coordinate commands instead.
+    
+    Args:
+        start: Current tool position [x, y, z] in mm
+        path: Tool positions [x, y, z] to visit in order
+        
+    Returns:
+        True if the path was executed, False if the table does not cover it
+        or does not start from the arm's current joint angles
+    """
+    table = get_ik_table()
+    if table is None:
+        return False
+    
+    points = np.vstack([start, path]).astype(float)
+    arc = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(points, axis=0), axis=1))])
+    speed = ROBOT_CONFIG["max_linear_speed"] * ROBOT_CONFIG["coordinate_speed"] / 100.0
+    executor = TrajectoryExecutor(robot)
+    
+    times = np.append(np.arange(0.0, arc[-1] / speed, 1.0 / executor.rate), arc[-1] / speed)
+    samples = np.column_stack([np.interp(times * speed, arc, points[:, k]) for k in range(3)])
+    setpoints, ok = table.lookup(samples)
+    if not ok.all():
+        return False
+    
+    current = state_cache.get_angles()
+    if current is None:
+        return False
+    jump = float(np.abs(setpoints[0] - np.asarray(current, dtype=float)).max())
+    if jump > WORKSPACE_CONFIG["ik_table_max_jump"]:
+        print(f"IK table starts {jump:.1f} deg away from the current joint angles, moving by coordinates")
+        return False
+    
+    executor.run(times, setpoints, ROBOT_CONFIG["default_speed"])
+    _wait(ROBOT_CONFIG["settle_time"])
+    return True
+
+
+def move_to_coords(X: float, Y: float, Z: Optional[float] = None,
+                   orientation: Optional[List[float]] = None) -> Optional[str]:
     """
     Move to specific XYZ coordinates.
     
+    Lateral moves travel at the lowest collision-free height from the
+    workspace map rather than always climbing to the safe height. All
+    waypoints are checked with inverse kinematics first, so an unreachable
+    target is rejected before the arm moves at all. Moves at the tool-down
+    orientation are streamed as joint setpoints from the precomputed IK
+    table; other moves are sent as coordinates.
+    
     Args:
         X: X-coordinate (mm)
         Y: Y-coordinate (mm)
         Z: Z-coordinate (mm), if None, keeps current Z
+        orientation: Tool orientation [rx, ry, rz] (deg), if None, keeps current orientation
+        
+    Returns:
+        Error message if the move failed or the target is unreachable, otherwise None
     """
     if not HARDWARE_AVAILABLE:
         print(f"[SIM] Moving to coordinates X:{X}, Y:{Y}, Z:{Z if Z else 'current'}")
@@ -187,32 +326,43 @@ def move_to_coords(X: float, Y: float, Z: Optional[float] = None) -> None:
     
     try:
         # Get current position
-        current_coords = robot.get_coords()
+        current_coords = state_cache.get_coords()
+        current_orientation = list(current_coords[3:6])
+        if orientation is None:
+            orientation = current_orientation
+        orientation = list(orientation)
         
         # Use current Z if not specified
         if Z is None:
             Z = current_coords[2]
         
-        # First move up to safe height to avoid collisions
-        safe_coords = [current_coords[0], current_coords[1], ROBOT_CONFIG["safe_height"], 
-                       current_coords[3], current_coords[4], current_coords[5]]
-        robot.send_coords(safe_coords, ROBOT_CONFIG["coordinate_speed"])
-        time.sleep(1.5)
-        
-        # Then move to target XY at safe height
-        target_safe_coords = [X, Y, ROBOT_CONFIG["safe_height"], 
-                             current_coords[3], current_coords[4], current_coords[5]]
-        robot.send_coords(target_safe_coords, ROBOT_CONFIG["coordinate_speed"])
-        time.sleep(1.5)
-        
-        # Finally move down to target Z
-        target_coords = [X, Y, Z, current_coords[3], current_coords[4], current_coords[5]]
-        robot.send_coords(target_coords, ROBOT_CONFIG["coordinate_speed"])
-        time.sleep(1.5)
+        # Waypoints: up to transit height, across, down to target Z
+        path = _transit_path(list(current_coords[:3]), X, Y, Z)
+        
+        # Reject unreachable targets before any motion
+        if not _reachable(path, orientation).all():
+            message = f"Target X:{X}, Y:{Y}, Z:{Z} is out of reach"
+            print(message)
+            return message
+        
+        # Stream joint setpoints when the table covers the whole move
+        table = get_ik_table()
+        streamed = (table is not None and table.matches(orientation) and
+                    table.matches(current_orientation) and
+                    _stream_path(list(current_coords[:3]), path))
+        
+        if not streamed:
+            # Wait for each segment according to its length
+            position = list(current_coords[:3])
+            for point in path:
+                robot.send_coords(point + orientation, ROBOT_CONFIG["coordinate_speed"])
+                _wait(_travel_time(position, point))
+                position = point
         
         print(f"Moved to coordinates X:{X}, Y:{Y}, Z:{Z}")
     except Exception as e:
         print(f"Error moving to coordinates: {e}")
+        return f"Error moving to coordinates: {e}"
 
 
 def rotate_joint(joint_num: int, angle: float) -> None:
@@ -233,9 +383,9 @@ def rotate_joint(joint_num: int, angle: float) -> None:
             print(f"Invalid joint number: {joint_num}. Must be between 1-6.")
             return
             
-        # Joint numbers in the library are 0-indexed
-        robot.send_angle(joint_num - 1, angle, ROBOT_CONFIG["default_speed"])
-        time.sleep(1)
+        # Joint ids in the library are 1-indexed like ours
+        robot.send_angle(joint_num, angle, ROBOT_CONFIG["default_speed"])
+        _wait(1)
         
         print(f"Joint {joint_num} rotated to {angle} degrees.")
     except Exception as e:
@@ -256,7 +406,7 @@ def move_to_overhead_view() -> None:
         overhead_angles = [0, 30, -30, 0, 90, 0]  # Example angles
         
         robot.send_angles(overhead_angles, ROBOT_CONFIG["default_speed"])
-        time.sleep(2)
+        _wait(2)
         
         print("Moved to overhead viewing position.")
     except Exception as e:
@@ -275,7 +425,7 @@ def capture_overhead_image() -> str:
     try:
         # First move to a good position for taking photos
         move_to_overhead_view()
-        time.sleep(1)
+        _wait(1)
         
         # Capture the image
         image_path = capture_image()
@@ -305,6 +455,144 @@ def check_camera() -> None:
         print(f"Error displaying camera feed: {e}")
 
 
+def _reachable(points, orientation: Optional[List[float]] = None) -> np.ndarray:
+    """
+    Check tool positions for reachability at a tool orientation.
+    
+    Positions covered by the IK table are answered from it; only the rest
+    are solved online.
+    
+    Args:
+        points: Tool positions [x, y, z] in mm, shape (N, 3)
+        orientation: Tool orientation [rx, ry, rz] (deg), defaults to the current one
+        
+    Returns:
+        Boolean mask of reachable positions
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    if orientation is None:
+        orientation = state_cache.get_coords()[3:6]
+    orientation = np.asarray(orientation, dtype=float)
+    
+    reachable = np.zeros(len(points), dtype=bool)
+    table = get_ik_table()
+    if table is not None and table.matches(orientation):
+        _, reachable = table.lookup(points)
+    
+    remaining = ~reachable
+    if remaining.any():
+        poses = np.hstack([points, np.tile(orientation, (len(points), 1))])
+        angles, solved = inverse_kinematics(poses[remaining], seed=state_cache.get_angles())
+        reachable[remaining] = solved
+        
+        # Retry misses seeded from the solution of the nearest solved point,
+        # since waypoints of one move lie close together in joint space
+        retry = np.flatnonzero(remaining)[~solved]
+        found = np.flatnonzero(remaining)[solved]
+        if retry.size and found.size:
+            distance = np.linalg.norm(points[retry, None] - points[None, found], axis=2)
+            seeds = angles[solved][np.argmin(distance, axis=1)]
+            _, solved = inverse_kinematics(poses[retry], seed=seeds)
+            reachable[retry] = solved
+    return reachable
+
+
+def _pick_place_waypoints(source: Dict[str, float], target: Dict[str, float]) -> List[List[float]]:
+    """
+    List every tool position visited by a pick-and-place move.
+    """
+    carry = workspace.transit_height([source["x"], source["y"]], [target["x"], target["y"]],
+                                     CAMERA_CONFIG["object_height"])
+    carry = max(carry, source["z"] + 50, target["z"] + 50)
+    return [
+        [source["x"], source["y"], source["z"] + 50],
+        [source["x"], source["y"], source["z"] + 10],
+        [source["x"], source["y"], carry],
+        [target["x"], target["y"], carry],
+        [target["x"], target["y"], target["z"] + 50],
+        [target["x"], target["y"], target["z"] + 20]
+    ]
+
+
+def _map_workspace(tasks: List[Dict[str, Any]]) -> None:
+    """
+    Rebuild the workspace map from the objects and destinations of the tasks.
+    
+    Each object and destination becomes a box with the configured footprint
+    reaching from the table up to its located height. Objects located at the
+    assumed object height stay below the clutter floor, so the map raises
+    transits only over taller items, such as objects stacked by a placement.
+    """
+    size = [WORKSPACE_CONFIG["object_size"]] * 2
+    workspace.clear()
+    for task in tasks:
+        for place in (task["source"], task["target"]):
+            height = place["z"] - CAMERA_CONFIG["table_height"]
+            if height > 0:
+                workspace.add_box([place["x"], place["y"]], size, height)
+    workspace.mark_mapped()
+
+
+def _pick_and_place(source: Dict[str, float], target: Dict[str, float]) -> Optional[str]:
+    """
+    Pick an object up with the vacuum pump and put it down elsewhere.
+    
+    Every waypoint is checked before the arm moves, so an object is never
+    picked up unless it can also be put down. The workspace map follows the
+    object from its source to its destination.
+    
+    Args:
+        source: Robot coordinates {'x', 'y', 'z'} of the object
+        target: Robot coordinates {'x', 'y', 'z'} of the destination
+        
+    Returns:
+        Error message if the move is unreachable, otherwise None
+    """
+    global _payload_height
+    from action.actuators import pump_on, pump_off
+    
+    tool_down = WORKSPACE_CONFIG["tool_orientation"]
+    if not _reachable(_pick_place_waypoints(source, target), tool_down).all():
+        message = "The object or its destination is out of reach"
+        print(message)
+        return message
+    
+    size = [WORKSPACE_CONFIG["object_size"]] * 2
+    object_height = CAMERA_CONFIG["object_height"]
+    
+    # 1. Move to source position
+    for z in (source["z"] + 50, source["z"] + 10):
+        error = move_to_coords(X=source["x"], Y=source["y"], Z=z, orientation=tool_down)
+        if error:
+            return error
+    
+    # 2. Activate vacuum pump to pick up the object
+    pump_on()
+    _wait(1)
+    workspace.remove_box([source["x"], source["y"]], size, object_height,
+                         base=source["z"] - object_height)
+    _payload_height = object_height
+    
+    try:
+        # 3. Lift the object, 4. move to target position
+        for point in ((source["x"], source["y"], source["z"] + 50),
+                      (target["x"], target["y"], target["z"] + 50),
+                      (target["x"], target["y"], target["z"] + 20)):
+            error = move_to_coords(X=point[0], Y=point[1], Z=point[2], orientation=tool_down)
+            if error:
+                print("Move failed while carrying the object, releasing it where the arm stopped")
+                return error
+    finally:
+        # 5. Release the object
+        pump_off()
+        _payload_height = 0.0
+    _wait(1)
+    workspace.add_box([target["x"], target["y"]], size, object_height, base=target["z"])
+    
+    # 6. Move away
+    return move_to_coords(X=target["x"], Y=target["y"], Z=target["z"] + 50, orientation=tool_down)
+
+
 def move_object(instruction: str) -> str:
     """
     Move an object based on a natural language instruction.
@@ -320,17 +608,19 @@ def move_object(instruction: str) -> str:
         return "Object movement simulated"
     
     try:
-        from perception.vision import locate_objects
+        from perception.vision import capture_image
+        from models.llm_interface import query_vision_api
         from agent.agent_coordinator import parse_visual_instruction
         
         # First take a photo to see the scene
         move_to_overhead_view()
-        time.sleep(1)
+        _wait(1)
         
-        # Analyze the scene to locate objects
-        scene_objects = locate_objects()
+        # Analyze the scene to locate the objects in pixel coordinates
+        image_path = capture_image()
+        scene_objects = query_vision_api(instruction, image_path, vision_option=0)
         
-        # Parse the instruction to determine source and target
+        # Parse the instruction to determine source and target robot coordinates
         movement_plan = parse_visual_instruction(instruction, scene_objects)
         
         if not movement_plan:
@@ -344,29 +634,10 @@ def move_object(instruction: str) -> str:
             return "I couldn't identify the source or target objects."
         
         # Execute the movement
-        # 1. Move to source position
-        move_to_coords(X=source["x"], Y=source["y"], Z=source["z"] + 50)
-        move_to_coords(X=source["x"], Y=source["y"], Z=source["z"] + 10)
-        
-        # 2. Activate vacuum pump to pick up the object
-        from action.actuators import pump_on
-        pump_on()
-        time.sleep(1)
-        
-        # 3. Lift the object
-        move_to_coords(X=source["x"], Y=source["y"], Z=source["z"] + 50)
-        
-        # 4. Move to target position
-        move_to_coords(X=target["x"], Y=target["y"], Z=target["z"] + 50)
-        move_to_coords(X=target["x"], Y=target["y"], Z=target["z"] + 20)
-        
-        # 5. Release the object
-        from action.actuators import pump_off
-        pump_off()
-        time.sleep(1)
-        
-        # 6. Move away
-        move_to_coords(X=target["x"], Y=target["y"], Z=target["z"] + 50)
+        _map_workspace([movement_plan])
+        error = _pick_and_place(source, target)
+        if error:
+            return error
         
         return f"Successfully moved the object as instructed."
     except Exception as e:
@@ -374,6 +645,74 @@ def move_object(instruction: str) -> str:
         return f"Error occurred during object movement: {str(e)}"
 
 
+def move_objects(instruction: str) -> str:
+    """
+    Move several objects based on one natural language instruction.
+    
+    The scene is imaged and localized with a single vision call, unreachable
+    tasks are dropped, and the remaining pick-and-place tasks are ordered to
+    minimize travel before running back to back without re-imaging.
+    
+    Args:
+        instruction: Natural language instruction (e.g., "Put all the blocks in the bowl")
+        
+    Returns:
+        Result message
+    """
+    if not HARDWARE_AVAILABLE:
+        print(f"[SIM] Moving objects: {instruction}")
+        return "Object movements simulated"
+    
+    try:
+        from perception.vision import capture_image
+        from models.llm_interface import query_vision_api
+        from agent.agent_coordinator import parse_visual_instructions
+        
+        # Image the scene once and localize every object in one vision call
+        move_to_overhead_view()
+        _wait(1)
+        image_path = capture_image()
+        detections = query_vision_api(instruction, image_path, vision_option=2)
+        tasks = parse_visual_instructions(instruction, detections)
+        
+        if not tasks:
+            return "I couldn't identify any objects to move."
+        
+        # Map the located objects so transits stay low where the table is clear
+        _map_workspace(tasks)
+        
+        # Check every waypoint of every task in one IK batch before moving anything
+        waypoints = [p for t in tasks for p in _pick_place_waypoints(t["source"], t["target"])]
+        reachable = _reachable(waypoints, WORKSPACE_CONFIG["tool_orientation"]).reshape(len(tasks), -1).all(axis=1)
+        skipped = [t["start_object"] for t, ok in zip(tasks, reachable) if not ok]
+        tasks = [t for t, ok in zip(tasks, reachable) if ok]
+        
+        if not tasks:
+            return "None of the objects are within reach."
+        
+        # Order the tasks to minimize empty travel between them
+        picks = np.array([[t["source"]["x"], t["source"]["y"]] for t in tasks])
+        places = np.array([[t["target"]["x"], t["target"]["y"]] for t in tasks])
+        order = order_tasks(picks, places, start=state_cache.get_coords()[:2])
+        
+        moved = 0
+        for i in order:
+            print(f"Moving {tasks[i]['start_object']} to {tasks[i]['end_object']}")
+            error = _pick_and_place(tasks[i]["source"], tasks[i]["target"])
+            if error:
+                skipped.append(tasks[i]["start_object"])
+            else:
+                moved += 1
+        
+        result = f"Successfully moved {moved} objects as instructed."
+        if skipped:
+            result += f" Could not reach: {', '.join(skipped)}."
+        return result
+    except Exception as e:
+        print(f"Error moving objects: {e}")
+        return f"Error occurred during object movement: {str(e)}"
+
+
 def visual_qa(query: str) -> str:
     """
     Answer a visual question about the scene.
@@ -389,7 +728,7 @@ def visual_qa(query: str) -> str:
         
         # First take a photo to see the scene
         move_to_overhead_view()
-        time.sleep(1)
+        _wait(1)
         
         # Capture an image of the scene
         from perception.vision import capture_image
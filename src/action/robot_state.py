@@ -0,0 +1,300 @@
+"""
+Robot State Cache Module for Embodied Agent
+
+This module keeps a background copy of the arm's joint angles and Cartesian
+coordinates. A single poller thread reads the state over the serial link at a
+fixed rate, so motion primitives can read the latest snapshot instead of paying
+a full serial round trip before every move. Cached readings are invalidated
+by every command that can move the arm.
+
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, NamedTuple, Optional
+
+# Import system configuration
+from config import ROBOT_CONFIG
+
+
+class RobotState(NamedTuple):
+    """
+    Timestamped snapshot of the arm state.
+    """
+    angles: Optional[List[float]]   # Joint angles in degrees (J1-J6)
+    coords: Optional[List[float]]   # [x, y, z, rx, ry, rz] in mm / degrees
+    timestamp: float                # Robot clock time of the read
+
+
+def _valid_reading(values) -> bool:
+    """
+    Check whether a value returned by the arm is a usable 6-element reading.
+
+    The MyCobot library returns an empty list or -1 when a read times out.
+    """
+    return isinstance(values, (list, tuple)) and len(values) == 6
+
+
+class _Reading:
+    """
+    Latest reading of one kind of state and what is known about its validity.
+    """
+    __slots__ = ("values", "time", "command_seq", "still")
+
+    def __init__(self):
+        self.values = None      # Latest valid reading
+        self.time = 0.0         # Robot clock time of the read
+        self.command_seq = -1   # Commands executed before the read started
+        self.still = False      # Equal to the previous reading taken after the same command
+
+
+class RobotStateCache:
+    """
+    Polls the arm state on one background thread and serves cached reads.
+
+    A reading stays valid until the arm may have moved, not for a fixed
+    time. Every command other than a query invalidates the cache, and after
+    a command a reading is only served once the arm has been seen standing
+    still (two equal readings at different robot times) or the robot clock
+    has not advanced since the read. Reading times and the freshness check
+    both use the robot's clock, so simulated time is judged like wall time.
+
+    Args:
+        robot: Robot connection; commands are observed through its add_listener
+        poll_rate: Polling frequency in Hz
+        max_age: Upper bound in seconds on the age of a cached read, even of a still arm
+        tolerance: Largest change between readings counted as standing still
+    """
+
+    def __init__(self, robot, poll_rate: float = None, max_age: float = None,
+                 tolerance: float = None):
+        self.robot = robot
+        self._now = getattr(getattr(robot, "clock", None), "now", time.monotonic)
+        self.poll_rate = poll_rate or ROBOT_CONFIG.get("state_poll_rate", 10)
+        self.max_age = max_age if max_age is not None else ROBOT_CONFIG.get("state_max_age", 2.0)
+        self.tolerance = tolerance if tolerance is not None else ROBOT_CONFIG.get("state_still_tolerance", 0.5)
+
+        self._lock = threading.Lock()
+        self._angles = _Reading()
+        self._coords = _Reading()
+        self._command_seq = 0
+
+        if hasattr(robot, "add_listener"):
+            robot.add_listener(self._on_command)
+
+        # Callbacks given every joint angle reading (e.g. telemetry)
+        self._listeners = []
+
+        self._stop_event = threading.Event()
+        self._paused = threading.Event()
+        self._thread = None
+
+        # Counters for checking how much serial traffic the cache saves
+        self.polls = 0
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Poller lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """
+        Start the background poller thread (no-op if already running).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._poll_loop, name="robot-state-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """
+        Stop the background poller thread.
+
+        Args:
+            timeout: Maximum time to wait for the thread to exit
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """
+        Suspend background polling while another loop reads the arm.
+
+        That loop should pass its joint readings to record_angles(), so the
+        cache and its listeners stay current without a second poller on the
+        serial link.
+        """
+        self._paused.set()
+        try:
+            yield
+        finally:
+            self._paused.clear()
+
+    def add_listener(self, listener: Callable[[List[float], float, float], None]) -> None:
+        """
+        Register a callback given every valid joint angle reading.
+
+        Args:
+            listener: Callable taking (angles, robot clock time of the read,
+                read latency in seconds); runs on the reading thread and must be cheap
+        """
+        self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener) -> None:
+        """
+        Unregister a callback added with add_listener().
+        """
+        self._listeners = [l for l in self._listeners if l != listener]
+
+    def _poll_loop(self) -> None:
+        period = 1.0 / self.poll_rate
+        next_tick = time.monotonic()
+
+        while not self._stop_event.is_set():
+            if not self._paused.is_set():
+                try:
+                    self._read("angles")
+                    self._read("coords")
+                    self.polls += 1
+                except Exception as e:
+                    print(f"Error polling robot state: {e}")
+
+            # Schedule against absolute deadlines so the serial read time
+            # does not stretch the polling period
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                next_tick = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
+
+    def _on_command(self, method: str, args: tuple) -> None:
+        # Runs on the connection worker after each command; anything that is
+        # not a query may move the arm
+        if not method.startswith(("get_", "is_")):
+            with self._lock:
+                self._command_seq += 1
+
+    def _read(self, kind: str):
+        with self._lock:
+            command_seq = self._command_seq
+        # Stamp before the read so a reading is never newer than its data
+        read_time = self._now()
+        start = time.perf_counter()
+        values = self.robot.get_angles() if kind == "angles" else self.robot.get_coords()
+        latency = time.perf_counter() - start
+        self._store(kind, values, read_time, command_seq)
+        if kind == "angles":
+            self._notify(values, read_time, latency)
+        return values
+
+    def record_angles(self, angles, read_time: Optional[float] = None, latency: float = 0.0) -> None:
+        """
+        Take in a joint angle reading made by another loop while polling is paused.
+
+        Args:
+            angles: Joint angles returned by the arm
+            read_time: Robot clock time of the read (defaults to now minus the latency)
+            latency: Duration of the read in seconds
+        """
+        if read_time is None:
+            read_time = self._now() - latency
+        with self._lock:
+            command_seq = self._command_seq
+        self._store("angles", angles, read_time, command_seq)
+        self._notify(angles, read_time, latency)
+
+    def _notify(self, angles, read_time: float, latency: float) -> None:
+        if not _valid_reading(angles):
+            return
+        for listener in self._listeners:
+            try:
+                listener(angles, read_time, latency)
+            except Exception as e:
+                print(f"Error in robot state listener: {e}")
+
+    def _store(self, kind: str, values, read_time: float, command_seq: int) -> None:
+        if not _valid_reading(values):
+            return
+        with self._lock:
+            reading = self._angles if kind == "angles" else self._coords
+            if read_time < reading.time:
+                return  # A newer reading arrived meanwhile
+            reading.still = (reading.values is not None and reading.command_seq == command_seq and
+                             read_time > reading.time and
+                             max(abs(a - b) for a, b in zip(values, reading.values)) <= self.tolerance)
+            reading.values = list(values)
+            reading.time = read_time
+            reading.command_seq = command_seq
+
+    def _fresh(self, reading: _Reading, max_age: float) -> bool:
+        # Called with the lock held
+        if reading.values is None or reading.command_seq != self._command_seq:
+            return False
+        age = self._now() - reading.time
+        return age <= max_age and (reading.still or age == 0)
+
+    # ------------------------------------------------------------------
+    # Cached reads
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> RobotState:
+        """
+        Return the latest cached state without touching the serial link.
+
+        Returns:
+            RobotState with the newest readings (fields may be None before the first poll)
+        """
+        with self._lock:
+            return RobotState(
+                angles=list(self._angles.values) if self._angles.values else None,
+                coords=list(self._coords.values) if self._coords.values else None,
+                timestamp=min(self._angles.time, self._coords.time)
+            )
+
+    def _get(self, kind: str, max_age: Optional[float]) -> Optional[List[float]]:
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            reading = self._angles if kind == "angles" else self._coords
+            if self._fresh(reading, max_age):
+                self.hits += 1
+                return list(reading.values)
+            self.misses += 1
+
+        values = self._read(kind)
+        return list(values) if _valid_reading(values) else None
+
+    def get_angles(self, max_age: Optional[float] = None) -> Optional[List[float]]:
+        """
+        Get the joint angles, reading the arm only if it may have moved since the cached read.
+
+        Args:
+            max_age: Maximum acceptable age in seconds; None uses the default bound
+
+        Returns:
+            Joint angles in degrees, or None if the arm could not be read
+        """
+        return self._get("angles", max_age)
+
+    def get_coords(self, max_age: Optional[float] = None) -> Optional[List[float]]:
+        """
+        Get the Cartesian coordinates, reading the arm only if it may have moved since the cached read.
+
+        Args:
+            max_age: Maximum acceptable age in seconds; None uses the default bound
+
+        Returns:
+            [x, y, z, rx, ry, rz], or None if the arm could not be read
+        """
+        return self._get("coords", max_age)
@@ -0,0 +1,112 @@
+"""
+Task Sequencing Module for Embodied Agent
+
+This module orders batches of pick-and-place tasks to minimize the empty
+travel of the arm between them, using a nearest-neighbour tour improved by
+2-opt moves over a vectorized distance matrix.
+
+"""
+
+import numpy as np
+from typing import List, Optional, Sequence
+
+
+def _transfer_costs(picks: np.ndarray, places: np.ndarray,
+                    start: Optional[np.ndarray]) -> tuple:
+    # cost[i, j]: travel from the place point of task i to the pick point of task j
+    cost = np.linalg.norm(places[:, None, :] - picks[None, :, :], axis=2)
+    if start is None:
+        start_cost = np.zeros(len(picks))
+    else:
+        start_cost = np.linalg.norm(picks - start[None, :], axis=1)
+    return cost, start_cost
+
+
+def tour_length(order: Sequence[int], picks, places, start=None) -> float:
+    """
+    Total travel for a task order, including the carrying moves.
+
+    Args:
+        order: Task indices in execution order
+        picks: Pick positions, shape (N, 2) or (N, 3)
+        places: Place positions, shape (N, 2) or (N, 3)
+        start: Optional starting position of the tool
+
+    Returns:
+        Travel distance in the units of the inputs
+    """
+    picks = np.asarray(picks, dtype=float)
+    places = np.asarray(places, dtype=float)
+    start = None if start is None else np.asarray(start, dtype=float)[:picks.shape[1]]
+    if len(order) == 0:
+        return 0.0
+
+    cost, start_cost = _transfer_costs(picks, places, start)
+    idx = np.asarray(order)
+    carry = np.linalg.norm(places[idx] - picks[idx], axis=1).sum()
+    return float(start_cost[idx[0]] + cost[idx[:-1], idx[1:]].sum() + carry)
+
+
+def order_tasks(picks, places, start=None, improve: bool = True,
+                max_passes: int = 20) -> List[int]:
+    """
+    Choose an execution order for pick-and-place tasks.
+
+    The carrying moves (pick_i to place_i) are fixed, so only the empty
+    transfers between tasks are optimized. A nearest-neighbour tour from the
+    start position is refined with 2-opt segment reversals until no reversal
+    shortens it.
+
+    Args:
+        picks: Pick positions, shape (N, 2) or (N, 3)
+        places: Place positions, shape (N, 2) or (N, 3)
+        start: Optional starting position of the tool
+        improve: Apply 2-opt improvement after the greedy construction
+        max_passes: Upper bound on 2-opt passes
+
+    Returns:
+        Task indices in execution order
+    """
+    picks = np.asarray(picks, dtype=float)
+    places = np.asarray(places, dtype=float)
+    n = len(picks)
+    if n <= 1:
+        return list(range(n))
+
+    start = None if start is None else np.asarray(start, dtype=float)[:picks.shape[1]]
+    cost, start_cost = _transfer_costs(picks, places, start)
+
+    # Nearest-neighbour construction
+    order = [int(np.argmin(start_cost))]
+    visited = np.zeros(n, dtype=bool)
+    visited[order[0]] = True
+    for _ in range(n - 1):
+        candidates = np.where(visited, np.inf, cost[order[-1]])
+        nxt = int(np.argmin(candidates))
+        order.append(nxt)
+        visited[nxt] = True
+
+    if not improve or n < 3:
+        return order
+
+    def transfers(tour: np.ndarray) -> float:
+        return start_cost[tour[0]] + cost[tour[:-1], tour[1:]].sum()
+
+    # 2-opt: reverse segments while it helps. Transfer costs are asymmetric,
+    # so each candidate is scored on the full tour rather than by edge deltas.
+    best = np.array(order)
+    best_cost = transfers(best)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(n - 1):
+            for j in range(i + 1, n):
+                candidate = best.copy()
+                candidate[i:j + 1] = candidate[i:j + 1][::-1]
+                candidate_cost = transfers(candidate)
+                if candidate_cost < best_cost - 1e-9:
+                    best, best_cost = candidate, candidate_cost
+                    improved = True
+        if not improved:
+            break
+
+    return best.tolist()
@@ -0,0 +1,250 @@
+"""
+Arm Simulator Module for Embodied Agent
+
+This module provides a simulated myCobot 280 that implements the subset of the
+MyCobot API used by the agent. It models joint limits, commanded speeds and
+motion time against a controllable clock, so the real control code paths can
+be exercised and timed without hardware.
+
+"""
+
+import time
+import threading
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+from config import ROBOT_CONFIG
+from action.kinematics import JOINT_LIMITS, MAX_JOINT_SPEED, angles_to_coords, inverse_kinematics
+
+
+class SystemClock:
+    """
+    Wall clock used with real hardware.
+    """
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class SimClock:
+    """
+    Controllable clock for the simulator.
+
+    In virtual mode sleeping advances simulated time instantly, so long motion
+    sequences run in milliseconds while still reporting their real duration.
+    In real-time mode the clock follows the wall clock, optionally sped up.
+
+    Args:
+        realtime: Follow the wall clock instead of advancing on sleep
+        speedup: Simulated seconds per wall-clock second in real-time mode
+    """
+
+    def __init__(self, realtime: bool = False, speedup: float = 1.0):
+        self.realtime = realtime
+        self.speedup = speedup
+        self._lock = threading.Lock()
+        self._virtual_time = 0.0
+        self._wall_origin = time.monotonic()
+
+    def now(self) -> float:
+        if self.realtime:
+            return (time.monotonic() - self._wall_origin) * self.speedup
+        with self._lock:
+            return self._virtual_time
+
+    def advance(self, seconds: float) -> None:
+        """
+        Move virtual time forward without blocking.
+        """
+        if self.realtime or seconds <= 0:
+            return
+        with self._lock:
+            self._virtual_time += seconds
+
+    def sleep(self, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        if self.realtime:
+            time.sleep(seconds / self.speedup)
+        else:
+            self.advance(seconds)
+
+
+def _smoothstep(s: float) -> float:
+    # Minimum-jerk position profile: zero velocity and acceleration at both ends
+    return s * s * s * (10 - 15 * s + 6 * s * s)
+
+
+class _Motion:
+    """
+    A single point-to-point move between two vectors.
+    """
+
+    def __init__(self, start: np.ndarray, target: np.ndarray, t0: float, duration: float):
+        self.start = start
+        self.target = target
+        self.t0 = t0
+        self.duration = duration
+
+    def sample(self, t: float) -> np.ndarray:
+        if self.duration <= 0 or t >= self.t0 + self.duration:
+            return self.target.copy()
+        s = _smoothstep(max(0.0, (t - self.t0) / self.duration))
+        return self.start + (self.target - self.start) * s
+
+    def done(self, t: float) -> bool:
+        return t >= self.t0 + self.duration
+
+
+class SimulatedMyCobot:
+    """
+    Kinematic stand-in for pymycobot's MyCobot.
+
+    Joint moves are synchronized so every joint arrives at the same time, with
+    the duration set by the joint that travels furthest. Targets outside the
+    joint limits are clamped and counted. Coordinates are derived from the
+    joint state through forward kinematics, and coordinate moves are solved
+    with inverse kinematics; unreachable targets are ignored, as the firmware
+    does, and counted.
+
+    Args:
+        clock: Clock driving the motion model (defaults to a virtual SimClock)
+        serial_latency: Simulated round-trip time per command in seconds
+    """
+
+    def __init__(self, clock: Optional[SimClock] = None, serial_latency: float = 0.0):
+        self.clock = clock or SimClock()
+        self.serial_latency = serial_latency
+        self.speed = 50
+        self.powered = True
+
+        now = self.clock.now()
+        self._joint_motion = _Motion(np.zeros(6), np.zeros(6), now, 0.0)
+
+        self.commands = []          # (time, method, args) log for plan verification
+        self.limit_violations = 0
+        self.unreachable = 0
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _log(self, method: str, *args) -> None:
+        self.clock.sleep(self.serial_latency)
+        self.commands.append((self.clock.now(), method, args))
+
+    def _clamp(self, angles: np.ndarray) -> np.ndarray:
+        clamped = np.clip(angles, JOINT_LIMITS[:, 0], JOINT_LIMITS[:, 1])
+        if not np.array_equal(clamped, angles):
+            self.limit_violations += 1
+        return clamped
+
+    def _start_joint_motion(self, target: np.ndarray, speed: float, min_duration: float = 0.0) -> None:
+        now = self.clock.now()
+        start = self._joint_motion.sample(now)
+        target = self._clamp(target)
+        joint_speed = MAX_JOINT_SPEED * max(1, min(speed, 100)) / 100.0
+        duration = max(float(np.max(np.abs(target - start))) / joint_speed, min_duration)
+        self._joint_motion = _Motion(start, target, now, duration)
+        self.powered = True
+
+    # ------------------------------------------------------------------
+    # MyCobot API
+    # ------------------------------------------------------------------
+
+    def power_on(self) -> None:
+        self._log("power_on")
+        self.powered = True
+
+    def release_all_servos(self) -> None:
+        self._log("release_all_servos")
+        self.powered = False
+
+    def set_speed(self, speed: int) -> None:
+        self._log("set_speed", speed)
+        self.speed = speed
+
+    def stop(self) -> None:
+        """
+        Halt all motion at the current position.
+        """
+        self._log("stop")
+        now = self.clock.now()
+        angles = self._joint_motion.sample(now)
+        self._joint_motion = _Motion(angles, angles, now, 0.0)
+
+    def send_angles(self, degrees: List[float], speed: int) -> None:
+        self._log("send_angles", list(degrees), speed)
+        self._start_joint_motion(np.asarray(degrees, dtype=float), speed)
+
+    def send_angle(self, joint_id: int, degree: float, speed: int) -> None:
+        self._log("send_angle", joint_id, degree, speed)
+        if joint_id < 1 or joint_id > 6:
+            return
+        target = self._joint_motion.sample(self.clock.now())
+        target[joint_id - 1] = degree
+        self._start_joint_motion(target, speed)
+
+    def send_coords(self, coords: List[float], speed: int, mode: int = 0) -> None:
+        self._log("send_coords", list(coords), speed, mode)
+        current = self._joint_motion.sample(self.clock.now())
+        target = np.asarray(coords, dtype=float)
+        angles, success = inverse_kinematics(target, seed=current)
+        if not success:
+            self.unreachable += 1
+            return
+
+        # The tool cannot travel faster than the linear speed limit either
+        linear_speed = ROBOT_CONFIG["max_linear_speed"] * max(1, min(speed, 100)) / 100.0
+        distance = float(np.linalg.norm(target[:3] - angles_to_coords(current)[:3]))
+        self._start_joint_motion(angles, speed, distance / linear_speed)
+
+    def get_angles(self) -> List[float]:
+        self._log("get_angles")
+        return [round(float(a), 2) for a in self._joint_motion.sample(self.clock.now())]
+
+    def get_coords(self) -> List[float]:
+        self._log("get_coords")
+        angles = self._joint_motion.sample(self.clock.now())
+        return [round(float(c), 2) for c in angles_to_coords(angles)]
+
+    def is_moving(self) -> bool:
+        return not self._joint_motion.done(self.clock.now())
+
+    # ------------------------------------------------------------------
+    # Simulation utilities
+    # ------------------------------------------------------------------
+
+    def wait_until_idle(self) -> float:
+        """
+        Advance the clock until the current motion has finished.
+
+        Returns:
+            Simulated time spent waiting in seconds
+        """
+        now = self.clock.now()
+        end = self._joint_motion.t0 + self._joint_motion.duration
+        self.clock.sleep(end - now)
+        return max(0.0, end - now)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the commands issued so far.
+
+        Returns:
+            Dictionary with simulated elapsed time and command counts
+        """
+        counts = {}
+        for _, method, _ in self.commands:
+            counts[method] = counts.get(method, 0) + 1
+        return {
+            "sim_time": self.clock.now(),
+            "commands": len(self.commands),
+            "per_method": counts,
+            "limit_violations": self.limit_violations,
+            "unreachable": self.unreachable
+        }
@@ -9,37 +9,184 @@ manually guide the robot through movements, which can then be replicated automat
 import time
 import json
 import os
+import contextlib
 import numpy as np
 from typing import List, Dict, Any, Optional
 
-# Assuming hardware control is available
-try:
-    from pymycobot.mycobot import MyCobot
-    HARDWARE_AVAILABLE = True
-except ImportError:
-    print("Warning: MyCobot library not available. Running in simulation mode.")
-    HARDWARE_AVAILABLE = False
-
 # Import necessary functions
-from action.robot_control import back_to_zero, release_servos
-from config import PATHS
+from action.execution import MotionCancelled, get_context, step_input
+from action.robot_connection import get_connection
+from action.robot_control import back_to_zero, release_servos, state_cache
+from action.demonstration import DemonstrationRecorder
+from action.kinematics import MAX_JOINT_SPEED
+from action.motion_primitives import TrajectoryExecutor, peak_joint_speed, resample_trajectory
+from action.teaching_library import TeachingLibrary, describe_recording
+from action.trajectory_compression import simplify_trajectory
+from action.trajectory_store import (EXTENSION, PART_SUFFIX, convert_directory, read_trajectory,
+                                     recover_trajectory, write_trajectory)
+from config import PATHS, TEACHING_CONFIG
 
 # Define path for storing teaching recordings
 TEACHING_DATA_DIR = os.path.join(PATHS["temp_dir"], "teachings")
 
+# Sample rate of legacy JSON recordings, which carry no timestamps
+LEGACY_SAMPLE_RATE = 5.0
+
+# File name suffix of the unsimplified recording kept next to each teaching
+RAW_SUFFIX = "_raw"
+
 # Create directory if it doesn't exist
 if not os.path.exists(TEACHING_DATA_DIR):
     os.makedirs(TEACHING_DATA_DIR)
 
-# Initialize robot connection if available
-if HARDWARE_AVAILABLE:
-    try:
-        robot = MyCobot("/dev/ttyAMA0", 1000000)
-    except Exception as e:
-        print(f"Error connecting to robot: {e}")
-        HARDWARE_AVAILABLE = False
-else:
-    robot = None
+# Share the robot connection owned by the connection broker
+robot = get_connection()
+HARDWARE_AVAILABLE = robot is not None
+
+
+def _raw_path(teaching_id: int) -> str:
+    """
+    Get the file of the unsimplified recording of a teaching.
+    """
+    return os.path.join(TEACHING_DATA_DIR, f"teaching_{teaching_id}{RAW_SUFFIX}{EXTENSION}")
+
+
+def _recording_path(teaching_id: int) -> str:
+    """
+    Get the file of a teaching, preferring the binary format over legacy JSON.
+    """
+    path = os.path.join(TEACHING_DATA_DIR, f"teaching_{teaching_id}{EXTENSION}")
+    legacy = os.path.join(TEACHING_DATA_DIR, f"teaching_{teaching_id}.json")
+    if not os.path.exists(path) and os.path.exists(legacy):
+        return legacy
+    return path
+
+
+def _load_positions(recording_path: str) -> np.ndarray:
+    """
+    Load the joint angles of a recording (binary or legacy JSON).
+    """
+    if recording_path.endswith(".json"):
+        with open(recording_path, 'r') as f:
+            return np.array(json.load(f), dtype=float).reshape(-1, 6)
+    return read_trajectory(recording_path).angles
+
+
+def _load_recording(recording_path: str):
+    """
+    Load the sample times and joint angles of a recording (binary or legacy JSON).
+    """
+    if recording_path.endswith(".json"):
+        positions = _load_positions(recording_path)
+        return np.arange(len(positions)) / LEGACY_SAMPLE_RATE, positions
+    trajectory = read_trajectory(recording_path)
+    return trajectory.times, trajectory.angles
+
+
+def _describe_file(name: str) -> Optional[Dict[str, Any]]:
+    """
+    Build the library entry of a teaching file (None for other files).
+    """
+    if not name.startswith('teaching_') or not name.endswith((EXTENSION, '.json')):
+        return None
+    teaching_id = int(name.split('_')[1].split('.')[0])
+    path = os.path.join(TEACHING_DATA_DIR, name)
+    # Originals and converted JSON files are indexed through their recording
+    if _recording_path(teaching_id) != path:
+        return None
+    times, positions = _load_recording(path)
+    return describe_recording(teaching_id, path, times, positions)
+
+
+# Index of the saved recordings, rebuilt from the files if its manifest is missing
+library = TeachingLibrary(TEACHING_DATA_DIR, describe=_describe_file)
+
+
+def _save_recording(recording_id: int, timestamps: np.ndarray, positions: np.ndarray,
+                    rate: float, tags: Optional[List[str]] = None) -> str:
+    """
+    Save a recording simplified for replay, keeping the original next to it,
+    and add it to the library.
+    
+    The original may already have been streamed to disk while recording.
+    
+    Raises:
+        ValueError: The recording has no samples
+    """
+    if len(timestamps) == 0:
+        raise ValueError("Recording has no samples")
+    recording_path = os.path.join(TEACHING_DATA_DIR, f"teaching_{recording_id}{EXTENSION}")
+    raw_path = _raw_path(recording_id)
+    if TEACHING_CONFIG["keep_raw"] and not os.path.exists(raw_path):
+        write_trajectory(raw_path, timestamps, positions, rate=rate)
+    
+    times, angles, stats = simplify_trajectory(timestamps, positions)
+    # Simplified samples are irregularly spaced, so no nominal rate is stored
+    write_trajectory(recording_path, times, angles)
+    print(f"Simplified {stats['samples']} samples to {stats['kept']} "
+          f"({stats['ratio']:.1f}x, max deviation {max(stats['max_error']):.2f} deg).")
+    if not TEACHING_CONFIG["keep_raw"] and os.path.exists(raw_path):
+        os.remove(raw_path)
+    library.add(describe_recording(recording_id, recording_path, times, angles, tags))
+    return recording_path
+
+
+def recover_teachings() -> int:
+    """
+    Save demonstrations whose recording or saving was interrupted.
+    
+    Part files left by a crash are completed, and originals without a
+    simplified recording are simplified and added to the library.
+    
+    Returns:
+        Number of recovered recordings
+    """
+    recovered = 0
+    for name in sorted(os.listdir(TEACHING_DATA_DIR)):
+        if not (name.startswith('teaching_') and name.endswith(RAW_SUFFIX + EXTENSION + PART_SUFFIX)):
+            continue
+        try:
+            recover_trajectory(os.path.join(TEACHING_DATA_DIR, name))
+        except Exception as e:
+            print(f"Error recovering {name}: {e}")
+    
+    for name in sorted(os.listdir(TEACHING_DATA_DIR)):
+        if not (name.startswith('teaching_') and name.endswith(RAW_SUFFIX + EXTENSION)):
+            continue
+        try:
+            recording_id = int(name.split('_')[1])
+            if os.path.exists(os.path.join(TEACHING_DATA_DIR, f"teaching_{recording_id}{EXTENSION}")):
+                continue
+            path = os.path.join(TEACHING_DATA_DIR, name)
+            trajectory = read_trajectory(path)
+            if len(trajectory.times) == 0:
+                # Stopped before the first sample; there is nothing to keep
+                os.remove(path)
+                print(f"Removed empty recording {name}")
+                continue
+            _save_recording(recording_id, trajectory.times, trajectory.angles, trajectory.rate)
+            recovered += 1
+        except Exception as e:
+            print(f"Error recovering {name}: {e}")
+    
+    if recovered:
+        print(f"Recovered {recovered} interrupted teaching recordings.")
+    return recovered
+
+
+def convert_teachings() -> int:
+    """
+    Convert legacy JSON teaching recordings to the binary format.
+    
+    Returns:
+        Number of converted recordings
+    """
+    converted = convert_directory(TEACHING_DATA_DIR)
+    if converted:
+        # Converted recordings are indexed by their new binary files
+        library.rebuild()
+    print(f"Converted {converted} teaching recordings.")
+    return converted
 
 
 def teaching_mode() -> str:
@@ -48,7 +195,7 @@ def teaching_mode() -> str:
     
     This function:
     1. Releases all servos to allow manual movement
-    2. Records the positions at regular intervals
+    2. Records the positions on a background thread until the user stops it
     3. Replays the recorded movement
     
     Returns:
@@ -59,44 +206,55 @@ def teaching_mode() -> str:
         return "Simulation: Teaching mode completed successfully"
     
     try:
-        positions = []
-        recording_time = 10  # seconds to record
-        sample_rate = 5      # positions per second
+        # Save anything a previous session lost to a crash
+        recover_teachings()
+        
+        # Samples are streamed to the original recording file as they come in
+        recording_id = int(time.time())
+        recorder = DemonstrationRecorder(robot, path=_raw_path(recording_id),
+                                         on_reading=state_cache.record_angles if state_cache else None)
         
         print("\n=== TEACHING MODE ===")
         print("I'll release the servos so you can move me manually.")
-        print(f"I'll record your movements for {recording_time} seconds.")
+        print(f"I'll record your movements at {recorder.rate} Hz until you press Enter "
+              f"(at most {recorder.max_duration} seconds).")
         print("After recording, I'll replay the movement.")
-        print("Press Enter to start...")
-        input()
+        step_input("Press Enter to start...")
         
         # Release all servos for manual movement
         release_servos()
         print("Servos released. You can now move the arm manually.")
-        print("Recording started...")
         
-        # Record positions at regular intervals
-        start_time = time.time()
-        while time.time() - start_time < recording_time:
-            # Get current angles
-            angles = robot.get_angles()
-            if angles:
-                positions.append(angles)
-                print(".", end="", flush=True)
-            time.sleep(1 / sample_rate)
+        # Record on a background thread until the user stops it; the
+        # recorder's reads stand in for the state cache's polling meanwhile
+        with state_cache.paused() if state_cache else contextlib.nullcontext():
+            recorder.start()
+            try:
+                step_input("Recording... press Enter to stop.")
+            finally:
+                recorder.stop()
+        
+        stats = recorder.stats()
+        print("Recording complete.")
+        print(f"Recorded {recorder.count} positions.")
+        if recorder.count >= 2:
+            print(f"Achieved {stats['rate']:.1f} Hz (jitter {stats['jitter_std'] * 1000:.1f} ms std, "
+                  f"{stats['jitter_max'] * 1000:.1f} ms max, {stats['missed_ticks']} missed ticks)")
         
-        print("\nRecording complete.")
-        print(f"Recorded {len(positions)} positions.")
+        if recorder.count == 0:
+            # Nothing to save or replay; lock the servos so the arm holds its pose
+            if os.path.exists(_raw_path(recording_id)):
+                os.remove(_raw_path(recording_id))
+            robot.power_on()
+            print("No positions were recorded, nothing saved.")
+            return "Teaching cancelled: no movement was recorded"
         
         # Save the recording
-        recording_id = int(time.time())
-        recording_path = os.path.join(TEACHING_DATA_DIR, f"teaching_{recording_id}.json")
-        with open(recording_path, 'w') as f:
-            json.dump(positions, f)
+        timestamps, positions = recorder.samples()
+        _save_recording(recording_id, timestamps, positions, recorder.rate)
         
         print("Movement saved. Ready to replay.")
-        print("Press Enter to replay...")
-        input()
+        step_input("Press Enter to replay...")
         
         # Replay the recorded movement
         print("Replaying recorded movement...")
@@ -104,6 +262,10 @@ def teaching_mode() -> str:
         
         return f"Teaching completed and saved as ID: {recording_id}"
     
+    except MotionCancelled:
+        # Lock the servos again so the arm holds its pose instead of staying limp
+        robot.power_on()
+        raise
     except Exception as e:
         print(f"Error in teaching mode: {e}")
         # Try to restore control
@@ -118,109 +280,170 @@ def teaching_mode() -> str:
         return "Teaching mode encountered an error"
 
 
-def replay_teaching(teaching_id: Optional[int] = None, filepath: Optional[str] = None) -> None:
+def replay_teaching(teaching_id: Optional[int] = None, filepath: Optional[str] = None,
+                    tempo: float = 1.0) -> Optional[Dict[str, float]]:
     """
     Replay a previously recorded teaching movement.
     
+    The recording is interpolated with a cubic spline through its timestamps
+    and streamed at the control rate, so the replay keeps the timing of the
+    demonstration instead of the pace of the serial link.
+    
     Args:
         teaching_id: ID of the teaching to replay
         filepath: Direct path to the teaching file (alternative to teaching_id)
+        tempo: Playback speed factor (2.0 plays twice as fast)
+    
+    Returns:
+        Execution statistics of the replay, or None if nothing was replayed
     """
     if not HARDWARE_AVAILABLE:
         print(f"[SIM] Replaying teaching ID: {teaching_id}")
-        return
+        return None
     
     try:
         # Determine the file path
         if filepath:
             recording_path = filepath
         elif teaching_id:
-            recording_path = os.path.join(TEACHING_DATA_DIR, f"teaching_{teaching_id}.json")
+            recording_path = _recording_path(teaching_id)
         else:
             # If no specific teaching specified, use the most recent one
-            teaching_files = sorted([f for f in os.listdir(TEACHING_DATA_DIR) if f.startswith('teaching_')])
-            if teaching_files:
-                recording_path = os.path.join(TEACHING_DATA_DIR, teaching_files[-1])
+            latest = library.latest()
+            if latest:
+                recording_path = os.path.join(TEACHING_DATA_DIR, latest['filename'])
             else:
                 print("No teaching recordings found.")
-                return
+                return None
         
         # Check if file exists
         if not os.path.exists(recording_path):
             print(f"Teaching file not found: {recording_path}")
-            return
+            return None
         
-        # Load the recorded positions
-        with open(recording_path, 'r') as f:
-            positions = json.load(f)
+        # Load the recorded samples
+        times, positions = _load_recording(recording_path)
+        if len(positions) == 0:
+            print("Teaching recording is empty.")
+            return None
         
         print(f"Loaded {len(positions)} positions from recording.")
         
         # Make sure the robot is powered on
         robot.power_on()
-        time.sleep(1)
+        get_context().sleep(1, robot.clock)
+        
+        executor = TrajectoryExecutor(robot)
+        playback, setpoints = resample_trajectory(times, positions, executor.rate, tempo)
         
-        # Replay the positions
+        # Slow down rather than ask the joints for more than they can do
+        peak = peak_joint_speed(setpoints, executor.rate)
+        if peak > MAX_JOINT_SPEED:
+            tempo *= MAX_JOINT_SPEED / peak
+            print(f"Replay too fast for the joints, slowing to tempo {tempo:.2f}")
+            playback, setpoints = resample_trajectory(times, positions, executor.rate, tempo)
+        
+        # Move to the first recorded pose before starting the clock
+        current = robot.get_angles()
+        if isinstance(current, (list, tuple)) and len(current) == 6:
+            distance = float(np.abs(np.subtract(setpoints[0], current)).max())
+            speed = TEACHING_CONFIG["replay_speed"]
+            robot.send_angles([round(float(a), 2) for a in setpoints[0]], speed)
+            get_context().sleep(distance / (MAX_JOINT_SPEED * speed / 100.0) + 0.3, robot.clock)
+        
+        # Replay the movement on the recorded time base
         print("Replaying movement...")
-        for i, angles in enumerate(positions):
-            robot.send_angles(angles, 80)  # Higher speed for smooth replay
-            # Calculate appropriate delay for smooth motion
-            # Shorter delays for smoother playback
-            delay = 0.05 if i % 3 == 0 else 0
-            time.sleep(delay)
+        stats = executor.run(playback, setpoints, TEACHING_CONFIG["replay_speed"])
         
-        print("Replay complete.")
+        print(f"Replay complete: {stats['commands']} commands for {stats['samples']} setpoints "
+              f"in {stats['duration']:.2f} s, "
+              f"{stats['deadline_misses']} deadline misses "
+              f"(worst {stats['max_lateness'] * 1000:.1f} ms late).")
+        return stats
         
     except Exception as e:
         print(f"Error replaying teaching: {e}")
+        return None
 
 
-def list_teachings() -> List[Dict[str, Any]]:
+def replay_closest_teaching(goal: Optional[List[float]] = None, tempo: float = 1.0) -> str:
     """
-    List all saved teaching recordings.
+    Replay the taught motion that best fits the arm's current pose.
+    
+    Recordings are ranked by the joint-space distance between their start
+    pose and the current angles, plus the distance between their end pose
+    and the goal if one is given.
+    
+    Args:
+        goal: Joint angles the motion should end at (optional)
+        tempo: Playback speed factor
     
     Returns:
-        List of dictionaries with teaching metadata
+        Message describing the outcome
     """
+    if not HARDWARE_AVAILABLE:
+        print(f"[SIM] Replaying the closest teaching to goal: {goal}")
+        return "Simulation: Closest teaching replayed"
+    
     try:
-        teachings = []
+        current = robot.get_angles()
+        if not (isinstance(current, (list, tuple)) and len(current) == 6):
+            current = None
         
+        matches = library.closest(start=current, end=goal)
+        if not matches:
+            print("No teaching recordings found.")
+            return "No taught motion to replay"
+        
+        match = matches[0]
+        print(f"Closest teaching: {match['id']} ({match['distance']:.1f} deg away)")
+        replay_teaching(filepath=os.path.join(TEACHING_DATA_DIR, match['filename']), tempo=tempo)
+        return f"Replayed teaching {match['id']}"
+    
+    except Exception as e:
+        print(f"Error replaying closest teaching: {e}")
+        return f"Error replaying closest teaching: {e}"
+
+
+def list_teachings(tag: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    List all saved teaching recordings.
+    
+    Args:
+        tag: Only list recordings with this tag
+    
+    Returns:
+        List of dictionaries with teaching metadata, newest first
+    """
+    try:
         if not os.path.exists(TEACHING_DATA_DIR):
             print("Teaching directory does not exist.")
-            return teachings
-        
-        # Get all teaching files
-        teaching_files = [f for f in os.listdir(TEACHING_DATA_DIR) if f.startswith('teaching_') and f.endswith('.json')]
+            return []
         
-        for file in teaching_files:
-            try:
-                # Extract ID from filename
-                teaching_id = int(file.split('_')[1].split('.')[0])
-                # Get file modification time
-                file_path = os.path.join(TEACHING_DATA_DIR, file)
-                mod_time = os.path.getmtime(file_path)
-                # Get file size
-                size = os.path.getsize(file_path)
-                
-                teachings.append({
-                    'id': teaching_id,
-                    'filename': file,
-                    'datetime': time.ctime(mod_time),
-                    'size_kb': round(size / 1024, 2)
-                })
-            except Exception as e:
-                print(f"Error processing teaching file {file}: {e}")
-        
-        # Sort by timestamp (newest first)
-        teachings.sort(key=lambda x: x['id'], reverse=True)
-        
-        return teachings
+        return library.entries(tag)
     
     except Exception as e:
         print(f"Error listing teachings: {e}")
         return []
 
 
+def tag_teaching(teaching_id: int, tags: List[str]) -> bool:
+    """
+    Set the tags of a saved teaching recording.
+    
+    Args:
+        teaching_id: ID of the teaching
+        tags: Labels describing the movement
+        
+    Returns:
+        True if the teaching exists, False otherwise
+    """
+    if not library.set_tags(teaching_id, tags):
+        print(f"Teaching {teaching_id} not found.")
+        return False
+    return True
+
+
 def delete_teaching(teaching_id: int) -> bool:
     """
     Delete a saved teaching recording.
@@ -232,13 +455,20 @@ def delete_teaching(teaching_id: int) -> bool:
         True if deletion was successful, False otherwise
     """
     try:
-        file_path = os.path.join(TEACHING_DATA_DIR, f"teaching_{teaching_id}.json")
+        file_path = _recording_path(teaching_id)
         
         if not os.path.exists(file_path):
+            # Drop a stale index entry of a file removed by hand
+            library.remove(teaching_id)
             print(f"Teaching file not found: {file_path}")
             return False
         
-        os.remove(file_path)
+        # Remove the binary recording, its original and any legacy JSON it was converted from
+        for extension in (EXTENSION, RAW_SUFFIX + EXTENSION, '.json'):
+            path = os.path.join(TEACHING_DATA_DIR, f"teaching_{teaching_id}{extension}")
+            if os.path.exists(path):
+                os.remove(path)
+        library.remove(teaching_id)
         print(f"Teaching {teaching_id} deleted.")
         return True
         
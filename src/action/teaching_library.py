@@ -0,0 +1,459 @@
+"""
+Teaching Library Module for Embodied Agent
+
+This module keeps an index of the saved teaching recordings in an
+append-only JSON-lines manifest. Every save, delete or tag change appends
+one record, and the manifest is replayed into memory once per session, so
+listing recordings and finding the latest one do not touch the recordings
+themselves however many there are.
+
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import numpy as np
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Manifest file name inside the teaching directory
+MANIFEST_NAME = "manifest.jsonl"
+
+# Compact the manifest once it holds this many superseded records
+COMPACT_THRESHOLD = 1000
+
+
+def describe_recording(teaching_id: int, path: str, times, angles,
+                       tags: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Build the manifest entry of a recording.
+
+    Args:
+        teaching_id: Teaching ID
+        path: Recording file
+        times: Sample times in seconds, shape (N,)
+        angles: Joint angles in degrees, shape (N, 6)
+        tags: Optional labels for the recording
+
+    Returns:
+        Dictionary with ID, file name, creation time, duration, sample count,
+        start and end pose, file size and tags
+    """
+    angles = np.asarray(angles, dtype=float).reshape(-1, 6)
+    count = len(angles)
+    return {
+        "id": int(teaching_id),
+        "filename": os.path.basename(path),
+        "created": os.path.getmtime(path),
+        "duration": float(times[-1] - times[0]) if count > 1 else 0.0,
+        "samples": count,
+        "start": np.round(angles[0], 2).tolist() if count else None,
+        "end": np.round(angles[-1], 2).tolist() if count else None,
+        "datetime": time.ctime(os.path.getmtime(path)),
+        "size_kb": round(os.path.getsize(path) / 1024, 2),
+        "tags": sorted(set(tags or []))
+    }
+
+
+class PoseIndex:
+    """
+    Nearest-neighbour index over the start and end poses of recordings.
+
+    Poses are rows of one contiguous matrix that grows by doubling; removal
+    moves the last row into the freed slot. A query is a single vectorized
+    distance computation over all rows, which for six-joint poses and
+    libraries of thousands of recordings is faster than walking a tree in
+    Python.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._poses = np.zeros((capacity, 12))
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._rows = {}     # Teaching ID -> row
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, teaching_id: int, start, end) -> None:
+        """
+        Add or replace the poses of a recording.
+
+        Args:
+            teaching_id: Teaching ID
+            start: Start joint angles, shape (6,)
+            end: End joint angles, shape (6,)
+        """
+        row = self._rows.get(teaching_id)
+        if row is None:
+            if self.size == len(self._ids):
+                self._poses = np.concatenate([self._poses, np.zeros_like(self._poses)])
+                self._ids = np.concatenate([self._ids, np.zeros_like(self._ids)])
+            row = self.size
+            self.size += 1
+            self._rows[teaching_id] = row
+        self._poses[row, :6] = start
+        self._poses[row, 6:] = end
+        self._ids[row] = teaching_id
+
+    def remove(self, teaching_id: int) -> None:
+        """
+        Remove a recording (no-op if it is not indexed).
+        """
+        row = self._rows.pop(teaching_id, None)
+        if row is None:
+            return
+        last = self.size - 1
+        if row != last:
+            self._poses[row] = self._poses[last]
+            self._ids[row] = self._ids[last]
+            self._rows[int(self._ids[row])] = row
+        self.size = last
+
+    def nearest(self, start=None, end=None, k: int = 1) -> List[Tuple[int, float]]:
+        """
+        Find the recordings whose poses are closest to the query.
+
+        Args:
+            start: Joint angles to match against the start poses
+            end: Joint angles to match against the end poses
+            k: Number of results
+
+        Returns:
+            List of (teaching ID, joint-space distance in degrees), closest first
+        """
+        if self.size == 0 or (start is None and end is None):
+            return []
+        poses = self._poses[:self.size]
+        distance = np.zeros(self.size)
+        if start is not None:
+            distance += np.square(poses[:, :6] - np.asarray(start, dtype=float)).sum(axis=1)
+        if end is not None:
+            distance += np.square(poses[:, 6:] - np.asarray(end, dtype=float)).sum(axis=1)
+
+        k = min(k, self.size)
+        best = np.argpartition(distance, k - 1)[:k] if k < self.size else np.arange(self.size)
+        best = best[np.argsort(distance[best])]
+        return [(int(self._ids[i]), float(np.sqrt(distance[i]))) for i in best]
+
+
+class TeachingLibrary:
+    """
+    In-memory index of teaching recordings backed by an append-only manifest.
+
+    Manifest lines are {"op": "add", "entry": {...}}, {"op": "delete", "id": ...}
+    or {"op": "tag", "id": ..., "tags": [...]}; later lines win.
+
+    Args:
+        directory: Teaching directory holding the recordings and the manifest
+        describe: Function (file name) -> manifest entry, or None to skip the
+            file; used to rebuild the manifest from the recordings when it is
+            missing
+    """
+
+    def __init__(self, directory: str,
+                 describe: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None):
+        self.directory = directory
+        self.describe = describe
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self._entries = {}
+        self.poses = PoseIndex()
+        self._ordered = None     # Entries newest first, rebuilt lazily
+        self._superseded = 0     # Manifest lines that no longer describe a live entry
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+
+    def load(self) -> int:
+        """
+        Read the manifest into memory, rebuilding it if it is missing.
+
+        Returns:
+            Number of recordings in the library
+        """
+        if not os.path.exists(self.path) and self.describe is not None and os.path.isdir(self.directory):
+            return self.rebuild()
+        with self._lock:
+            self._entries = {}
+            self.poses = PoseIndex()
+            self._superseded = 0
+            if os.path.exists(self.path):
+                with open(self.path, "r") as f:
+                    for line in f:
+                        try:
+                            self._apply(json.loads(line))
+                        except (ValueError, KeyError, TypeError):
+                            # A crash can leave a truncated last line
+                            continue
+            self._ordered = None
+            self._loaded = True
+            return len(self._entries)
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.load()
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        op = record["op"]
+        if op == "add":
+            entry = record["entry"]
+            if entry["id"] in self._entries:
+                self._superseded += 1
+            self._entries[entry["id"]] = entry
+            if entry.get("start") is not None:
+                self.poses.add(entry["id"], entry["start"], entry["end"])
+        elif op == "delete":
+            if self._entries.pop(record["id"], None) is not None:
+                self._superseded += 1
+            self.poses.remove(record["id"])
+            self._superseded += 1
+        elif op == "tag":
+            entry = self._entries.get(record["id"])
+            if entry is not None:
+                entry["tags"] = record["tags"]
+            self._superseded += 1
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        # Called with the lock held
+        self._apply(record)
+        self._ordered = None
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        if self._superseded >= COMPACT_THRESHOLD:
+            self._compact()
+
+    def _compact(self) -> None:
+        # Rewrite the manifest with one add record per live entry; the
+        # replace is atomic, so a crash leaves either manifest intact
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            for entry in self._entries.values():
+                f.write(json.dumps({"op": "add", "entry": entry}) + "\n")
+        os.replace(temp_path, self.path)
+        self._superseded = 0
+
+    def compact(self) -> None:
+        """
+        Rewrite the manifest without superseded records.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            self._compact()
+
+    def rebuild(self) -> int:
+        """
+        Rebuild the manifest by scanning the recordings on disk.
+
+        Returns:
+            Number of recordings indexed
+        """
+        entries = {}
+        for name in sorted(os.listdir(self.directory)):
+            if name == MANIFEST_NAME:
+                continue
+            try:
+                entry = self.describe(name)
+                if entry is not None:
+                    entries[entry["id"]] = entry
+            except Exception as e:
+                print(f"Error indexing teaching file {name}: {e}")
+
+        with self._lock:
+            self._entries = {}
+            self.poses = PoseIndex()
+            for entry in entries.values():
+                self._apply({"op": "add", "entry": entry})
+            self._ordered = None
+            self._loaded = True
+            os.makedirs(self.directory, exist_ok=True)
+            self._compact()
+        return len(entries)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """
+        Add or replace a recording.
+
+        Args:
+            entry: Manifest entry from describe_recording
+        """
+        self._ensure_loaded()
+        with self._lock:
+            self._append({"op": "add", "entry": entry})
+
+    def remove(self, teaching_id: int) -> bool:
+        """
+        Remove a recording from the index.
+
+        Args:
+            teaching_id: Teaching ID
+
+        Returns:
+            True if the recording was indexed
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if teaching_id not in self._entries:
+                return False
+            self._append({"op": "delete", "id": teaching_id})
+            return True
+
+    def set_tags(self, teaching_id: int, tags: Iterable[str]) -> bool:
+        """
+        Replace the tags of a recording.
+
+        Args:
+            teaching_id: Teaching ID
+            tags: New labels
+
+        Returns:
+            True if the recording was indexed
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if teaching_id not in self._entries:
+                return False
+            self._append({"op": "tag", "id": teaching_id, "tags": sorted(set(tags))})
+            return True
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._entries)
+
+    def get(self, teaching_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the entry of a recording, or None if it is not indexed.
+        """
+        self._ensure_loaded()
+        return self._entries.get(teaching_id)
+
+    def entries(self, tag: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List recordings, newest first.
+
+        Args:
+            tag: Only list recordings with this tag
+
+        Returns:
+            List of manifest entries
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if self._ordered is None:
+                self._ordered = sorted(self._entries.values(), key=lambda e: e["id"], reverse=True)
+            ordered = self._ordered
+        if tag is None:
+            return list(ordered)
+        return [entry for entry in ordered if tag in entry["tags"]]
+
+    def latest(self, tag: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the newest recording (optionally with a tag), or None if there is none.
+        """
+        self._ensure_loaded()
+        if tag is None:
+            with self._lock:
+                return self._entries[max(self._entries)] if self._entries else None
+        entries = self.entries(tag)
+        return entries[0] if entries else None
+
+    def closest(self, start=None, end=None, k: int = 1) -> List[Dict[str, Any]]:
+        """
+        Find the recordings that start and/or end closest to given poses.
+
+        Args:
+            start: Joint angles the recording should start from
+            end: Joint angles the recording should end at
+            k: Number of results
+
+        Returns:
+            Manifest entries with an added 'distance' (degrees), closest first
+        """
+        self._ensure_loaded()
+        with self._lock:
+            matches = self.poses.nearest(start, end, k)
+            return [dict(self._entries[teaching_id], distance=distance)
+                    for teaching_id, distance in matches]
+
+
+def benchmark_library(recordings: int = 5000, directory: Optional[str] = None) -> Dict[str, float]:
+    """
+    Compare listing through the manifest with scanning the directory, and
+    time nearest-pose queries.
+
+    Args:
+        recordings: Number of (empty) recording files to create
+        directory: Parent of the scratch directory (defaults to the system
+            temporary directory); the scratch directory is removed afterwards
+
+    Returns:
+        Dictionary with timings in milliseconds
+    """
+    scratch = tempfile.mkdtemp(prefix="teaching_library_", dir=directory)
+    try:
+        library = TeachingLibrary(scratch)
+        rng = np.random.default_rng(0)
+        start = time.perf_counter()
+        for i in range(recordings):
+            path = os.path.join(scratch, f"teaching_{i}.traj")
+            open(path, "wb").close()
+            library.add(describe_recording(i, path, [0.0, 1.0], rng.uniform(-150.0, 150.0, (2, 6))))
+        add_time = (time.perf_counter() - start) / recordings
+
+        start = time.perf_counter()
+        scanned = []
+        for name in os.listdir(scratch):
+            if name.startswith("teaching_"):
+                path = os.path.join(scratch, name)
+                scanned.append((int(name.split("_")[1].split(".")[0]), os.path.getmtime(path),
+                                os.path.getsize(path)))
+        scanned.sort(reverse=True)
+        scan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        TeachingLibrary(scratch).load()
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        library.entries()
+        list_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        library.latest()
+        latest_time = time.perf_counter() - start
+
+        queries = rng.uniform(-150.0, 150.0, (1000, 6))
+        start = time.perf_counter()
+        for pose in queries:
+            library.closest(start=pose)
+        closest_time = (time.perf_counter() - start) / len(queries)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return {
+        "recordings": recordings,
+        "add_ms": add_time * 1000,
+        "directory_scan_ms": scan_time * 1000,
+        "manifest_load_ms": load_time * 1000,
+        "list_ms": list_time * 1000,
+        "latest_ms": latest_time * 1000,
+        "closest_ms": closest_time * 1000
+    }
+
+
+if __name__ == "__main__":
+    for name, value in benchmark_library().items():
+        print(f"{name}: {value:.4f}" if isinstance(value, float) else f"{name}: {value}")
@@ -0,0 +1,330 @@
+"""
+Telemetry Module for Embodied Agent
+
+This module records arm telemetry during real runs: the measured joint
+angles read by the robot state cache, the latest commanded joint and
+Cartesian setpoints, and read timing. It adds no serial traffic of its own.
+Samples go into a preallocated columnar ring buffer and are flushed in
+chunks to raw column files that can be memory-mapped for post-mortem
+analysis; only the newest sessions are kept on disk.
+
+"""
+
+import os
+import json
+import time
+import shutil
+import threading
+import numpy as np
+from typing import Any, Dict, Optional
+
+# Import system configuration
+from config import TELEMETRY_CONFIG
+
+# Column name -> (dtype, width); width 1 columns are stored flat
+COLUMNS = {
+    "t": (np.float64, 1),             # Robot clock time of the read (s)
+    "read_latency": (np.float32, 1),  # Duration of the state read (s)
+    "measured": (np.float32, 6),      # Measured joint angles (deg)
+    "commanded": (np.float32, 6),     # Last send_angles / send_angle target (deg)
+    "commanded_coords": (np.float32, 6),  # Last send_coords target (mm / deg)
+    "commands": (np.int32, 1)         # Motion commands sent so far
+}
+
+
+class TelemetryRecorder:
+    """
+    Records the arm state into a ring buffer without polling the arm itself.
+
+    Commanded values are captured by a listener on the robot connection, so
+    the control loop only pays for copying six numbers per command. Measured
+    angles come from a listener on the robot state cache, so every reading
+    the cache's poller (or a loop standing in for it) makes becomes a
+    sample; full chunks of the ring are appended to the column files of the
+    session directory.
+
+    Args:
+        robot: Robot connection (must expose add_listener)
+        state_cache: RobotStateCache whose readings are recorded
+        capacity: Ring buffer size in samples
+        directory: Session directory for the column files; None keeps samples in memory only
+    """
+
+    def __init__(self, robot, state_cache, capacity: int = None, directory: Optional[str] = None):
+        self.robot = robot
+        self.state_cache = state_cache
+        self.rate = state_cache.poll_rate
+        self.capacity = capacity or TELEMETRY_CONFIG["capacity"]
+        self.directory = directory
+        self.chunk = min(TELEMETRY_CONFIG["flush_chunk"], self.capacity // 2)
+
+        self._columns = {name: np.zeros((self.capacity, width) if width > 1 else self.capacity, dtype)
+                         for name, (dtype, width) in COLUMNS.items()}
+        self.count = 0      # Samples written since start
+        self.flushed = 0    # Samples written to disk
+        self.dropped = 0    # Samples overwritten before they were flushed
+
+        # Latest commanded values, written by the connection listener
+        self._commanded = np.full(6, np.nan, dtype=np.float32)
+        self._commanded_coords = np.full(6, np.nan, dtype=np.float32)
+        self._commands = 0
+
+        self._lock = threading.Lock()
+        self.running = False
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """
+        Start recording (no-op if already running).
+        """
+        if self.running:
+            return
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            _write_meta(self.directory, self.rate)
+        self.robot.add_listener(self._on_command)
+        self.state_cache.add_listener(self._on_reading)
+        self.running = True
+
+    def stop(self) -> None:
+        """
+        Stop recording and flush the remaining samples.
+        """
+        if not self.running:
+            return
+        self.running = False
+        self.state_cache.remove_listener(self._on_reading)
+        self.robot.remove_listener(self._on_command)
+        self.flush()
+
+    def _on_command(self, method: str, args: tuple) -> None:
+        # Runs on the connection worker thread right after a command was sent
+        if method == "send_angles":
+            self._commanded[:] = args[0]
+        elif method == "send_angle":
+            if 1 <= int(args[0]) <= 6:
+                self._commanded[int(args[0]) - 1] = args[1]
+        elif method == "send_coords":
+            self._commanded_coords[:] = args[0][:6]
+        else:
+            return
+        self._commands += 1
+
+    def _on_reading(self, angles, read_time: float, latency: float) -> None:
+        # Runs on the thread that read the arm (usually the state cache poller);
+        # a read-through that overlapped a poll may arrive late and is dropped
+        # so the log stays in time order
+        if self.count and read_time < self._columns["t"][(self.count - 1) % self.capacity]:
+            return
+        self._append(read_time, latency, angles)
+        if self.directory and self.count - self.flushed >= self.chunk:
+            self.flush()
+
+    def _append(self, t: float, latency: float, angles) -> None:
+        with self._lock:
+            i = self.count % self.capacity
+            columns = self._columns
+            columns["t"][i] = t
+            columns["read_latency"][i] = latency
+            columns["measured"][i] = angles
+            columns["commanded"][i] = self._commanded
+            columns["commanded_coords"][i] = self._commanded_coords
+            columns["commands"][i] = self._commands
+            self.count += 1
+            if self.count - self.flushed > self.capacity:
+                # The oldest sample is overwritten; it is lost if it was never flushed
+                self.flushed += 1
+                if self.directory:
+                    self.dropped += 1
+
+    def flush(self) -> int:
+        """
+        Append the samples not yet on disk to the column files.
+
+        Returns:
+            Number of samples written
+        """
+        if not self.directory:
+            return 0
+        with self._lock:
+            start, end = self.flushed, self.count
+            if end == start:
+                return 0
+            index = np.arange(start, end) % self.capacity
+            data = {name: column[index] for name, column in self._columns.items()}
+            self.flushed = end
+
+        for name, values in data.items():
+            with open(os.path.join(self.directory, name + ".bin"), "ab") as f:
+                f.write(np.ascontiguousarray(values).tobytes())
+        return end - start
+
+    # ------------------------------------------------------------------
+    # Live access
+    # ------------------------------------------------------------------
+
+    def latest(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Copy the newest samples out of the ring buffer.
+
+        Args:
+            n: Number of samples (defaults to everything still in the ring)
+
+        Returns:
+            Dictionary of column arrays in time order
+        """
+        with self._lock:
+            available = min(self.count, self.capacity)
+            n = available if n is None else min(n, available)
+            index = np.arange(self.count - n, self.count) % self.capacity
+            return {name: column[index].copy() for name, column in self._columns.items()}
+
+
+def _write_meta(directory: str, rate: float) -> None:
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump({
+            "rate": rate,
+            "columns": {name: [np.dtype(dtype).str, width] for name, (dtype, width) in COLUMNS.items()},
+            "created": time.strftime("%Y-%m-%d %H:%M:%S")
+        }, f, indent=2)
+
+
+class TelemetryLog:
+    """
+    Read-only view of a recorded session with memory-mapped columns.
+
+    Args:
+        directory: Session directory written by TelemetryRecorder
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+
+        self.columns = {}
+        for name, (dtype, width) in self.meta["columns"].items():
+            path = os.path.join(directory, name + ".bin")
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                self.columns[name] = np.zeros((0, width) if width > 1 else 0, dtype)
+                continue
+            values = np.memmap(path, dtype=dtype, mode="r")
+            # A crash can leave a partially written last row; ignore it
+            rows = len(values) // width
+            values = values[:rows * width]
+            self.columns[name] = values.reshape(rows, width) if width > 1 else values
+
+        self.size = min(len(column) for column in self.columns.values())
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name][:self.size]
+
+    def window(self, start: float, end: float) -> Dict[str, np.ndarray]:
+        """
+        Select the samples recorded between two robot clock times.
+
+        Args:
+            start: Window start time (s)
+            end: Window end time (s)
+
+        Returns:
+            Dictionary of column arrays (views into the memory map)
+        """
+        t = self["t"]
+        lo, hi = np.searchsorted(t, [start, end])
+        return {name: self[name][lo:hi] for name in self.columns}
+
+    def tracking_error(self) -> np.ndarray:
+        """
+        Measured minus commanded joint angles per sample (NaN before the first command).
+        """
+        return self["measured"].astype(np.float64) - self["commanded"]
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize sampling timing and tracking accuracy.
+
+        Returns:
+            Dictionary with sample count, achieved rate, jitter, read latency
+            and per-joint tracking error statistics
+        """
+        if self.size < 2:
+            return {"samples": self.size}
+
+        dt = np.diff(self["t"])
+        error = np.abs(self.tracking_error())
+        valid = ~np.isnan(error).any(axis=1)
+        return {
+            "samples": self.size,
+            "duration": float(self["t"][-1] - self["t"][0]),
+            "rate": float(1.0 / dt.mean()),
+            "period_jitter": float(dt.std()),
+            "mean_read_latency": float(self["read_latency"].mean()),
+            "max_read_latency": float(self["read_latency"].max()),
+            "commands": int(self["commands"][-1]),
+            "mean_tracking_error": error[valid].mean(axis=0).tolist() if valid.any() else None,
+            "max_tracking_error": error[valid].max(axis=0).tolist() if valid.any() else None
+        }
+
+
+def new_session_directory(keep: int = None) -> str:
+    """
+    Name a fresh session directory, deleting the oldest sessions beyond the retention limit.
+
+    Args:
+        keep: Number of sessions to keep including the new one (defaults to the configured limit)
+
+    Returns:
+        Path of the new session directory (created when recording starts)
+    """
+    root = TELEMETRY_CONFIG["directory"]
+    keep = keep or TELEMETRY_CONFIG["keep_sessions"]
+    if os.path.isdir(root):
+        # Session names are timestamps, so they sort oldest first
+        sessions = sorted(name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name)))
+        for name in sessions[:max(len(sessions) - (keep - 1), 0)]:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return os.path.join(root, time.strftime("%Y%m%d_%H%M%S"))
+
+
+def benchmark_telemetry(samples: int = 100000) -> Dict[str, float]:
+    """
+    Measure the per-sample and per-command cost of the recorder.
+
+    Args:
+        samples: Number of samples to append
+
+    Returns:
+        Dictionary with costs in microseconds
+    """
+    class _StateCache:
+        poll_rate = 10
+
+    recorder = TelemetryRecorder(None, _StateCache(), capacity=samples)
+    angles = [0.0] * 6
+
+    start = time.perf_counter()
+    for _ in range(samples):
+        recorder._on_command("send_angles", (angles, 50))
+    command_cost = (time.perf_counter() - start) / samples
+
+    start = time.perf_counter()
+    for i in range(samples):
+        recorder._append(float(i), 0.0, angles)
+    sample_cost = (time.perf_counter() - start) / samples
+
+    return {
+        "listener_us": command_cost * 1e6,
+        "append_us": sample_cost * 1e6
+    }
+
+
+if __name__ == "__main__":
+    for name, value in benchmark_telemetry().items():
+        print(f"{name}: {value:.3f}")
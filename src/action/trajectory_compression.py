@@ -0,0 +1,158 @@
+"""
+Trajectory Compression Module for Embodied Agent
+
+This module simplifies recorded joint trajectories before they are stored.
+Manual demonstrations are full of stationary stretches and near-straight
+segments; a Ramer-Douglas-Peucker pass in joint space keeps only the samples
+needed to stay within a per-joint tolerance, and a second pass adds samples
+back wherever the spline used for replay would leave that tolerance.
+
+"""
+
+import time
+import numpy as np
+from typing import Dict, Tuple
+
+# Import system configuration
+from config import TEACHING_CONFIG
+from action.motion_primitives import interpolate_cubic
+
+
+def _interpolate_linear(times: np.ndarray, values: np.ndarray, query: np.ndarray) -> np.ndarray:
+    # Piecewise-linear interpolation of all joints at once
+    segment = np.clip(np.searchsorted(times, query, side="right") - 1, 0, len(times) - 2)
+    s = ((query - times[segment]) / (times[segment + 1] - times[segment]))[:, None]
+    return values[segment] * (1.0 - s) + values[segment + 1] * s
+
+
+def _refine(times: np.ndarray, angles: np.ndarray, keep: np.ndarray, scale: np.ndarray,
+            interpolate) -> np.ndarray:
+    """
+    Split segments until the interpolant stays within tolerance everywhere.
+
+    Every pass evaluates the interpolant through the kept samples at all
+    original times and, in each segment that violates the tolerance, keeps
+    the sample with the largest normalized error. All segments are split in
+    the same pass, so the number of passes grows with the depth of the
+    recursion rather than with the number of kept samples.
+
+    Args:
+        times: Sample times, shape (N,)
+        angles: Joint angles, shape (N, 6)
+        keep: Sorted indices of kept samples, including the first and last
+        scale: Inverse per-joint tolerance, shape (6,)
+        interpolate: Function (times, values, query) -> values
+
+    Returns:
+        Sorted indices of kept samples
+    """
+    while len(keep) < len(times):
+        approx = interpolate(times[keep], angles[keep], times)
+        error = (np.abs(approx - angles) * scale).max(axis=1)
+        error[keep] = 0.0
+
+        # Worst sample of each segment between consecutive kept samples
+        worst = np.maximum.reduceat(error, keep[:-1])
+        segment = np.searchsorted(keep, np.arange(len(times)), side="right") - 1
+        segment = np.minimum(segment, len(keep) - 2)
+        candidates = np.nonzero((error > 1.0) & (error == worst[segment]))[0]
+        if len(candidates) == 0:
+            break
+        _, first = np.unique(segment[candidates], return_index=True)
+        keep = np.union1d(keep, candidates[first])
+    return keep
+
+
+def simplify_trajectory(times, angles, tolerance=None
+                        ) -> Tuple[np.ndarray, np.ndarray, Dict[str, float]]:
+    """
+    Drop samples that replay does not need to stay within a per-joint tolerance.
+
+    Args:
+        times: Sample times in seconds, shape (N,)
+        angles: Joint angles in degrees, shape (N, 6)
+        tolerance: Largest allowed deviation per joint in degrees, scalar or
+            shape (6,) (defaults to the configured tolerance)
+
+    Returns:
+        Tuple of (kept times, kept angles, statistics with sample counts,
+        compression ratio and the largest replay deviation per joint)
+    """
+    if tolerance is None:
+        tolerance = TEACHING_CONFIG["simplify_tolerance"]
+    times = np.asarray(times, dtype=float)
+    angles = np.asarray(angles, dtype=float).reshape(-1, 6)
+    scale = 1.0 / np.broadcast_to(np.asarray(tolerance, dtype=float), (6,))
+
+    # Repeated timestamps carry no timing information
+    unique = np.ones(len(times), dtype=bool)
+    unique[1:] = np.diff(times) > 0
+    times, angles = times[unique], angles[unique]
+    count = len(times)
+
+    if count <= 2:
+        keep = np.arange(count)
+    else:
+        keep = np.array([0, count - 1])
+        # Classic RDP on straight joint-space segments, then make sure the
+        # replay spline through the survivors honours the same bound
+        keep = _refine(times, angles, keep, scale, _interpolate_linear)
+        keep = _refine(times, angles, keep, scale, interpolate_cubic)
+
+    if len(keep) >= 2:
+        replayed = interpolate_cubic(times[keep], angles[keep], times)
+        max_error = np.abs(replayed - angles).max(axis=0)
+    else:
+        max_error = np.zeros(6)
+
+    stats = {
+        "samples": count,
+        "kept": len(keep),
+        "ratio": count / max(len(keep), 1),
+        "max_error": max_error.tolist()
+    }
+    return times[keep], angles[keep], stats
+
+
+def benchmark_simplification(duration: float = 60.0, rate: float = 30.0,
+                             seed: int = 0) -> Dict[str, float]:
+    """
+    Simplify a synthetic demonstration and report size, error and run time.
+
+    The demonstration alternates holds and smooth moves between random poses
+    and carries encoder-like quantization noise.
+
+    Args:
+        duration: Demonstration length in seconds
+        rate: Sample rate in Hz
+        seed: Random seed
+
+    Returns:
+        Dictionary with sample counts, compression ratio, worst error and time
+    """
+    rng = np.random.default_rng(seed)
+    times = np.arange(0.0, duration, 1.0 / rate)
+    poses = rng.uniform(-90.0, 90.0, (int(duration / 2) + 2, 6))
+    # Two-second cycles: hold for the first half, minimum-jerk move for the second
+    phase = np.clip((times % 2.0) - 1.0, 0.0, 1.0)
+    blend = (10 * phase ** 3 - 15 * phase ** 4 + 6 * phase ** 5)[:, None]
+    cycle = (times // 2.0).astype(int)
+    angles = poses[cycle] * (1.0 - blend) + poses[cycle + 1] * blend
+    angles = np.round(angles + rng.normal(0.0, 0.05, angles.shape), 1)
+
+    start = time.perf_counter()
+    _, _, stats = simplify_trajectory(times, angles)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "samples": stats["samples"],
+        "kept": stats["kept"],
+        "ratio": stats["ratio"],
+        "max_error_deg": float(max(stats["max_error"])),
+        "time_s": elapsed
+    }
+
+
+if __name__ == "__main__":
+    for name, value in benchmark_simplification().items():
+        print(f"{name}: {value:.4f}" if isinstance(value, float) else f"{name}: {value}")
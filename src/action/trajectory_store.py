@@ -0,0 +1,318 @@
+"""
+Trajectory Storage Module for Embodied Agent
+
+This module stores recorded joint trajectories in a compact binary format:
+a fixed-size header followed by fixed-size records of a float64 timestamp
+and float32 joint angles. Files are opened with np.memmap, so loading a
+recording costs a header read regardless of its length, and can be written
+incrementally while a demonstration is being recorded.
+
+"""
+
+import os
+import json
+import time
+import shutil
+import struct
+import tempfile
+import numpy as np
+from typing import Dict, NamedTuple, Optional
+
+# File signature and format version
+MAGIC = b"TRAJ"
+VERSION = 1
+
+# magic, version, joint count, header size, sample count, creation time, sample rate
+HEADER = struct.Struct("<4sHHIQdd")
+HEADER_SIZE = 64
+
+# One record per sample: seconds since the start of the recording and joint angles
+SAMPLE_DTYPE = np.dtype([("t", "<f8"), ("angles", "<f4", (6,))])
+
+# File extension of binary trajectories
+EXTENSION = ".traj"
+
+# Suffix of a trajectory that is still being written
+PART_SUFFIX = ".part"
+
+
+class Trajectory(NamedTuple):
+    """
+    A loaded trajectory; times and angles are views into the memory map.
+    """
+    times: np.ndarray     # Seconds since the start, shape (N,)
+    angles: np.ndarray    # Joint angles in degrees, shape (N, 6), float32
+    rate: float           # Nominal sample rate in Hz (0 if unknown)
+    created: float        # Unix time the recording was made
+
+
+def _pack_header(count: int, created: float, rate: float) -> bytes:
+    header = HEADER.pack(MAGIC, VERSION, 6, HEADER_SIZE, count, created, rate)
+    return header.ljust(HEADER_SIZE, b"\0")
+
+
+def read_header(path: str) -> Dict[str, float]:
+    """
+    Read the header of a trajectory file.
+
+    Args:
+        path: Trajectory file
+
+    Returns:
+        Dictionary with 'count', 'created' and 'rate'
+    """
+    with open(path, "rb") as f:
+        data = f.read(HEADER_SIZE)
+    if len(data) < HEADER.size:
+        raise ValueError(f"Trajectory file too short: {path}")
+    magic, version, joints, header_size, count, created, rate = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or joints != 6 or header_size != HEADER_SIZE:
+        raise ValueError(f"Not a supported trajectory file: {path}")
+    return {"count": count, "created": created, "rate": rate}
+
+
+def write_trajectory(path: str, times, angles, rate: float = 0.0,
+                     created: Optional[float] = None) -> str:
+    """
+    Write a trajectory file.
+
+    Args:
+        path: Output file
+        times: Sample times in seconds from the start, shape (N,)
+        angles: Joint angles in degrees, shape (N, 6)
+        rate: Nominal sample rate in Hz
+        created: Unix time of the recording (defaults to now)
+
+    Returns:
+        Path of the written file
+    """
+    times = np.asarray(times, dtype=float)
+    angles = np.asarray(angles, dtype=float).reshape(-1, 6)
+    records = np.empty(len(times), dtype=SAMPLE_DTYPE)
+    records["t"] = times
+    records["angles"] = angles
+
+    with open(path, "wb") as f:
+        f.write(_pack_header(len(records), created or time.time(), rate))
+        f.write(records.tobytes())
+    return path
+
+
+class TrajectoryWriter:
+    """
+    Appends samples to a trajectory file as they are recorded.
+
+    Samples go to '<path>.part' with a sample count of zero in the header;
+    close() writes the real count and renames the file into place. Data is
+    fsynced at most every sync_interval seconds, so a crash loses at most
+    that much, and recover_trajectory() turns a leftover part file into a
+    complete trajectory.
+
+    Args:
+        path: Final trajectory file
+        rate: Nominal sample rate in Hz
+        sync_interval: Seconds between fsyncs (0 syncs every append)
+    """
+
+    def __init__(self, path: str, rate: float = 0.0, sync_interval: float = 1.0):
+        self.path = path
+        self.part_path = path + PART_SUFFIX
+        self.rate = rate
+        self.sync_interval = sync_interval
+        self.created = time.time()
+        self.count = 0
+        self._last_sync = time.monotonic()
+        self._file = open(self.part_path, "wb")
+        self._file.write(_pack_header(0, self.created, rate))
+        self._sync()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+
+    def append(self, times, angles) -> None:
+        """
+        Append samples.
+
+        Args:
+            times: Sample times in seconds from the start, shape (N,)
+            angles: Joint angles in degrees, shape (N, 6)
+        """
+        records = np.empty(len(times), dtype=SAMPLE_DTYPE)
+        records["t"] = times
+        records["angles"] = np.asarray(angles).reshape(-1, 6)
+        self._file.write(records.tobytes())
+        self.count += len(records)
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            self._sync()
+
+    def close(self) -> str:
+        """
+        Write the final header and move the file into place.
+
+        Returns:
+            Path of the complete trajectory
+        """
+        self._file.seek(0)
+        self._file.write(_pack_header(self.count, self.created, self.rate))
+        self._sync()
+        self._file.close()
+        os.replace(self.part_path, self.path)
+        return self.path
+
+
+def recover_trajectory(part_path: str) -> str:
+    """
+    Complete a trajectory left behind by an interrupted TrajectoryWriter.
+
+    The sample count is recovered from the file size; a partially written
+    last record is cut off.
+
+    Args:
+        part_path: The '.part' file
+
+    Returns:
+        Path of the recovered trajectory
+    """
+    path = part_path[:-len(PART_SUFFIX)]
+    with open(part_path, "r+b") as f:
+        data = f.read(HEADER_SIZE)
+        if len(data) < HEADER_SIZE or data[:4] != MAGIC:
+            raise ValueError(f"Not a trajectory file: {part_path}")
+        _, _, _, _, _, created, rate = HEADER.unpack_from(data)
+        count = (os.fstat(f.fileno()).st_size - HEADER_SIZE) // SAMPLE_DTYPE.itemsize
+        f.truncate(HEADER_SIZE + count * SAMPLE_DTYPE.itemsize)
+        f.seek(0)
+        f.write(_pack_header(count, created, rate))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(part_path, path)
+    return path
+
+
+def read_trajectory(path: str) -> Trajectory:
+    """
+    Open a trajectory file without copying its samples.
+
+    Args:
+        path: Trajectory file
+
+    Returns:
+        Trajectory whose arrays are backed by a read-only memory map
+    """
+    header = read_header(path)
+    count = header["count"]
+    if count == 0:
+        records = np.empty(0, dtype=SAMPLE_DTYPE)
+    else:
+        records = np.memmap(path, dtype=SAMPLE_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+    return Trajectory(records["t"], records["angles"], header["rate"], header["created"])
+
+
+def convert_json_recording(json_path: str, rate: float = 5.0, remove: bool = False) -> str:
+    """
+    Convert a JSON teaching recording (a list of joint-angle lists) to the binary format.
+
+    JSON recordings carry no timestamps, so samples are spaced at the rate
+    they were recorded with (5 Hz for the original teaching mode).
+
+    Args:
+        json_path: JSON recording
+        rate: Sample rate the recording was made at
+        remove: Delete the JSON file after a successful conversion
+
+    Returns:
+        Path of the binary trajectory
+    """
+    with open(json_path, "r") as f:
+        positions = [p for p in json.load(f) if isinstance(p, list) and len(p) == 6]
+
+    angles = np.array(positions, dtype=float).reshape(-1, 6)
+    times = np.arange(len(angles)) / rate
+    path = os.path.splitext(json_path)[0] + EXTENSION
+    write_trajectory(path, times, angles, rate, created=os.path.getmtime(json_path))
+
+    if remove:
+        os.remove(json_path)
+    return path
+
+
+def convert_directory(directory: str, rate: float = 5.0, remove: bool = False) -> int:
+    """
+    Convert every JSON recording in a directory that has no binary version yet.
+
+    Args:
+        directory: Directory with teaching recordings
+        rate: Sample rate the JSON recordings were made at
+        remove: Delete each JSON file after converting it
+
+    Returns:
+        Number of converted recordings
+    """
+    converted = 0
+    for name in sorted(os.listdir(directory)):
+        base, extension = os.path.splitext(name)
+        if extension != ".json" or os.path.exists(os.path.join(directory, base + EXTENSION)):
+            continue
+        try:
+            convert_json_recording(os.path.join(directory, name), rate, remove)
+            converted += 1
+        except Exception as e:
+            print(f"Error converting {name}: {e}")
+    return converted
+
+
+def benchmark_trajectory_io(samples: int = 100000, directory: Optional[str] = None) -> Dict[str, float]:
+    """
+    Compare loading a recording from JSON and from the binary format.
+
+    Args:
+        samples: Recording length in samples
+        directory: Parent of the scratch directory (defaults to the system
+            temporary directory); the scratch directory is removed afterwards
+
+    Returns:
+        Dictionary with file sizes (bytes) and load times (seconds)
+    """
+    rng = np.random.default_rng(0)
+    angles = np.cumsum(rng.normal(0, 0.5, (samples, 6)), axis=0).round(2)
+    scratch = tempfile.mkdtemp(prefix="trajectory_io_", dir=directory)
+    try:
+        json_path = os.path.join(scratch, "benchmark_teaching.json")
+        binary_path = os.path.join(scratch, "benchmark_teaching" + EXTENSION)
+
+        with open(json_path, "w") as f:
+            json.dump(angles.tolist(), f)
+        write_trajectory(binary_path, np.arange(samples) / 50.0, angles, 50.0)
+
+        start = time.perf_counter()
+        with open(json_path, "r") as f:
+            loaded = np.array(json.load(f))
+        json_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        trajectory = read_trajectory(binary_path)
+        open_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        total = float(np.asarray(trajectory.angles).sum())
+        read_time = time.perf_counter() - start
+
+        results = {
+            "samples": samples,
+            "json_bytes": os.path.getsize(json_path),
+            "binary_bytes": os.path.getsize(binary_path),
+            "json_load_s": json_time,
+            "binary_open_s": open_time,
+            "binary_full_read_s": read_time
+        }
+        del trajectory, loaded, total
+        return results
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    for name, value in benchmark_trajectory_io().items():
+        print(f"{name}: {value:.6f}" if isinstance(value, float) else f"{name}: {value}")
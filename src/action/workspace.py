@@ -0,0 +1,258 @@
+"""
+Workspace Occupancy Module for Embodied Agent
+
+This module keeps a coarse 3D occupancy grid of the table workspace, built
+from known object locations and heights. The planner uses it to pick the
+lowest collision-free transit height for each lateral move instead of always
+climbing to the fixed safe height.
+
+Transits never go below the clutter floor (table height plus clutter_height),
+which covers unmapped items and objects located without a measured height.
+The grid therefore only raises a path over items taller than that, such as
+objects stacked by earlier placements.
+
+"""
+
+import time
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+# Import system configuration
+from config import CAMERA_CONFIG, ROBOT_CONFIG, WORKSPACE_CONFIG
+
+
+class OccupancyGrid:
+    """
+    Voxel grid of occupied space above the table.
+
+    Column top heights are derived from the voxels in one vectorized pass and
+    cached, together with their dilation by the tool radius, so transit
+    height queries only gather and reduce precomputed arrays.
+
+    Args:
+        bounds: ((x_min, x_max), (y_min, y_max), (z_min, z_max)) in mm
+        resolution: Voxel edge length in mm
+    """
+
+    def __init__(self, bounds=None, resolution: float = None):
+        bounds = bounds or WORKSPACE_CONFIG["bounds"]
+        self.resolution = resolution or WORKSPACE_CONFIG["resolution"]
+        self.origin = np.array([b[0] for b in bounds], dtype=float)
+        extent = np.array([b[1] - b[0] for b in bounds], dtype=float)
+        self.shape = tuple(np.ceil(extent / self.resolution).astype(int))
+
+        self.voxels = np.zeros(self.shape, dtype=bool)
+        self.mapped = False
+        self._tops = None
+        self._dilated = {}
+
+    # ------------------------------------------------------------------
+    # Building the map
+    # ------------------------------------------------------------------
+
+    def clear(self) -> None:
+        """
+        Forget all obstacles and mark the workspace as unmapped.
+        """
+        self.voxels[:] = False
+        self.mapped = False
+        self._invalidate()
+
+    def mark_mapped(self) -> None:
+        """
+        Declare that the grid now reflects an observation of the scene.
+        """
+        self.mapped = True
+
+    def _invalidate(self) -> None:
+        self._tops = None
+        self._dilated = {}
+
+    def _index_range(self, low: float, high: float, axis: int) -> slice:
+        start = int(np.floor((low - self.origin[axis]) / self.resolution))
+        stop = int(np.ceil((high - self.origin[axis]) / self.resolution))
+        return slice(max(start, 0), max(min(stop, self.shape[axis]), 0))
+
+    def set_box(self, center: Sequence[float], size: Sequence[float], height: float,
+                base: Optional[float] = None, occupied: bool = True) -> None:
+        """
+        Mark (or clear) an axis-aligned box resting on the table.
+
+        Args:
+            center: Box center [x, y] in mm
+            size: Box footprint [dx, dy] in mm
+            height: Box height in mm
+            base: Z of the box bottom; defaults to the table height
+            occupied: True to add the box, False to remove it
+        """
+        base = CAMERA_CONFIG["table_height"] if base is None else base
+        xs = self._index_range(center[0] - size[0] / 2, center[0] + size[0] / 2, 0)
+        ys = self._index_range(center[1] - size[1] / 2, center[1] + size[1] / 2, 1)
+        zs = self._index_range(base, base + height, 2)
+        self.voxels[xs, ys, zs] = occupied
+        self._invalidate()
+
+    def add_box(self, center: Sequence[float], size: Sequence[float], height: float,
+                base: Optional[float] = None) -> None:
+        """
+        Add an obstacle box (see set_box).
+        """
+        self.set_box(center, size, height, base, True)
+
+    def remove_box(self, center: Sequence[float], size: Sequence[float], height: float,
+                   base: Optional[float] = None) -> None:
+        """
+        Remove an obstacle box, e.g. after the object has been picked up (see set_box).
+        """
+        self.set_box(center, size, height, base, False)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def column_tops(self) -> np.ndarray:
+        """
+        Height of the highest occupied voxel top in each (x, y) column.
+
+        Returns:
+            Array of shape (nx, ny) in mm; the table height for empty columns
+        """
+        if self._tops is None:
+            nz = self.shape[2]
+            occupied = self.voxels.any(axis=2)
+            # Index of the highest occupied voxel, found from the top down
+            highest = nz - 1 - np.argmax(self.voxels[:, :, ::-1], axis=2)
+            tops = self.origin[2] + (highest + 1) * self.resolution
+            self._tops = np.where(occupied, tops, CAMERA_CONFIG["table_height"])
+        return self._tops
+
+    def dilated_tops(self, radius: float) -> np.ndarray:
+        """
+        Column tops maximized over a disc, so a tool of this radius clears them.
+
+        Args:
+            radius: Tool (or carried object) radius in mm
+
+        Returns:
+            Array of shape (nx, ny) in mm
+        """
+        cells = int(np.ceil(radius / self.resolution))
+        if cells not in self._dilated:
+            tops = self.column_tops()
+            padded = np.pad(tops, cells, mode="edge")
+            result = tops.copy()
+            for dx in range(-cells, cells + 1):
+                for dy in range(-cells, cells + 1):
+                    if dx * dx + dy * dy > cells * cells:
+                        continue
+                    shifted = padded[cells + dx:cells + dx + tops.shape[0],
+                                     cells + dy:cells + dy + tops.shape[1]]
+                    np.maximum(result, shifted, out=result)
+            self._dilated[cells] = result
+        return self._dilated[cells]
+
+    def transit_heights(self, starts, ends, payload_height: float = 0.0,
+                        radius: Optional[float] = None) -> np.ndarray:
+        """
+        Lowest collision-free tool heights for straight lateral moves.
+
+        Args:
+            starts: Move start points [x, y], shape (M, 2)
+            ends: Move end points [x, y], shape (M, 2)
+            payload_height: Height of an object hanging below the tool in mm
+            radius: Clearance radius around the tool path in mm
+
+        Returns:
+            Tool heights in mm, shape (M,), never below the clutter floor
+            plus clearance. Moves through an unmapped workspace get the
+            configured safe height.
+        """
+        starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+        if not self.mapped:
+            return np.full(len(starts), float(ROBOT_CONFIG["safe_height"]))
+
+        radius = WORKSPACE_CONFIG["tool_radius"] if radius is None else radius
+        tops = self.dilated_tops(radius)
+
+        # Sample every segment at half-voxel spacing, all moves at once
+        length = np.linalg.norm(ends - starts, axis=1)
+        samples = max(2, int(np.ceil(length.max() / (self.resolution / 2))) + 1)
+        s = np.linspace(0.0, 1.0, samples)
+        points = starts[:, None, :] + (ends - starts)[:, None, :] * s[None, :, None]
+
+        idx = np.floor((points - self.origin[:2]) / self.resolution).astype(int)
+        inside = ((idx >= 0) & (idx < np.array(self.shape[:2]))).all(axis=2)
+        idx = np.clip(idx, 0, np.array(self.shape[:2]) - 1)
+        path_tops = np.where(inside, tops[idx[..., 0], idx[..., 1]], CAMERA_CONFIG["table_height"])
+
+        floor = CAMERA_CONFIG["table_height"] + WORKSPACE_CONFIG["clutter_height"]
+        heights = np.maximum(path_tops.max(axis=1), floor) + WORKSPACE_CONFIG["clearance"] + payload_height
+        return np.minimum(heights, ROBOT_CONFIG["safe_height"])
+
+    def transit_height(self, start: Sequence[float], end: Sequence[float],
+                       payload_height: float = 0.0) -> float:
+        """
+        Lowest collision-free tool height for one lateral move (see transit_heights).
+        """
+        return float(self.transit_heights([start[:2]], [end[:2]], payload_height)[0])
+
+
+def benchmark_transit_planning(n_objects: int = 8, n_moves: int = 200, seed: int = 0) -> Dict[str, float]:
+    """
+    Compare fixed safe-height transits with occupancy-based transits.
+
+    Random tabletop scenes are generated and random moves between table
+    points are planned both ways. Move time uses the arm's linear speed at
+    the configured coordinate speed.
+
+    Args:
+        n_objects: Obstacles per scene
+        n_moves: Number of moves to plan
+        seed: Random seed
+
+    Returns:
+        Dictionary with vertical travel, estimated motion time and planning time
+    """
+    rng = np.random.default_rng(seed)
+    grid = OccupancyGrid()
+    (x0, x1), (y0, y1), _ = WORKSPACE_CONFIG["bounds"]
+
+    for _ in range(n_objects):
+        center = rng.uniform([x0 + 40, y0 + 40], [x1 - 40, y1 - 40])
+        grid.add_box(center, rng.uniform(30, 80, 2), rng.uniform(20, 90))
+    grid.mark_mapped()
+
+    starts = rng.uniform([x0, y0], [x1, y1], (n_moves, 2))
+    ends = rng.uniform([x0, y0], [x1, y1], (n_moves, 2))
+    # Moves start and end at the approach height above the table
+    z_start = z_end = CAMERA_CONFIG["table_height"] + 50.0
+
+    t = time.perf_counter()
+    adaptive = grid.transit_heights(starts, ends)
+    planning_time = time.perf_counter() - t
+    adaptive = np.maximum(adaptive, max(z_start, z_end))
+    fixed = np.full(n_moves, float(ROBOT_CONFIG["safe_height"]))
+
+    lateral = np.linalg.norm(ends - starts, axis=1)
+    speed = ROBOT_CONFIG["max_linear_speed"] * ROBOT_CONFIG["coordinate_speed"] / 100.0
+
+    def totals(heights: np.ndarray) -> Tuple[float, float]:
+        vertical = (heights - z_start) + (heights - z_end)
+        return float(vertical.sum()), float((vertical + lateral).sum() / speed)
+
+    fixed_vertical, fixed_time = totals(fixed)
+    adaptive_vertical, adaptive_time = totals(adaptive)
+    return {
+        "moves": n_moves,
+        "fixed_vertical_mm": fixed_vertical,
+        "adaptive_vertical_mm": adaptive_vertical,
+        "fixed_motion_time_s": fixed_time,
+        "adaptive_motion_time_s": adaptive_time,
+        "planning_time_s": planning_time
+    }
+
+
+if __name__ == "__main__":
+    for name, value in benchmark_transit_planning().items():
+        print(f"{name}: {value:.3f}" if isinstance(value, float) else f"{name}: {value}")
@@ -8,12 +8,14 @@ large language models to interpret instructions and generate action plans.
 
 import os
 import json
+import numpy as np
 from typing import Dict, List, Any, Union
 
 # Import from our own modules
 from models.llm_interface import query_llm_with_history
 from .prompts import SYSTEM_PROMPT
 from config import DEFAULT_TEXT_MODEL
+from perception.calibration import box_centers_to_robot
 
 def coordinate_actions(message_history: List[Dict[str, str]], model_name: str = None) -> Dict[str, Any]:
     """
@@ -67,6 +69,55 @@ def coordinate_actions(message_history: List[Dict[str, str]], model_name: str =
     return action_plan
 
 
+def _box_corners(box: Any) -> Union[np.ndarray, None]:
+    """
+    Returns the two corners of a bounding box from the vision model.
+    
+    Boxes without two numeric corners or without area, like the
+    [[0, 0], [0, 0]] placeholder of a failed vision call, are rejected.
+    
+    Args:
+        box: Box as [[x1, y1], [x2, y2]]
+        
+    Returns:
+        Corners with shape (2, 2), or None if the box locates nothing
+    """
+    try:
+        corners = np.array(box[:2], dtype=float)
+    except (TypeError, ValueError, KeyError):
+        return None
+    if corners.shape != (2, 2) or not np.isfinite(corners).all():
+        return None
+    if np.any(corners[0] == corners[1]):
+        return None
+    return corners
+
+
+def _locate_move(move: Dict[str, Any]) -> Union[np.ndarray, None]:
+    """
+    Returns the object and destination boxes of one move from the vision model.
+    
+    A move is rejected if either label is 'unknown', either box has no
+    area, or both boxes are the same, since that means the vision model did
+    not find what the instruction refers to.
+    
+    Args:
+        move: Dictionary with 'start', 'start_xyxy', 'end' and 'end_xyxy'
+        
+    Returns:
+        Boxes with shape (2, 2, 2) (start/end, corner, u/v), or None
+    """
+    for key in ('start', 'end'):
+        label = move.get(key)
+        if label is not None and str(label).strip().lower() in ('', 'unknown'):
+            return None
+    start = _box_corners(move.get('start_xyxy'))
+    end = _box_corners(move.get('end_xyxy'))
+    if start is None or end is None or np.array_equal(start, end):
+        return None
+    return np.array([start, end])
+
+
 def parse_visual_instruction(instruction: str, coordinates: Dict[str, Any]) -> Dict[str, Any]:
     """
     Parses a visual instruction with object coordinates to create actionable parameters.
@@ -76,32 +127,75 @@ def parse_visual_instruction(instruction: str, coordinates: Dict[str, Any]) -> D
         coordinates: Dictionary containing object coordinates from vision model
         
     Returns:
-        Dictionary with parsed parameters for robot action
+        Dictionary with parsed parameters for robot action, including the
+        pixel centers and the 'source' and 'target' robot coordinates (None
+        if the vision result does not locate both objects)
     """
-    # Extract start and end coordinates from vision analysis
+    if not isinstance(coordinates, dict):
+        coordinates = {}
+    
     start_coords = None
     end_coords = None
+    source = None
+    target = None
     
-    if 'start_xyxy' in coordinates and len(coordinates['start_xyxy']) >= 2:
-        # Calculate center point of the starting object
-        x1, y1 = coordinates['start_xyxy'][0]
-        x2, y2 = coordinates['start_xyxy'][1]
-        start_center_x = (x1 + x2) // 2
-        start_center_y = (y1 + y2) // 2
-        start_coords = [start_center_x, start_center_y]
-    
-    if 'end_xyxy' in coordinates and len(coordinates['end_xyxy']) >= 2:
-        # Calculate center point of the destination object
-        x1, y1 = coordinates['end_xyxy'][0]
-        x2, y2 = coordinates['end_xyxy'][1]
-        end_center_x = (x1 + x2) // 2
-        end_center_y = (y1 + y2) // 2
-        end_coords = [end_center_x, end_center_y]
+    boxes = _locate_move(coordinates)
+    if boxes is None:
+        print("The vision result does not locate both the object and its destination")
+    else:
+        # Pixel centers of the object and the destination
+        start_coords, end_coords = (boxes.sum(axis=1) // 2).astype(int).tolist()
+        # Map both boxes to robot coordinates with the camera calibration
+        positions = box_centers_to_robot(boxes)
+        source, target = [{'x': float(p[0]), 'y': float(p[1]), 'z': float(p[2])} for p in positions]
     
     return {
         'instruction': instruction,
         'start_object': coordinates.get('start', 'unknown object'),
         'end_object': coordinates.get('end', 'target location'),
         'start_coords': start_coords,
-        'end_coords': end_coords
+        'end_coords': end_coords,
+        'source': source,
+        'target': target
     }
+
+
+def parse_visual_instructions(instruction: str, detections: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Parses a multi-object vision result into pick-and-place tasks.
+    
+    All bounding boxes are transformed to robot coordinates in one batch.
+    Moves that do not locate both their object and destination are skipped.
+    
+    Args:
+        instruction: The original instruction (e.g., "Put all the blocks in the bowl")
+        detections: Dictionary with a 'moves' list from the vision model
+        
+    Returns:
+        List of tasks, each with 'source' and 'target' robot coordinates
+    """
+    moves = detections.get('moves', []) if isinstance(detections, dict) else []
+    
+    # Keep only moves that locate both the object and the destination
+    located = [(m, _locate_move(m)) for m in moves if isinstance(m, dict)]
+    valid = [m for m, boxes in located if boxes is not None]
+    if len(valid) < len(moves):
+        print(f"Skipping {len(moves) - len(valid)} moves the vision result does not locate")
+    if not valid:
+        return []
+    
+    # Shape (N, 2, 2, 2): move, start/end, corner, u/v
+    boxes = np.array([found for _, found in located if found is not None])
+    positions = box_centers_to_robot(boxes.reshape(-1, 2, 2)).reshape(len(valid), 2, 3)
+    
+    tasks = []
+    for move, (source, target) in zip(valid, positions):
+        tasks.append({
+            'instruction': instruction,
+            'start_object': move.get('start', 'unknown object'),
+            'end_object': move.get('end', 'target location'),
+            'source': {'x': float(source[0]), 'y': float(source[1]), 'z': float(source[2])},
+            'target': {'x': float(target[0]), 'y': float(target[1]), 'z': float(target[2])}
+        })
+    
+    return tasks
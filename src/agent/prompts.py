@@ -25,7 +25,9 @@ respond with JSON containing functions to execute and your verbal response.
 - Display camera feed on screen: check_camera()
 - Change LED light color: change_led_color("Change the LED light to deep green")
 - Move an object to another location: move_object("Put the red cube on the piggy")
+- Move several objects in one go: move_objects("Put all the blocks in the bowl")
 - Teach mode (I manually guide you, then you repeat): teaching_mode()
+- Repeat the taught motion that starts closest to your current pose: replay_closest_teaching()
 - Visual question answering: visual_qa("Tell me how many blocks you see")
 - Wait for specified time: time.sleep(2)
 
@@ -53,6 +55,12 @@ Output: {"function":["pump_on()", "rotate_joint(2, 30)"], "response":"Activating
 Input: Put the green cube on Peppa Pig.
 Output: {"function":["move_object(\"Put the green cube on Peppa Pig\")"], "response":"Right away! But where's George?"}
 
+Input: Put all the blocks in the bowl.
+Output: {"function":["move_objects(\"Put all the blocks in the bowl\")"], "response":"Tidying up, one efficient trip at a time"}
+
+Input: Do that move I taught you again.
+Output: {"function":["replay_closest_teaching()"], "response":"Practice makes perfect, here it comes again"}
+
 Input: First return to zero, wait 3 seconds, then turn on pump.
 Output: {"function":["back_to_zero()", "time.sleep(3)", "pump_on()"], "response":"If miracles had a color, it would definitely be red"}
 
@@ -86,6 +94,25 @@ I'll respond with:
 Respond only with the JSON object, no additional text.
 '''
 
+# System prompt for localizing several objects for a batch of moves
+MULTI_VISION_SYSTEM_PROMPT = '''
+I will analyze the image to find every object your instruction asks to move and
+where each one should go, providing pixel coordinates in JSON format.
+
+For example, if your instruction is: "Put all the blocks in the bowl",
+I'll respond with:
+{
+ "moves":[
+  {"start":"red block", "start_xyxy":[[102,505],[324,860]],
+   "end":"bowl", "end_xyxy":[[600,150],[776,310]]},
+  {"start":"green block", "start_xyxy":[[410,620],[520,760]],
+   "end":"bowl", "end_xyxy":[[600,150],[776,310]]}
+ ]
+}
+
+Respond only with the JSON object, no additional text.
+'''
+
 # System prompt for visual question answering
 VISUAL_QA_PROMPT = '''
 Please identify all objects in the image, describing each with its name, category, and function.
@@ -7,16 +7,37 @@ used by the embodied agent system.
 """
 
 import os
+import ast
 import base64
 import logging
 from typing import List, Dict, Any, Optional, Union, Tuple
 import json
 
-# Import third-party libraries
-from openai import OpenAI
-import qianfan
-from anthropic import Anthropic
-import google.generativeai as genai
+# Import third-party libraries; each provider is optional so the agent runs
+# with whichever SDKs are installed
+try:
+    from openai import OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+try:
+    import qianfan
+    QIANFAN_AVAILABLE = True
+except ImportError:
+    QIANFAN_AVAILABLE = False
+
+try:
+    from anthropic import Anthropic
+    ANTHROPIC_AVAILABLE = True
+except ImportError:
+    ANTHROPIC_AVAILABLE = False
+
+try:
+    import google.generativeai as genai
+    GEMINI_AVAILABLE = True
+except ImportError:
+    GEMINI_AVAILABLE = False
 
 # Import configuration
 from config import (
@@ -24,7 +45,7 @@ from config import (
     QWEN_API_KEY, YI_API_KEY, QIANFAN_ACCESS_KEY, QIANFAN_SECRET_KEY,
     APPBUILDER_TOKEN, DEFAULT_TEXT_MODEL, DEFAULT_VISION_MODEL
 )
-from agent.prompts import VISION_SYSTEM_PROMPT, VISUAL_QA_PROMPT
+from agent.prompts import VISION_SYSTEM_PROMPT, VISUAL_QA_PROMPT, MULTI_VISION_SYSTEM_PROMPT
 
 # Re-export system prompt for convenience
 from agent.prompts import SYSTEM_PROMPT
@@ -34,6 +55,14 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
+def _require(available: bool, package: str) -> None:
+    """
+    Raise ImportError if a provider SDK is not installed.
+    """
+    if not available:
+        raise ImportError(f"{package} is not installed")
+
+
 # ====================== OpenAI GPT Models ======================
 
 def query_openai_gpt(messages: List[Dict[str, str]], model: str = "gpt-4o") -> str:
@@ -48,6 +77,7 @@ def query_openai_gpt(messages: List[Dict[str, str]], model: str = "gpt-4o") -> s
         Model response text
     """
     try:
+        _require(OPENAI_AVAILABLE, "openai")
         # OpenAI client setup with optional organization ID
         client_kwargs = {"api_key": OPENAI_API_KEY}
         if OPENAI_ORG_ID:
@@ -83,6 +113,7 @@ def query_claude(messages: List[Dict[str, str]], model: str = "claude-3-opus-202
         Model response text
     """
     try:
+        _require(ANTHROPIC_AVAILABLE, "anthropic")
         client = Anthropic(api_key=ANTHROPIC_API_KEY)
         
         # Convert messages format to Anthropic's expected format
@@ -125,6 +156,7 @@ def query_gemini(messages: List[Dict[str, str]], model: str = "gemini-1.5-pro")
         Model response text
     """
     try:
+        _require(GEMINI_AVAILABLE, "google-generativeai")
         # Configure the Google Gemini API
         genai.configure(api_key=GOOGLE_API_KEY)
         
@@ -161,6 +193,7 @@ def query_yi_llm(messages: List[Dict[str, str]], model: str = "yi-large") -> str
         Model response text
     """
     try:
+        _require(OPENAI_AVAILABLE, "openai")
         api_base = "https://api.lingyiwanwu.com/v1"
         
         # Access the LLM API
@@ -188,6 +221,7 @@ def query_qianfan_llm(prompt: str, model: str = "ERNIE-Bot-4") -> str:
         Model response text
     """
     try:
+        _require(QIANFAN_AVAILABLE, "qianfan")
         # Set API access credentials
         os.environ["QIANFAN_ACCESS_KEY"] = QIANFAN_ACCESS_KEY
         os.environ["QIANFAN_SECRET_KEY"] = QIANFAN_SECRET_KEY
@@ -323,7 +357,66 @@ def query_llm_with_history(messages: List[Dict[str, str]], model_name: str = Non
 
 # ====================== Multimodal Vision Models ======================
 
-def query_openai_vision(instruction: str, img_path: str, model: str = "gpt-4o") -> Union[Dict[str, Any], str]:
+def _vision_prompt(vision_option: int) -> str:
+    """
+    System prompt for a vision task (0 localization, 1 visual QA, 2 multi-object localization).
+    """
+    if vision_option == 0:
+        return VISION_SYSTEM_PROMPT
+    elif vision_option == 2:
+        return MULTI_VISION_SYSTEM_PROMPT
+    return VISUAL_QA_PROMPT
+
+
+def _vision_fallback(vision_option: int) -> Union[Dict[str, Any], str]:
+    """
+    Result returned when a vision task fails, shaped like a successful one.
+    """
+    if vision_option == 0:
+        return {"start": "unknown", "start_xyxy": [[0, 0], [0, 0]],
+                "end": "unknown", "end_xyxy": [[0, 0], [0, 0]]}
+    elif vision_option == 2:
+        return {"moves": []}
+    return "I cannot identify the objects in the image due to an error."
+
+
+def parse_vision_json(response_text: str, vision_option: int, source: str) -> Dict[str, Any]:
+    """
+    Parse the JSON object a vision model returned for a localization task.
+    
+    The object may be wrapped in a Markdown code fence, and Python-style
+    literals (single quotes) are accepted through ast.literal_eval. The
+    response is only ever parsed, never executed.
+    
+    Args:
+        response_text: Raw model output
+        vision_option: 0 for object localization, 2 for several objects
+        source: Model name for log messages
+        
+    Returns:
+        The parsed object, or the task's fallback result if it cannot be parsed
+    """
+    text = response_text.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        if text.startswith("json"):
+            text = text[len("json"):]
+    try:
+        result = json.loads(text)
+    except ValueError:
+        try:
+            result = ast.literal_eval(text.strip())
+        except (ValueError, SyntaxError) as e:
+            logger.error(f"Error parsing {source} vision response ({e}): {response_text}")
+            return _vision_fallback(vision_option)
+    if not isinstance(result, dict):
+        logger.error(f"Unexpected {source} vision response: {response_text}")
+        return _vision_fallback(vision_option)
+    return result
+
+
+def query_openai_vision(instruction: str, img_path: str, model: str = "gpt-4o",
+                        vision_option: Optional[int] = None) -> Union[Dict[str, Any], str]:
     """
     Query OpenAI's vision models for image understanding.
     
@@ -331,11 +424,14 @@ def query_openai_vision(instruction: str, img_path: str, model: str = "gpt-4o")
         instruction: Text instruction or question
         img_path: Path to the image file
         model: Model name to use (default: gpt-4o)
+        vision_option: Task as for query_qwen_vision; None sends the
+                       instruction as it is
         
     Returns:
         Model response (dict for localization tasks, str for QA)
     """
     try:
+        _require(OPENAI_AVAILABLE, "openai")
         # OpenAI client setup with optional organization ID
         client_kwargs = {"api_key": OPENAI_API_KEY}
         if OPENAI_ORG_ID:
@@ -343,6 +439,9 @@ def query_openai_vision(instruction: str, img_path: str, model: str = "gpt-4o")
         
         client = OpenAI(**client_kwargs)
         
+        if vision_option is not None:
+            instruction = _vision_prompt(vision_option) + instruction
+        
         # Encode image as base64
         with open(img_path, 'rb') as image_file:
             image_data = base64.b64encode(image_file.read()).decode('utf-8')
@@ -368,7 +467,9 @@ def query_openai_vision(instruction: str, img_path: str, model: str = "gpt-4o")
         response_text = response.choices[0].message.content.strip()
         
         # Parse response if it's a localization task
-        if "localize" in instruction.lower() or "locate" in instruction.lower():
+        if vision_option in (0, 2):
+            return parse_vision_json(response_text, vision_option, "OpenAI")
+        if vision_option is None and ("localize" in instruction.lower() or "locate" in instruction.lower()):
             try:
                 return json.loads(response_text)
             except json.JSONDecodeError:
@@ -379,21 +480,27 @@ def query_openai_vision(instruction: str, img_path: str, model: str = "gpt-4o")
         
     except Exception as e:
         logger.error(f"Error querying OpenAI vision: {e}")
+        if vision_option in (0, 2):
+            return _vision_fallback(vision_option)
         return "I encountered an error analyzing the image."
 
 
-def query_gemini_vision(instruction: str, img_path: str) -> str:
+def query_gemini_vision(instruction: str, img_path: str,
+                        vision_option: Optional[int] = None) -> Union[Dict[str, Any], str]:
     """
     Query Google's Gemini for image understanding.
     
     Args:
         instruction: Text instruction or question
         img_path: Path to the image file
+        vision_option: Task as for query_qwen_vision; None sends the
+                       instruction as it is
         
     Returns:
-        Model response text
+        Model response (dict for localization tasks, str otherwise)
     """
     try:
+        _require(GEMINI_AVAILABLE, "google-generativeai")
         # Configure the Google Gemini API
         genai.configure(api_key=GOOGLE_API_KEY)
         
@@ -401,13 +508,19 @@ def query_gemini_vision(instruction: str, img_path: str) -> str:
         image = genai.upload_file(img_path)
         
         # Create and invoke the model
+        if vision_option is not None:
+            instruction = _vision_prompt(vision_option) + instruction
         model = genai.GenerativeModel('gemini-1.5-pro')
         response = model.generate_content([instruction, image])
         
+        if vision_option in (0, 2):
+            return parse_vision_json(response.text, vision_option, "Gemini")
         return response.text
         
     except Exception as e:
         logger.error(f"Error querying Gemini vision: {e}")
+        if vision_option in (0, 2):
+            return _vision_fallback(vision_option)
         return "I encountered an error analyzing the image with Gemini."
 
 
@@ -418,17 +531,16 @@ def query_qwen_vision(instruction: str, img_path: str, vision_option: int = 0) -
     Args:
         instruction: Text instruction or question
         img_path: Path to the image file
-        vision_option: 0 for object localization, 1 for visual QA
+        vision_option: 0 for object localization, 1 for visual QA,
+                       2 for localizing several objects at once
     
     Returns:
         Model response for the image understanding task (dict for localization, str for QA)
     """
     try:
+        _require(OPENAI_AVAILABLE, "openai")
         # Configure system prompt based on task type
-        if vision_option == 0:
-            system_prompt = VISION_SYSTEM_PROMPT
-        else:
-            system_prompt = VISUAL_QA_PROMPT
+        system_prompt = _vision_prompt(vision_option)
         
         # Using Qwen VL model via OpenAI-compatible API
         client = OpenAI(
@@ -465,24 +577,14 @@ def query_qwen_vision(instruction: str, img_path: str, vision_option: int = 0) -
         # Parse response based on task type
         response_text = completion.choices[0].message.content.strip()
         
-        if vision_option == 0:  # Object localization
-            try:
-                result = eval(response_text)
-                return result
-            except:
-                logger.error(f"Error parsing Qwen vision response: {response_text}")
-                return {"start": "unknown", "start_xyxy": [[0, 0], [0, 0]], 
-                        "end": "unknown", "end_xyxy": [[0, 0], [0, 0]]}
+        if vision_option in (0, 2):  # Object localization
+            return parse_vision_json(response_text, vision_option, "Qwen")
         else:  # Visual QA
             return response_text
             
     except Exception as e:
         logger.error(f"Error querying Qwen vision API: {e}")
-        if vision_option == 0:
-            return {"start": "unknown", "start_xyxy": [[0, 0], [0, 0]], 
-                    "end": "unknown", "end_xyxy": [[0, 0], [0, 0]]}
-        else:
-            return "I cannot identify the objects in the image due to an error."
+        return _vision_fallback(vision_option)
 
 
 def query_vision_api(instruction: str, img_path: str, vision_option: int = 0, model_name: str = None) -> Union[Dict[str, Any], str]:
@@ -492,7 +594,8 @@ def query_vision_api(instruction: str, img_path: str, vision_option: int = 0, mo
     Args:
         instruction: Text instruction or question
         img_path: Path to the image file
-        vision_option: 0 for object localization, 1 for visual QA
+        vision_option: 0 for object localization, 1 for visual QA,
+                       2 for localizing several objects at once
         model_name: Optional model name to use (e.g., 'openai', 'gemini', 'qwen')
                   If None, uses DEFAULT_VISION_MODEL from config
     
@@ -508,9 +611,9 @@ def query_vision_api(instruction: str, img_path: str, vision_option: int = 0, mo
     # Try the selected model first
     try:
         if model_name == "openai":
-            return query_openai_vision(instruction, img_path)
+            return query_openai_vision(instruction, img_path, vision_option=vision_option)
         elif model_name == "gemini":
-            return query_gemini_vision(instruction, img_path)
+            return query_gemini_vision(instruction, img_path, vision_option=vision_option)
         elif model_name == "qwen":
             return query_qwen_vision(instruction, img_path, vision_option)
         else:
@@ -522,10 +625,9 @@ def query_vision_api(instruction: str, img_path: str, vision_option: int = 0, mo
         
         # Fallback chain: OpenAI -> Qwen -> Gemini
         try:
-            return query_openai_vision(instruction, img_path)
+            return query_openai_vision(instruction, img_path, vision_option=vision_option)
         except Exception:
             try:
                 return query_qwen_vision(instruction, img_path, vision_option)
             except Exception:
-                return query_gemini_vision(instruction, img_path)
-"""
+                return query_gemini_vision(instruction, img_path, vision_option=vision_option)
@@ -0,0 +1,225 @@
+"""
+Audio Device Manager Module for Embodied Agent
+
+This module owns the PyAudio instance and the audio streams for the whole
+session. Creating a PyAudio instance enumerates every device and opening a
+stream negotiates with the driver, which costs tens to hundreds of
+milliseconds; here both happen once, streams are kept open between uses and
+only started and stopped, and everything is closed on shutdown.
+
+"""
+
+import atexit
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+# Import system configuration
+from config import AUDIO_CONFIG
+
+# Try to import optional dependencies with graceful fallbacks
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    PYAUDIO_AVAILABLE = False
+
+
+class AudioDeviceManager:
+    """
+    Shares one PyAudio instance and warm input/output streams.
+
+    Streams are cached by their parameters. An input stream is started for
+    each recording and stopped afterwards, so it does not capture between
+    turns; output streams stay running.
+    """
+
+    def __init__(self):
+        self._pyaudio = None
+        self._inputs = {}
+        self._outputs = {}
+        self._lock = threading.Lock()        # Guards the instance and the stream caches
+        self._input_lock = threading.Lock()  # One recording at a time
+        self._output_locks = {}
+        self.init_time = None           # Seconds spent creating the PyAudio instance
+        self.open_times: List[float] = []  # Seconds spent opening each stream
+        self.reuses = 0                 # Requests served by an already open stream
+
+    def _instance(self):
+        # Called with the lock held
+        if self._pyaudio is None:
+            start = time.perf_counter()
+            self._pyaudio = pyaudio.PyAudio()
+            self.init_time = time.perf_counter() - start
+        return self._pyaudio
+
+    def _open(self, cache: Dict, key, **kwargs):
+        # Called with the lock held
+        stream = cache.get(key)
+        if stream is not None:
+            self.reuses += 1
+            return stream
+        instance = self._instance()
+        start = time.perf_counter()
+        stream = instance.open(**kwargs)
+        self.open_times.append(time.perf_counter() - start)
+        cache[key] = stream
+        return stream
+
+    @contextmanager
+    def input_stream(self, sample_rate: int = None, channels: int = None,
+                     chunk_size: int = None) -> Iterator:
+        """
+        Borrow the microphone stream for one recording.
+
+        Args:
+            sample_rate: Sample rate in Hz
+            channels: Number of channels
+            chunk_size: Frames per buffer
+
+        Yields:
+            A started PyAudio input stream of 16-bit samples
+        """
+        sample_rate = sample_rate or AUDIO_CONFIG.get("sample_rate", 16000)
+        channels = channels or AUDIO_CONFIG.get("channels", 1)
+        chunk_size = chunk_size or AUDIO_CONFIG.get("chunk_size", 1024)
+        with self._input_lock:
+            with self._lock:
+                stream = self._open(self._inputs, (sample_rate, channels, chunk_size),
+                                    format=pyaudio.paInt16, channels=channels, rate=sample_rate,
+                                    input=True, frames_per_buffer=chunk_size, start=False)
+            stream.start_stream()
+            try:
+                yield stream
+            finally:
+                stream.stop_stream()
+
+    def output_stream(self, sample_rate: int, channels: int, sample_width: int = 2):
+        """
+        Get a running output stream for a sample format.
+
+        Args:
+            sample_rate: Sample rate in Hz
+            channels: Number of channels
+            sample_width: Bytes per sample
+
+        Returns:
+            A started PyAudio output stream
+        """
+        with self._lock:
+            key = (sample_rate, channels, sample_width)
+            stream = self._open(self._outputs, key,
+                                format=pyaudio.get_format_from_width(sample_width),
+                                channels=channels, rate=sample_rate, output=True)
+            self._output_locks.setdefault(key, threading.Lock())
+            return stream
+
+    def play(self, data: bytes, sample_rate: int, channels: int, sample_width: int = 2) -> None:
+        """
+        Play PCM audio and wait until it has been handed to the device.
+
+        Args:
+            data: Interleaved PCM samples
+            sample_rate: Sample rate in Hz
+            channels: Number of channels
+            sample_width: Bytes per sample
+        """
+        stream = self.output_stream(sample_rate, channels, sample_width)
+        with self._output_locks[(sample_rate, channels, sample_width)]:
+            stream.write(bytes(data))
+
+    def shutdown(self) -> None:
+        """
+        Close all streams and release the audio devices.
+        """
+        with self._lock:
+            for stream in list(self._inputs.values()) + list(self._outputs.values()):
+                try:
+                    if stream.is_active():
+                        stream.stop_stream()
+                    stream.close()
+                except Exception as e:
+                    print(f"Error closing audio stream: {e}")
+            self._inputs.clear()
+            self._outputs.clear()
+            if self._pyaudio is not None:
+                self._pyaudio.terminate()
+                self._pyaudio = None
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Summarize device setup costs.
+
+        Returns:
+            Dictionary with PyAudio creation time, stream opens, their mean
+            and worst latency in milliseconds and the number of reuses
+        """
+        return {
+            "init_ms": (self.init_time or 0.0) * 1000,
+            "streams_opened": len(self.open_times),
+            "mean_open_ms": 1000 * sum(self.open_times) / len(self.open_times) if self.open_times else 0.0,
+            "max_open_ms": 1000 * max(self.open_times, default=0.0),
+            "reuses": self.reuses
+        }
+
+
+# Manager of the current session, created on first use
+_manager = None
+
+
+def get_audio_manager() -> AudioDeviceManager:
+    """
+    Get the session audio device manager (closed automatically at exit).
+    """
+    global _manager
+    if _manager is None:
+        _manager = AudioDeviceManager()
+        atexit.register(_manager.shutdown)
+    return _manager
+
+
+def benchmark_stream_open(runs: int = 5) -> Dict[str, float]:
+    """
+    Compare opening the microphone per recording with reusing a warm stream.
+
+    Args:
+        runs: Number of recordings to simulate
+
+    Returns:
+        Dictionary with the mean setup cost of each approach in milliseconds
+    """
+    if not PYAUDIO_AVAILABLE:
+        print("PyAudio not available, nothing to measure")
+        return {}
+
+    sample_rate = AUDIO_CONFIG.get("sample_rate", 16000)
+    channels = AUDIO_CONFIG.get("channels", 1)
+    chunk_size = AUDIO_CONFIG.get("chunk_size", 1024)
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        p = pyaudio.PyAudio()
+        stream = p.open(format=pyaudio.paInt16, channels=channels, rate=sample_rate,
+                        input=True, frames_per_buffer=chunk_size)
+        stream.stop_stream()
+        stream.close()
+        p.terminate()
+    cold = (time.perf_counter() - start) / runs
+
+    manager = AudioDeviceManager()
+    with manager.input_stream(sample_rate, channels, chunk_size):
+        pass
+    start = time.perf_counter()
+    for _ in range(runs):
+        with manager.input_stream(sample_rate, channels, chunk_size):
+            pass
+    warm = (time.perf_counter() - start) / runs
+    results = dict(manager.stats(), cold_ms=cold * 1000, warm_ms=warm * 1000)
+    manager.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in benchmark_stream_open().items():
+        print(f"{name}: {value:.3f}" if isinstance(value, float) else f"{name}: {value}")
@@ -0,0 +1,349 @@
+"""
+Camera Calibration Module for Embodied Agent
+
+This module maps image coordinates from the overhead camera view to robot
+workspace coordinates so detected objects can be reached by the arm. A
+homography between the image and the table plane is fitted from marker
+correspondences and saved to disk; a parallax correction from the camera
+position accounts for objects standing above the table. The calibration is
+loaded once per session and reused for every localization.
+
+"""
+
+import os
+import json
+import time
+import numpy as np
+from typing import Any, Dict, Optional, Sequence
+
+from config import CAMERA_CONFIG
+
+
+def _normalization(points: np.ndarray) -> np.ndarray:
+    # Similarity transform moving the centroid to the origin and the mean
+    # distance to sqrt(2), which keeps the DLT system well conditioned
+    centroid = points.mean(axis=0)
+    scale = np.sqrt(2.0) / max(np.linalg.norm(points - centroid, axis=1).mean(), 1e-12)
+    return np.array([[scale, 0.0, -scale * centroid[0]],
+                     [0.0, scale, -scale * centroid[1]],
+                     [0.0, 0.0, 1.0]])
+
+
+def _apply_homography(H: np.ndarray, points: np.ndarray) -> np.ndarray:
+    homogeneous = points @ H[:, :2].T + H[:, 2]
+    return homogeneous[:, :2] / homogeneous[:, 2:3]
+
+
+def fit_homography(pixels, world) -> np.ndarray:
+    """
+    Fit the homography from image points to table-plane points (normalized DLT).
+
+    Args:
+        pixels: Image coordinates [u, v], shape (N, 2) with N >= 4
+        world: Robot coordinates [X, Y] on the table plane in mm, shape (N, 2)
+
+    Returns:
+        3x3 homography mapping [u, v, 1] to [X, Y, 1] up to scale
+    """
+    pixels = np.asarray(pixels, dtype=float).reshape(-1, 2)
+    world = np.asarray(world, dtype=float).reshape(-1, 2)
+    if len(pixels) < 4 or len(pixels) != len(world):
+        raise ValueError("At least four matching pixel/world correspondences are required")
+
+    Tp = _normalization(pixels)
+    Tw = _normalization(world)
+    p = _apply_homography(Tp, pixels)
+    w = _apply_homography(Tw, world)
+
+    # Two rows per correspondence, built for all points at once
+    n = len(p)
+    ones = np.ones(n)
+    zeros = np.zeros((n, 3))
+    ph = np.column_stack([p, ones])
+    A = np.empty((2 * n, 9))
+    A[0::2] = np.hstack([ph, zeros, -w[:, :1] * ph])
+    A[1::2] = np.hstack([zeros, ph, -w[:, 1:2] * ph])
+
+    _, _, vt = np.linalg.svd(A)
+    Hn = vt[-1].reshape(3, 3)
+    H = np.linalg.inv(Tw) @ Hn @ Tp
+    return H / H[2, 2]
+
+
+def fit_camera_position(table_points, world) -> np.ndarray:
+    """
+    Locate the camera from markers observed above the table.
+
+    A marker at height h whose pixel maps (through the table homography) to
+    table point T lies on the ray from the camera center C through T. That
+    gives two equations per marker that are linear in C:
+    Cz * (Tx - Xx) - Cx * (t - h) = Tx * h - Xx * t (and the same for y).
+
+    Args:
+        table_points: Table-plane points of the markers' pixels, shape (N, 2)
+        world: Robot coordinates [X, Y, Z] of the markers in mm, shape (N, 3)
+
+    Returns:
+        Camera center [x, y, z] in robot coordinates (mm)
+    """
+    table_points = np.asarray(table_points, dtype=float).reshape(-1, 2)
+    world = np.asarray(world, dtype=float).reshape(-1, 3)
+    t = CAMERA_CONFIG["table_height"]
+    h = world[:, 2]
+
+    A = np.zeros((2 * len(world), 3))
+    A[0::2, 0] = -(t - h)
+    A[1::2, 1] = -(t - h)
+    A[0::2, 2] = table_points[:, 0] - world[:, 0]
+    A[1::2, 2] = table_points[:, 1] - world[:, 1]
+    b = np.empty(2 * len(world))
+    b[0::2] = table_points[:, 0] * h - world[:, 0] * t
+    b[1::2] = table_points[:, 1] * h - world[:, 1] * t
+
+    position, *_ = np.linalg.lstsq(A, b, rcond=None)
+    return position
+
+
+class CameraCalibration:
+    """
+    Image-to-robot mapping for the overhead viewing position.
+
+    Args:
+        homography: 3x3 map from image [u, v, 1] to table-plane [X, Y, 1]
+        camera_position: Camera center [x, y, z] in robot coordinates (mm)
+        table_height: Robot Z of the table surface (mm)
+        info: Extra metadata stored with the calibration (residuals, date)
+    """
+
+    def __init__(self, homography, camera_position, table_height: float,
+                 info: Optional[Dict[str, Any]] = None):
+        self.homography = np.asarray(homography, dtype=float)
+        self.camera_position = np.asarray(camera_position, dtype=float)
+        self.table_height = float(table_height)
+        self.info = info or {}
+
+    def pixels_to_table(self, points) -> np.ndarray:
+        """
+        Intersect the viewing rays of image points with the table plane.
+
+        Args:
+            points: Image coordinates [u, v], shape (N, 2)
+
+        Returns:
+            Robot [X, Y] on the table plane in mm, shape (N, 2)
+        """
+        return _apply_homography(self.homography, np.asarray(points, dtype=float).reshape(-1, 2))
+
+    def pixels_to_robot(self, points, heights=None) -> np.ndarray:
+        """
+        Transform image points seen at given heights to robot XY.
+
+        A point above the table is seen along the same ray as a table point
+        further from the camera, so the table intersection is pulled back
+        toward the camera in proportion to the height.
+
+        Args:
+            points: Image coordinates [u, v], shape (N, 2)
+            heights: Robot Z of each point (scalar or shape (N,)); None means the table
+
+        Returns:
+            Robot [X, Y] in mm, shape (N, 2)
+        """
+        table = self.pixels_to_table(points)
+        if heights is None:
+            return table
+
+        heights = np.broadcast_to(np.asarray(heights, dtype=float), (len(table),))
+        camera_z = self.camera_position[2]
+        scale = (camera_z - heights) / (camera_z - self.table_height)
+        return self.camera_position[:2] + (table - self.camera_position[:2]) * scale[:, None]
+
+    def boxes_to_robot(self, boxes, heights=None) -> np.ndarray:
+        """
+        Transform bounding boxes to robot coordinates of their top centers.
+
+        Args:
+            boxes: Boxes as [[x1, y1], [x2, y2]], shape (N, 2, 2)
+            heights: Object heights above the table (scalar or shape (N,));
+                     defaults to the configured object height
+
+        Returns:
+            Robot [X, Y, Z] of each box center in mm, shape (N, 3)
+        """
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 2, 2)
+        if heights is None:
+            heights = CAMERA_CONFIG["object_height"]
+        z = self.table_height + np.broadcast_to(np.asarray(heights, dtype=float), (len(boxes),))
+        xy = self.pixels_to_robot(boxes.mean(axis=1), z)
+        return np.column_stack([xy, z])
+
+    def reprojection_error(self, pixels, world) -> np.ndarray:
+        """
+        Distance between transformed markers and their measured robot positions.
+
+        Args:
+            pixels: Image coordinates [u, v], shape (N, 2)
+            world: Robot coordinates [X, Y] or [X, Y, Z] in mm, shape (N, 2) or (N, 3)
+
+        Returns:
+            Error of each marker in mm, shape (N,)
+        """
+        world = np.asarray(world, dtype=float)
+        world = world.reshape(len(world), -1)
+        heights = world[:, 2] if world.shape[1] > 2 else None
+        return np.linalg.norm(self.pixels_to_robot(pixels, heights) - world[:, :2], axis=1)
+
+    def save(self, path: str = None) -> str:
+        """
+        Save the calibration as JSON.
+
+        Args:
+            path: Output file (defaults to the configured calibration file)
+
+        Returns:
+            Path of the saved file
+        """
+        path = path or CAMERA_CONFIG["calibration_file"]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({
+                "homography": self.homography.tolist(),
+                "camera_position": self.camera_position.tolist(),
+                "table_height": self.table_height,
+                "info": self.info
+            }, f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path: str = None) -> "CameraCalibration":
+        """
+        Load a calibration saved with save().
+
+        Args:
+            path: Calibration file (defaults to the configured calibration file)
+
+        Returns:
+            The loaded calibration
+        """
+        with open(path or CAMERA_CONFIG["calibration_file"], "r") as f:
+            data = json.load(f)
+        return cls(data["homography"], data["camera_position"], data["table_height"], data.get("info"))
+
+    @classmethod
+    def from_config(cls) -> "CameraCalibration":
+        """
+        Build the approximate calibration from the affine map in CAMERA_CONFIG.
+        """
+        affine = np.asarray(CAMERA_CONFIG["pixel_to_robot"], dtype=float)
+        homography = np.vstack([affine, [0.0, 0.0, 1.0]])
+        return cls(homography, CAMERA_CONFIG["camera_position"], CAMERA_CONFIG["table_height"],
+                   {"source": "config"})
+
+
+def calibrate(markers: Sequence[Dict[str, Sequence[float]]], path: str = None) -> CameraCalibration:
+    """
+    Fit and save a calibration from marker correspondences.
+
+    Markers lying on the table fix the homography. If at least two markers
+    are raised above the table, the camera position is fitted from them as
+    well; otherwise the configured camera position is kept.
+
+    Args:
+        markers: List of {'pixel': [u, v], 'robot': [X, Y] or [X, Y, Z]}
+        path: Output file (defaults to the configured calibration file)
+
+    Returns:
+        The fitted calibration, also installed for the current session
+    """
+    global _calibration
+
+    pixels = np.array([m["pixel"] for m in markers], dtype=float)
+    table_height = CAMERA_CONFIG["table_height"]
+    world = np.array([list(m["robot"][:3]) + [table_height] * (3 - len(m["robot"][:3]))
+                      for m in markers], dtype=float)
+
+    on_table = np.abs(world[:, 2] - table_height) < 1e-6
+    homography = fit_homography(pixels[on_table], world[on_table, :2])
+
+    if (~on_table).sum() >= 2:
+        table_points = _apply_homography(homography, pixels[~on_table])
+        camera_position = fit_camera_position(table_points, world[~on_table])
+    else:
+        camera_position = CAMERA_CONFIG["camera_position"]
+
+    calibration = CameraCalibration(homography, camera_position, table_height)
+    errors = calibration.reprojection_error(pixels, world)
+    calibration.info = {
+        "source": "markers",
+        "markers": len(markers),
+        "mean_error_mm": float(errors.mean()),
+        "max_error_mm": float(errors.max()),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+    saved = calibration.save(path)
+    print(f"Calibration saved to {saved} (mean error {errors.mean():.2f} mm, max {errors.max():.2f} mm)")
+
+    _calibration = calibration
+    return calibration
+
+
+# Calibration of the current session, loaded on first use
+_calibration = None
+
+
+def get_calibration() -> CameraCalibration:
+    """
+    Get the session calibration, loading it from disk on first use.
+
+    Falls back to the approximate affine map in CAMERA_CONFIG when no
+    calibration file has been saved yet.
+    """
+    global _calibration
+    if _calibration is None:
+        try:
+            _calibration = CameraCalibration.load()
+        except FileNotFoundError:
+            print("No camera calibration found, using the approximate mapping from config")
+            _calibration = CameraCalibration.from_config()
+        except Exception as e:
+            print(f"Error loading camera calibration: {e}")
+            _calibration = CameraCalibration.from_config()
+    return _calibration
+
+
+def pixel_to_robot(points) -> np.ndarray:
+    """
+    Transform image points on the table plane to robot XY coordinates.
+
+    Args:
+        points: Image coordinates [u, v], shape (2,) or (N, 2)
+
+    Returns:
+        Robot [X, Y] in mm, shape (2,) or (N, 2)
+    """
+    uv = np.asarray(points, dtype=float)
+    xy = get_calibration().pixels_to_table(uv)
+    return xy[0] if uv.ndim == 1 else xy
+
+
+def box_centers_to_robot(boxes, heights=None) -> np.ndarray:
+    """
+    Transform bounding boxes to robot coordinates of their centers.
+
+    Args:
+        boxes: Boxes as [[x1, y1], [x2, y2]], shape (N, 2, 2)
+        heights: Object heights above the table (defaults to the configured object height)
+
+    Returns:
+        Robot [X, Y, Z] of each box center in mm, shape (N, 3)
+    """
+    return get_calibration().boxes_to_robot(boxes, heights)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: python calibration.py markers.json
+    # where markers.json is a list of {"pixel": [u, v], "robot": [X, Y(, Z)]}
+    with open(sys.argv[1], "r") as f:
+        calibrate(json.load(f))
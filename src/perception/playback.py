@@ -0,0 +1,213 @@
+"""
+Audio Playback Module for Embodied Agent
+
+This module plays PCM audio from memory on a background thread. Sounds are
+queued and played in order, every request returns a future that completes
+when the sound has finished (or was cut off), and stop() preempts the
+current sound within one chunk. Output goes to a sink: the audio device in
+normal use, or an in-memory buffer for tests.
+
+"""
+
+import time
+import wave
+import queue
+import threading
+from concurrent.futures import Future
+from typing import NamedTuple
+
+# Import system configuration
+from config import AUDIO_CONFIG
+from perception.audio_devices import PYAUDIO_AVAILABLE, get_audio_manager
+
+
+class Sound(NamedTuple):
+    """
+    PCM audio held in memory.
+    """
+    data: bytes           # Interleaved PCM samples
+    sample_rate: int      # Samples per second
+    channels: int         # Interleaved channels
+    sample_width: int     # Bytes per sample
+
+    @property
+    def duration(self) -> float:
+        return len(self.data) / (self.sample_width * self.channels * self.sample_rate)
+
+
+def load_wav(file_path: str) -> Sound:
+    """
+    Read a WAV file into memory.
+
+    Args:
+        file_path: Path to the WAV file
+
+    Returns:
+        The sound
+    """
+    with wave.open(file_path, "rb") as wf:
+        return Sound(wf.readframes(wf.getnframes()), wf.getframerate(), wf.getnchannels(),
+                     wf.getsampwidth())
+
+
+class DeviceSink:
+    """
+    Writes audio to the output device through the session's warm stream.
+    """
+
+    def write(self, data: bytes, sound: Sound) -> None:
+        stream = get_audio_manager().output_stream(sound.sample_rate, sound.channels, sound.sample_width)
+        stream.write(bytes(data))
+
+
+class BufferSink:
+    """
+    Collects played audio in memory, for tests and machines without audio output.
+
+    Args:
+        realtime: Take as long as real playback would
+    """
+
+    def __init__(self, realtime: bool = False):
+        self.realtime = realtime
+        self.buffer = bytearray()
+
+    def write(self, data: bytes, sound: Sound) -> None:
+        self.buffer += data
+        if self.realtime:
+            time.sleep(len(data) / (sound.sample_width * sound.channels * sound.sample_rate))
+
+
+class PlaybackEngine:
+    """
+    Plays queued sounds in order on a background thread.
+
+    Sounds are written to the sink in chunks; between chunks the engine
+    checks for preemption, so stop() silences the current sound within one
+    chunk. Each play() returns a future that resolves to True once the
+    sound has been played completely, or False if it was stopped.
+
+    Args:
+        sink: Output for the audio (defaults to the audio device, or a
+            real-time buffer when PyAudio is not available)
+        chunk_size: Frames written per chunk
+    """
+
+    def __init__(self, sink=None, chunk_size: int = None):
+        self.sink = sink or (DeviceSink() if PYAUDIO_AVAILABLE else BufferSink(realtime=True))
+        self.chunk_size = chunk_size or AUDIO_CONFIG.get("chunk_size", 1024)
+        self._queue = queue.Queue()
+        self._preempt = threading.Event()
+        self._generation = 0    # Bumped by stop(); queued sounds from older generations are dropped
+        self._pending = 0       # Sounds queued or playing
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="playback", daemon=True)
+        self._thread.start()
+
+    @property
+    def generation(self) -> int:
+        """
+        Number of stop() calls so far; sounds queued for an older generation are dropped.
+        """
+        return self._generation
+
+    def play(self, sound: Sound, generation: int = None) -> Future:
+        """
+        Queue a sound.
+
+        Args:
+            sound: Sound to play
+            generation: Generation the sound belongs to (defaults to the
+                current one); lets a producer queue sounds over time without
+                one slipping through after a stop()
+
+        Returns:
+            Future resolving to True when played completely, False if stopped
+        """
+        future = Future()
+        with self._lock:
+            self._pending += 1
+            self._queue.put((self._generation if generation is None else generation, sound, future))
+        return future
+
+    def play_file(self, file_path: str) -> Future:
+        """
+        Queue a WAV file.
+
+        Args:
+            file_path: Path to the WAV file
+
+        Returns:
+            Future resolving to True when played completely, False if stopped
+        """
+        return self.play(load_wav(file_path))
+
+    def stop(self) -> None:
+        """
+        Stop the current sound and drop everything queued.
+        """
+        with self._lock:
+            self._generation += 1
+            self._preempt.set()
+
+    def busy(self) -> bool:
+        """
+        Check whether a sound is playing or queued.
+        """
+        with self._lock:
+            return self._pending > 0
+
+    def shutdown(self) -> None:
+        """
+        Stop playback and end the worker thread.
+        """
+        self.stop()
+        self._queue.put(None)
+        self._thread.join(1.0)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                generation, sound, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                with self._lock:
+                    if generation != self._generation:
+                        future.set_result(False)
+                        continue
+                    self._preempt.clear()
+                try:
+                    future.set_result(self._write(sound))
+                except Exception as e:
+                    print(f"Error playing audio: {e}")
+                    future.set_exception(e)
+            finally:
+                if item is not None:
+                    with self._lock:
+                        self._pending -= 1
+
+    def _write(self, sound: Sound) -> bool:
+        step = self.chunk_size * sound.channels * sound.sample_width
+        view = memoryview(sound.data)
+        for offset in range(0, len(view), step):
+            if self._preempt.is_set():
+                return False
+            self.sink.write(view[offset:offset + step], sound)
+        return True
+
+
+# Engine of the current session, created on first use
+_engine = None
+
+
+def get_playback_engine() -> PlaybackEngine:
+    """
+    Get the session playback engine.
+    """
+    global _engine
+    if _engine is None:
+        _engine = PlaybackEngine()
+    return _engine
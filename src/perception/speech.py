@@ -9,11 +9,22 @@ playing audio files, and converting text to speech.
 import os
 import wave
 import time
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 import tempfile
+import io
+import re
+import shutil
 import numpy as np
-from typing import Optional, Tuple
+from collections import deque
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
 import subprocess
-from config import AUDIO_CONFIG, PATHS
+from abc import ABC, abstractmethod
+from config import AUDIO_CONFIG, PATHS, TTS_CONFIG
+from perception.audio_devices import get_audio_manager
+from perception.playback import BufferSink, PlaybackEngine, Sound, get_playback_engine
+from perception.tts_cache import TTSCache, cache_key
 
 # Try to import optional dependencies with graceful fallbacks
 try:
@@ -44,98 +55,298 @@ AUDIO_DIR = PATHS.get("audio_dir", "assets/audio/")
 # Ensure temporary directory exists
 os.makedirs(TEMP_DIR, exist_ok=True)
 
-def record(duration: int = 5, output_file: str = "temp/speech.wav") -> str:
+def frame_energy(samples: np.ndarray, frame_length: int) -> np.ndarray:
     """
-    Records audio from the microphone for a specified duration.
+    Computes the RMS energy of consecutive frames of 16-bit audio.
     
     Args:
-        duration: Recording duration in seconds
-        output_file: Path to save the recorded audio file
+        samples: Audio samples
+        frame_length: Samples per frame; a trailing partial frame is ignored
         
     Returns:
-        Path to the recorded audio file
+        RMS energy of each frame
+    """
+    count = len(samples) // frame_length
+    frames = samples[:count * frame_length].reshape(count, frame_length).astype(np.float32)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+class FrameMeter:
     """
-    print(f"Recording for {duration} seconds...")
+    Computes frame energies of a stream of 16-bit audio chunks.
     
-    if not PYAUDIO_AVAILABLE:
-        print("Simulating audio recording (PyAudio not installed)")
-        time.sleep(duration)  # Simulate recording time
-        # Copy sample file if available, otherwise create empty file
-        sample_path = os.path.join(AUDIO_DIR, "sample_speech.wav")
-        if os.path.exists(sample_path):
-            with open(sample_path, "rb") as src, open(output_file, "wb") as dst:
-                dst.write(src.read())
+    Chunks rarely hold a whole number of frames; the samples left over at
+    the end of a chunk are carried over to the next one instead of dropped.
+    
+    Args:
+        frame_length: Samples per frame (all channels)
+    """
+    
+    def __init__(self, frame_length: int):
+        self.frame_length = frame_length
+        self._remainder = np.zeros(0, dtype=np.int16)
+    
+    def feed(self, chunk: bytes) -> np.ndarray:
+        """
+        Adds one chunk of audio.
+        
+        Args:
+            chunk: Raw audio bytes
+            
+        Returns:
+            RMS energy of each frame completed by the chunk
+        """
+        samples = np.concatenate((self._remainder, np.frombuffer(chunk, dtype=np.int16)))
+        count = len(samples) // self.frame_length
+        self._remainder = samples[count * self.frame_length:]
+        return frame_energy(samples, self.frame_length)
+
+
+class Endpointer:
+    """
+    Voice activity detector that decides when a spoken command has ended.
+    
+    Chunks of microphone audio are fed in as they are read. Until speech
+    starts, only the last pre_roll seconds are kept so the first syllable is
+    not clipped; once speech has started, everything is kept until the
+    trailing silence is long enough.
+    
+    Args:
+        sample_rate: Audio sample rate in Hz
+        channels: Interleaved channels per sample
+        threshold: Frame RMS above which a frame counts as speech
+        pre_roll: Seconds of audio kept from before speech starts
+        trailing_silence: Seconds of silence that end the utterance
+        speech_timeout: Seconds to wait for speech before giving up
+        on_audio: Called with each piece of audio as it joins the utterance
+    """
+    
+    def __init__(self, sample_rate: int = None, channels: int = None, threshold: float = None,
+                 pre_roll: float = None, trailing_silence: float = None,
+                 speech_timeout: float = None, on_audio: Optional[Callable[[bytes], None]] = None):
+        self.sample_rate = sample_rate or AUDIO_CONFIG.get("sample_rate", 16000)
+        self.channels = channels or AUDIO_CONFIG.get("channels", 1)
+        self.threshold = threshold or AUDIO_CONFIG.get("quiet_threshold", 700)
+        self.pre_roll = AUDIO_CONFIG.get("pre_roll", 0.3) if pre_roll is None else pre_roll
+        self.trailing_silence = trailing_silence or AUDIO_CONFIG.get("trailing_silence", 0.8)
+        self.speech_timeout = speech_timeout or AUDIO_CONFIG.get("speech_timeout", 5.0)
+        self.frame_length = int(self.sample_rate * AUDIO_CONFIG.get("vad_frame_ms", 20) / 1000) * self.channels
+        self._meter = FrameMeter(self.frame_length)
+        
+        self.started = False
+        self.timed_out = False
+        self.silence = 0.0          # Seconds since the last speech frame
+        self.waited = 0.0           # Seconds of audio before speech started
+        self._pre_roll = deque()
+        self._pre_roll_bytes = 0
+        self._audio = bytearray()
+        self.on_audio = on_audio
+    
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Processes one chunk of 16-bit audio.
+        
+        Args:
+            chunk: Raw audio bytes as read from the stream
+            
+        Returns:
+            True once the utterance has ended (or no speech came in time)
+        """
+        chunk_seconds = len(chunk) / (2 * self.channels * self.sample_rate)
+        frame_seconds = self.frame_length / self.channels / self.sample_rate
+        energy = self._meter.feed(chunk)
+        voiced = np.nonzero(energy > self.threshold)[0]
+        frames = len(energy)
+        
+        if not self.started:
+            self._pre_roll.append(chunk)
+            self._pre_roll_bytes += len(chunk)
+            # Keep just enough chunks to cover the pre-roll
+            limit = int(self.pre_roll * self.sample_rate) * self.channels * 2
+            while len(self._pre_roll) > 1 and self._pre_roll_bytes - len(self._pre_roll[0]) >= limit:
+                self._pre_roll_bytes -= len(self._pre_roll.popleft())
+            
+            if len(voiced) == 0:
+                self.waited += chunk_seconds
+                self.timed_out = self.waited >= self.speech_timeout
+                return self.timed_out
+            
+            self.started = True
+            for buffered in self._pre_roll:
+                self._keep(buffered)
+            self._pre_roll.clear()
         else:
-            # Create an empty WAV file
-            with wave.open(output_file, "wb") as wf:
-                wf.setnchannels(AUDIO_CONFIG.get("channels", 1))
-                wf.setsampwidth(2)  # 2 bytes = 16 bits
-                wf.setframerate(AUDIO_CONFIG.get("sample_rate", 16000))
-                wf.writeframes(b"")
+            self._keep(chunk)
+        
+        if len(voiced):
+            self.silence = (frames - 1 - voiced[-1]) * frame_seconds
+        else:
+            self.silence += frames * frame_seconds
+        return self.silence >= self.trailing_silence
+    
+    def _keep(self, chunk: bytes) -> None:
+        self._audio += chunk
+        if self.on_audio is not None:
+            self.on_audio(chunk)
+    
+    def audio(self) -> bytearray:
+        """
+        Returns the captured utterance including the pre-roll (empty if no speech started).
+        """
+        return self._audio
+
+
+class AudioBuffer(NamedTuple):
+    """
+    Recorded 16-bit PCM audio held in memory.
+    """
+    data: bytearray       # Interleaved 16-bit little-endian samples
+    sample_rate: int      # Samples per second
+    channels: int         # Interleaved channels
+    
+    @property
+    def duration(self) -> float:
+        return len(self.data) / (2 * self.channels * self.sample_rate)
+    
+    def samples(self) -> np.ndarray:
+        """
+        Returns the samples as an int16 array sharing the buffer's memory.
+        """
+        return np.frombuffer(self.data, dtype=np.int16)
+    
+    def to_audio_data(self):
+        """
+        Wraps the samples for the speech_recognition package without a file.
+        """
+        return sr.AudioData(bytes(self.data), self.sample_rate, 2)
+    
+    def save(self, output_file: str) -> str:
+        """
+        Writes the audio to a WAV file.
+        """
+        _write_wav(output_file, self.data, self.channels, self.sample_rate)
         return output_file
+
+
+def _write_wav(output_file: str, audio: bytes, channels: int, sample_rate: int) -> None:
+    directory = os.path.dirname(output_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with wave.open(output_file, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)  # 2 bytes = 16 bits
+        wf.setframerate(sample_rate)
+        wf.writeframes(audio)
+
+
+def record_audio(duration: int = 5, output_file: Optional[str] = None,
+                 on_audio: Optional[Callable[[bytes], None]] = None) -> AudioBuffer:
+    """
+    Records a spoken command from the microphone into memory.
+    
+    Recording stops once the speaker has been silent for the configured
+    trailing silence, so a short command takes about a second to capture;
+    the duration is only an upper bound.
     
-    # Real recording with PyAudio
-    p = pyaudio.PyAudio()
+    Args:
+        duration: Maximum recording duration in seconds
+        output_file: Also save the recording to this WAV file (optional)
+        on_audio: Called with each chunk of the utterance while recording
+        
+    Returns:
+        The recorded audio
+    """
+    print(f"Recording (up to {duration} seconds)...")
     
-    # Get configuration from config.py
     channels = AUDIO_CONFIG.get("channels", 1)
     sample_rate = AUDIO_CONFIG.get("sample_rate", 16000)
     chunk_size = AUDIO_CONFIG.get("chunk_size", 1024)
-    format_val = pyaudio.paInt16
-    
-    # Open a recording stream
-    stream = p.open(format=format_val,
-                   channels=channels,
-                   rate=sample_rate,
-                   input=True,
-                   frames_per_buffer=chunk_size)
-    
-    # Record audio
-    frames = []
-    for i in range(0, int(sample_rate / chunk_size * duration)):
-        data = stream.read(chunk_size)
-        frames.append(data)
-    
-    # Stop and close the stream
-    stream.stop_stream()
-    stream.close()
-    p.terminate()
-    
-    # Save the recorded audio to a WAV file
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    wf = wave.open(output_file, 'wb')
-    wf.setnchannels(channels)
-    wf.setsampwidth(p.get_sample_size(format_val))
-    wf.setframerate(sample_rate)
-    wf.writeframes(b''.join(frames))
-    wf.close()
-    
-    print(f"Recording saved to {output_file}")
+    endpointer = Endpointer(sample_rate, channels, on_audio=on_audio)
+    
+    if not PYAUDIO_AVAILABLE:
+        print("Simulating audio recording (PyAudio not installed)")
+        # Run the sample file through the endpointer as if it came from the microphone
+        sample_path = os.path.join(AUDIO_DIR, "sample_speech.wav")
+        chunks = []
+        if os.path.exists(sample_path):
+            with wave.open(sample_path, "rb") as wf:
+                channels, sample_rate = wf.getnchannels(), wf.getframerate()
+                endpointer = Endpointer(sample_rate, channels, on_audio=on_audio)
+                data = wf.readframes(chunk_size)
+                while data:
+                    chunks.append(data)
+                    data = wf.readframes(chunk_size)
+        
+        elapsed = 0.0
+        for data in chunks:
+            elapsed += len(data) / (2 * channels * sample_rate)
+            if elapsed > duration or endpointer.feed(data):
+                break
+        time.sleep(min(elapsed, duration) if chunks else duration)  # Simulate recording time
+    else:
+        # Real recording through the session's warm microphone stream
+        start = time.time()
+        with get_audio_manager().input_stream(sample_rate, channels, chunk_size) as stream:
+            # Record until the utterance ends or the duration runs out
+            for i in range(0, int(sample_rate / chunk_size * duration)):
+                data = stream.read(chunk_size, exception_on_overflow=False)
+                if endpointer.feed(data):
+                    break
+        
+        if endpointer.timed_out or not endpointer.started:
+            print("No speech detected.")
+        else:
+            print(f"Recorded {time.time() - start:.1f} seconds.")
+    
+    audio = AudioBuffer(endpointer.audio(), sample_rate, channels)
+    if output_file:
+        audio.save(output_file)
+        print(f"Recording saved to {output_file}")
+    return audio
+
+
+def record(duration: int = 5, output_file: str = "temp/speech.wav") -> str:
+    """
+    Records a spoken command from the microphone to a WAV file.
+    
+    Args:
+        duration: Maximum recording duration in seconds
+        output_file: Path to save the recorded audio file
+        
+    Returns:
+        Path to the recorded audio file
+    """
+    record_audio(duration, output_file)
     return output_file
 
 
-def speech_recognition(audio_file: str = "temp/speech.wav") -> str:
+def speech_recognition(audio: Union[str, AudioBuffer] = "temp/speech.wav") -> str:
     """
-    Performs speech recognition on an audio file.
+    Performs speech recognition on recorded audio.
     
     Args:
-        audio_file: Path to the audio file to recognize
+        audio: Audio recorded by record_audio, or path to an audio file
         
     Returns:
-        Recognized text from the audio file
+        Recognized text from the audio
     """
     print("Recognizing speech...")
     
-    if not SR_AVAILABLE or not os.path.exists(audio_file):
+    from_file = isinstance(audio, str)
+    if not SR_AVAILABLE or (from_file and not os.path.exists(audio)):
         print("Speech recognition not available or file doesn't exist")
         return "This is simulated speech recognition text."
     
     # Initialize the recognizer
     recognizer = sr.Recognizer()
     
-    # Load the audio file
-    with sr.AudioFile(audio_file) as source:
-        audio_data = recognizer.record(source)
+    if from_file:
+        # Load the audio file
+        with sr.AudioFile(audio) as source:
+            audio_data = recognizer.record(source)
+    else:
+        # Hand the in-memory samples over directly
+        audio_data = audio.to_audio_data()
     
     # Try to recognize speech using Google Speech Recognition
     try:
@@ -150,54 +361,606 @@ def speech_recognition(audio_file: str = "temp/speech.wav") -> str:
         return "Sorry, the speech recognition service is unavailable at the moment."
 
 
-def play_wav(file_path: str) -> None:
+def _recognize_google(audio: AudioBuffer) -> str:
+    """
+    Recognizes a whole recording with Google Speech Recognition.
+    """
+    return sr.Recognizer().recognize_google(audio.to_audio_data())
+
+
+class RecognitionBackend(ABC):
+    """
+    Interface of a streaming speech recognition backend.
+    
+    A backend receives the audio of one utterance chunk by chunk while it is
+    being recorded and may report a partial hypothesis after any chunk.
+    """
+    
+    def start(self, sample_rate: int, channels: int) -> None:
+        """
+        Prepares for a new utterance.
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+    
+    @abstractmethod
+    def accept(self, chunk: bytes) -> Optional[str]:
+        """
+        Processes one chunk of 16-bit audio.
+        
+        Returns:
+            The current partial hypothesis, or None if it did not change
+        """
+    
+    @abstractmethod
+    def finish(self) -> str:
+        """
+        Returns the final hypothesis once the utterance has ended.
+        """
+
+
+class ScriptedBackend(RecognitionBackend):
+    """
+    Deterministic local stand-in for a recognizer.
+    
+    Reveals the words of a fixed transcript in proportion to the amount of
+    speech received, so the partial/final flow can be exercised without a
+    network service or a model.
+    
+    Args:
+        transcript: Text to "recognize"
+        words_per_second: Words revealed per second of speech
+    """
+    
+    def __init__(self, transcript: str = "This is simulated speech recognition text.",
+                 words_per_second: float = 2.5):
+        self.transcript = transcript
+        self.words = transcript.split()
+        self.words_per_second = words_per_second
+    
+    def start(self, sample_rate: int, channels: int) -> None:
+        super().start(sample_rate, channels)
+        self.frame_length = int(sample_rate * AUDIO_CONFIG.get("vad_frame_ms", 20) / 1000) * channels
+        self.meter = FrameMeter(self.frame_length)
+        self.speech = 0.0
+        self.revealed = 0
+    
+    def accept(self, chunk: bytes) -> Optional[str]:
+        energy = self.meter.feed(chunk)
+        voiced = np.count_nonzero(energy > AUDIO_CONFIG.get("quiet_threshold", 700))
+        self.speech += voiced * self.frame_length / self.channels / self.sample_rate
+        revealed = min(len(self.words), int(self.speech * self.words_per_second))
+        if revealed == self.revealed:
+            return None
+        self.revealed = revealed
+        return " ".join(self.words[:revealed])
+    
+    def finish(self) -> str:
+        return self.transcript
+
+
+class SegmentedBackend(RecognitionBackend):
+    """
+    Streams with a whole-utterance recognizer by splitting at pauses.
+    
+    Each stretch of speech that ends in a short pause is recognized while
+    the user keeps talking, so once the utterance ends only its last segment
+    is still waiting for the recognizer.
+    
+    Args:
+        recognize: Function AudioBuffer -> text (defaults to Google Speech Recognition)
+        pause: Silence in seconds that closes a segment
+    """
+    
+    def __init__(self, recognize: Optional[Callable[[AudioBuffer], str]] = None, pause: float = None):
+        self.recognize = recognize or _recognize_google
+        self.pause = pause or AUDIO_CONFIG.get("segment_pause", 0.4)
+    
+    def start(self, sample_rate: int, channels: int) -> None:
+        super().start(sample_rate, channels)
+        self.frame_length = int(sample_rate * AUDIO_CONFIG.get("vad_frame_ms", 20) / 1000) * channels
+        self.meter = FrameMeter(self.frame_length)
+        self.segment = bytearray()
+        self.voiced = False
+        self.silence = 0.0
+        self.texts = []
+        self.error = None
+    
+    def _close_segment(self) -> None:
+        if self.voiced:
+            try:
+                text = self.recognize(AudioBuffer(self.segment, self.sample_rate, self.channels))
+                if text:
+                    self.texts.append(text)
+            except Exception as e:
+                # Unintelligible segments are skipped; service errors are reported at the end
+                if not (SR_AVAILABLE and isinstance(e, sr.UnknownValueError)):
+                    self.error = e
+        self.segment = bytearray()
+        self.voiced = False
+        self.silence = 0.0
+    
+    def accept(self, chunk: bytes) -> Optional[str]:
+        self.segment += chunk
+        energy = self.meter.feed(chunk)
+        voiced = np.nonzero(energy > AUDIO_CONFIG.get("quiet_threshold", 700))[0]
+        frame_seconds = self.frame_length / self.channels / self.sample_rate
+        if len(voiced):
+            self.voiced = True
+            self.silence = (len(energy) - 1 - voiced[-1]) * frame_seconds
+        else:
+            self.silence += len(energy) * frame_seconds
+        
+        if self.voiced and self.silence >= self.pause:
+            count = len(self.texts)
+            self._close_segment()
+            if len(self.texts) > count:
+                return " ".join(self.texts)
+        return None
+    
+    def finish(self) -> str:
+        self._close_segment()
+        if not self.texts and self.error is not None:
+            print(f"Could not request results from the speech recognition service; {self.error}")
+            return "Sorry, the speech recognition service is unavailable at the moment."
+        if not self.texts:
+            return "I couldn't understand what was said. Please try again."
+        return " ".join(self.texts)
+
+
+def default_backend() -> RecognitionBackend:
+    """
+    Returns the recognition backend to use when none is given.
+    """
+    if SR_AVAILABLE:
+        return SegmentedBackend()
+    return ScriptedBackend()
+
+
+class StreamingRecognizer:
+    """
+    Runs a recognition backend on a worker thread next to audio capture.
+    
+    Chunks passed to feed() are queued and recognized while recording goes
+    on; partial hypotheses are reported through on_partial as they change.
+    
+    Args:
+        backend: Recognition backend (defaults to default_backend())
+        on_partial: Called with each new partial hypothesis
+    """
+    
+    def __init__(self, backend: Optional[RecognitionBackend] = None,
+                 on_partial: Optional[Callable[[str], None]] = None):
+        self.backend = backend or default_backend()
+        self.on_partial = on_partial
+        self.partials = []
+        self.final = None
+        self._queue = queue.Queue()
+        self._thread = None
+    
+    def start(self, sample_rate: int = None, channels: int = None) -> None:
+        """
+        Starts recognizing a new utterance.
+        """
+        self.partials = []
+        self.final = None
+        self.backend.start(sample_rate or AUDIO_CONFIG.get("sample_rate", 16000),
+                           channels or AUDIO_CONFIG.get("channels", 1))
+        self._thread = threading.Thread(target=self._run, name="recognizer", daemon=True)
+        self._thread.start()
+    
+    def feed(self, chunk: bytes) -> None:
+        """
+        Queues a chunk of 16-bit audio for recognition.
+        """
+        self._queue.put(bytes(chunk))
+    
+    def finish(self, timeout: Optional[float] = None) -> str:
+        """
+        Marks the end of the utterance and waits for the final hypothesis.
+        
+        Args:
+            timeout: Maximum time to wait for the backend
+            
+        Returns:
+            The final hypothesis
+        """
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        return self.final if self.final is not None else ""
+    
+    def _run(self) -> None:
+        try:
+            while True:
+                chunk = self._queue.get()
+                if chunk is None:
+                    break
+                partial = self.backend.accept(chunk)
+                if partial is not None:
+                    self.partials.append(partial)
+                    if self.on_partial is not None:
+                        self.on_partial(partial)
+            self.final = self.backend.finish()
+        except Exception as e:
+            print(f"Error in speech recognition: {e}")
+            self.final = ""
+
+
+def listen(duration: int = 5, backend: Optional[RecognitionBackend] = None,
+           output_file: Optional[str] = None) -> str:
+    """
+    Records a spoken command and recognizes it while it is being spoken.
+    
+    Args:
+        duration: Maximum recording duration in seconds
+        backend: Recognition backend (defaults to default_backend())
+        output_file: Also save the recording to this WAV file (optional)
+        
+    Returns:
+        Recognized text
+    """
+    recognizer = StreamingRecognizer(backend, on_partial=lambda text: print(f"... {text}"))
+    recognizer.start()
+    record_audio(duration, output_file, on_audio=recognizer.feed)
+    
+    captured = time.perf_counter()
+    text = recognizer.finish()
+    print(f"Recognized: {text} ({(time.perf_counter() - captured) * 1000:.0f} ms after capture)")
+    return text
+
+
+# Command-line players currently running, terminated by stop_playback()
+_external_players = set()
+_external_lock = threading.Lock()
+
+
+def _external_command(file_path: str) -> Optional[List[str]]:
+    """
+    Command line of a player for an audio file, or None if there is none.
+    """
+    if file_path.lower().endswith(".wav"):
+        if os.name == 'posix':  # Linux/Mac
+            return ["aplay", "-q", file_path]
+        if os.name == 'nt':  # Windows
+            return ["powershell", "-c", f"(New-Object Media.SoundPlayer '{file_path}').PlaySync();"]
+        return None
+    # Encoded audio (gTTS MP3) needs a player that decodes it
+    if shutil.which("mpg123"):
+        return ["mpg123", "-q", file_path]
+    if shutil.which("ffplay"):
+        return ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", file_path]
+    return None
+
+
+def _play_external(file_path: str, generation: int = None) -> bool:
+    """
+    Plays an audio file with the platform's command-line player.
+    
+    The player runs as a child process that stop_playback() terminates.
+    
+    Args:
+        file_path: Path to the audio file
+        generation: Playback engine generation the sound belongs to (defaults
+            to the current one); the file is not played after a later stop()
+        
+    Returns:
+        True when played completely, False if stopped or no player is available
+    """
+    engine = get_playback_engine()
+    if generation is None:
+        generation = engine.generation
+    command = _external_command(file_path)
+    if command is None:
+        print(f"No suitable audio player available for {file_path}")
+        return False
+    
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    with _external_lock:
+        _external_players.add(process)
+        # stop() bumps the generation before terminating players, so a stop
+        # that missed this process is seen here
+        if engine.generation != generation:
+            process.terminate()
+    try:
+        return process.wait() == 0
+    finally:
+        with _external_lock:
+            _external_players.discard(process)
+
+
+def play_wav(file_path: str, wait: bool = True) -> Optional[Future]:
     """
     Plays a WAV audio file.
     
+    The file is loaded into memory and played by the session's playback
+    engine, so with wait=False the caller carries on while it plays.
+    
     Args:
         file_path: Path to the WAV file to play
+        wait: Block until playback has finished
+        
+    Returns:
+        Future resolving to True when played completely or False if stopped
+        (None if the file could not be queued)
     """
     # Check if file exists
     if not os.path.exists(file_path):
         print(f"Audio file not found: {file_path}")
-        return
+        return None
     
     print(f"Playing audio: {file_path}")
     
-    # Try to use different methods to play audio based on platform
     try:
-        # First try platform-specific commands
-        if os.name == 'posix':  # Linux/Mac
-            os.system(f"aplay {file_path}")
-        elif os.name == 'nt':  # Windows
-            os.system(f"start /min powershell -c (New-Object Media.SoundPlayer '{file_path}').PlaySync();")
-        else:
-            if PYAUDIO_AVAILABLE:
-                # Fallback to PyAudio if available
-                wf = wave.open(file_path, 'rb')
-                p = pyaudio.PyAudio()
-                
-                # Open a stream
-                stream = p.open(format=p.get_format_from_width(wf.getsampwidth()),
-                               channels=wf.getnchannels(),
-                               rate=wf.getframerate(),
-                               output=True)
-                
-                # Read and play chunks of data
-                chunk_size = AUDIO_CONFIG.get("chunk_size", 1024)
-                data = wf.readframes(chunk_size)
-                while data:
-                    stream.write(data)
-                    data = wf.readframes(chunk_size)
-                
-                # Clean up
-                stream.stop_stream()
-                stream.close()
-                p.terminate()
-            else:
-                print("No suitable audio playback method available")
+        future = get_playback_engine().play_file(file_path)
+    except (wave.Error, EOFError) as e:
+        # Not PCM WAV data (gTTS writes MP3), leave it to an external player
+        print(f"Cannot decode {file_path} ({e}), using an external player")
+        future = Future()
+        generation = get_playback_engine().generation
+        
+        def play_external():
+            try:
+                future.set_result(_play_external(file_path, generation))
+            except Exception as e:
+                print(f"Error playing audio: {e}")
+                future.set_result(False)
+        
+        threading.Thread(target=play_external, name="external-player", daemon=True).start()
     except Exception as e:
         print(f"Error playing audio: {e}")
+        return None
+    
+    if wait:
+        future.result()
+    return future
+
+
+def stop_playback() -> None:
+    """
+    Stops the sound being played and drops any queued sounds.
+    """
+    get_playback_engine().stop()
+    with _external_lock:
+        for process in _external_players:
+            process.terminate()
+
+
+def _placeholder_sound(text: str) -> Sound:
+    """
+    Creates a sine tone roughly as long as the text would take to say.
+    """
+    sample_rate = AUDIO_CONFIG.get("sample_rate", 16000)
+    duration = min(2 + len(text) * 0.07, 10)  # Rough estimate of speech duration
+    t = np.linspace(0, duration, int(sample_rate * duration), False)
+    note = np.sin(2 * np.pi * 440 * t) * 0.3  # 440 Hz sine wave
+    audio = note * (2**15 - 1) / np.max(np.abs(note))
+    return Sound(audio.astype(np.int16).tobytes(), sample_rate, 1, 2)
+
+
+def _decode_mp3(data: bytes) -> Optional[Sound]:
+    """
+    Decodes MP3 speech to 16-bit mono PCM with ffmpeg, if it is installed.
+    
+    Returns:
+        The decoded sound, or None if it could not be decoded
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return None
+    sample_rate = TTS_CONFIG["decode_rate"]
+    try:
+        result = subprocess.run([ffmpeg, "-loglevel", "error", "-i", "pipe:0", "-f", "s16le",
+                                 "-ac", "1", "-ar", str(sample_rate), "pipe:1"],
+                                input=data, capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Error decoding speech: {e}")
+        return None
+    return Sound(result.stdout, sample_rate, 1, 2)
+
+
+def _synthesize(text: str, lang: str) -> Tuple[Optional[Sound], Optional[bytes]]:
+    """
+    Synthesizes speech without the cache.
+    
+    Returns:
+        Tuple of (decoded sound or None, encoded audio or None)
+    """
+    if not GTTS_AVAILABLE:
+        print("gTTS not available, creating placeholder audio")
+        return _placeholder_sound(text), None
+    
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=lang, slow=False).write_to_fp(buffer)
+    encoded = buffer.getvalue()
+    return _decode_mp3(encoded), encoded
+
+
+def _voice_settings() -> Dict:
+    # Everything besides text and language that changes the synthesized audio
+    if not GTTS_AVAILABLE:
+        return {"engine": "placeholder", "sample_rate": AUDIO_CONFIG.get("sample_rate", 16000)}
+    return {"engine": "gtts", "slow": False, "decode_rate": TTS_CONFIG["decode_rate"]}
+
+
+# Speech cache of the current session, created on first use
+_tts_cache = None
+
+
+def get_tts_cache() -> TTSCache:
+    """
+    Gets the session speech cache.
+    """
+    global _tts_cache
+    if _tts_cache is None:
+        _tts_cache = TTSCache()
+    return _tts_cache
+
+
+def synthesize(text: str, lang: str = "en") -> Optional[Union[Sound, str]]:
+    """
+    Converts text to speech, reusing earlier syntheses of the same text.
+    
+    Args:
+        text: Text to convert to speech
+        lang: Language code for the speech
+        
+    Returns:
+        The decoded sound, the path of an encoded audio file when it could not
+        be decoded, or None on failure
+    """
+    cache = get_tts_cache()
+    key = cache_key(text, lang, _voice_settings())
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    
+    try:
+        sound, encoded = _synthesize(text, lang)
+    except Exception as e:
+        print(f"Error in text-to-speech conversion: {e}")
+        return None
+    return cache.put(key, sound=sound, encoded=encoded)
+
+
+def prewarm_tts(phrases: Optional[List[str]] = None, lang: str = "en") -> Dict[str, float]:
+    """
+    Synthesizes fixed phrases ahead of time so their first use is a cache hit.
+    
+    Args:
+        phrases: Phrases to synthesize (defaults to the configured ones)
+        lang: Language code for the speech
+        
+    Returns:
+        Cache statistics afterwards
+    """
+    for phrase in TTS_CONFIG["prewarm_phrases"] if phrases is None else phrases:
+        synthesize(phrase, lang)
+    return get_tts_cache().stats()
+
+
+def split_utterance(text: str, max_chars: int = None, min_chars: int = None) -> List[str]:
+    """
+    Splits a reply into units that are synthesized separately.
+    
+    The text is split after sentence punctuation, sentences longer than
+    max_chars are split again after commas, and pieces shorter than min_chars
+    are joined to the next one so the speech does not sound clipped.
+    
+    Args:
+        text: Reply to split
+        max_chars: Longest sentence kept whole
+        min_chars: Shortest unit
+        
+    Returns:
+        List of units in speaking order
+    """
+    max_chars = max_chars or TTS_CONFIG["max_unit_chars"]
+    min_chars = min_chars or TTS_CONFIG["min_unit_chars"]
+    
+    pieces = []
+    for sentence in re.split(r"(?<=[.!?;。！？；])\s*", text.strip()):
+        if len(sentence) > max_chars:
+            pieces.extend(re.split(r"(?<=[,:，：])\s*", sentence))
+        else:
+            pieces.append(sentence)
+    
+    units = []
+    pending = ""
+    for piece in filter(None, (piece.strip() for piece in pieces)):
+        pending = f"{pending} {piece}" if pending else piece
+        if len(pending) >= min_chars:
+            units.append(pending)
+            pending = ""
+    if pending:
+        if units:
+            units[-1] += " " + pending
+        else:
+            units.append(pending)
+    return units
+
+
+# Synthesis workers of the current session, created on first use
+_synthesis_pool = None
+
+
+def _get_synthesis_pool() -> ThreadPoolExecutor:
+    global _synthesis_pool
+    if _synthesis_pool is None:
+        _synthesis_pool = ThreadPoolExecutor(max_workers=TTS_CONFIG["synthesis_workers"],
+                                             thread_name_prefix="tts")
+    return _synthesis_pool
+
+
+def _speak_units(units: List[str], lang: str, engine, generation: int,
+                 synthesize_unit: Callable, done: Future) -> None:
+    """
+    Synthesizes units on the worker pool and queues them for playback in order.
+    
+    Runs on its own thread; resolves done to True once every unit has been
+    played, or False if playback was stopped.
+    """
+    pending = [_get_synthesis_pool().submit(synthesize_unit, unit, lang) for unit in units]
+    last = None
+    completed = True
+    try:
+        for future in pending:
+            audio = future.result()
+            if engine.generation != generation:
+                completed = False
+                break
+            if audio is None:
+                continue
+            if isinstance(audio, str):
+                # Encoded audio the engine cannot play; wait for our turn
+                if last is not None and not last.result():
+                    completed = False
+                    break
+                _play_external(audio, generation)
+                last = None
+                if engine.generation != generation:
+                    completed = False
+                    break
+                continue
+            last = engine.play(audio, generation)
+        if completed and last is not None:
+            completed = last.result()
+    except Exception as e:
+        print(f"Error speaking: {e}")
+        completed = False
+    finally:
+        for future in pending:
+            future.cancel()
+        done.set_result(completed)
+
+
+def speak(text: str, lang: str = "en", wait: bool = False) -> Future:
+    """
+    Says a text through the playback engine.
+    
+    The reply is split into sentences or phrases that are synthesized in
+    parallel and played in order as soon as each is ready, so the first
+    words are heard after one short unit has been synthesized rather than
+    the whole reply.
+    
+    Args:
+        text: Text to say
+        lang: Language code for the speech
+        wait: Block until playback has finished
+        
+    Returns:
+        Future resolving to True when played completely or False if stopped
+    """
+    print(f"Converting text to speech: '{text}'")
+    engine = get_playback_engine()
+    done = Future()
+    threading.Thread(target=_speak_units,
+                     args=(split_utterance(text), lang, engine, engine.generation, synthesize, done),
+                     name="speak", daemon=True).start()
+    if wait:
+        done.result()
+    return done
 
 
 def tts(text: str, output_file: str = "temp/tts.wav", lang: str = "en") -> str:
@@ -217,36 +980,163 @@ def tts(text: str, output_file: str = "temp/tts.wav", lang: str = "en") -> str:
     # Create directory if it doesn't exist
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
     
-    if not GTTS_AVAILABLE:
-        print("gTTS not available, creating placeholder file")
-        # Create a simple sine wave as placeholder audio
-        try:
-            sample_rate = AUDIO_CONFIG.get("sample_rate", 16000)
-            duration = min(2 + len(text) * 0.07, 10)  # Rough estimate of speech duration
-            t = np.linspace(0, duration, int(sample_rate * duration), False)
-            note = np.sin(2 * np.pi * 440 * t) * 0.3  # 440 Hz sine wave
-            audio = note * (2**15 - 1) / np.max(np.abs(note))
-            audio = audio.astype(np.int16)
-            
+    audio = synthesize(text, lang)
+    if audio is None:
+        return ""
+    try:
+        if isinstance(audio, str):
+            shutil.copyfile(audio, output_file)
+        else:
             with wave.open(output_file, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)
-                wf.setframerate(sample_rate)
-                wf.writeframes(audio.tobytes())
-        except Exception as e:
-            print(f"Error creating placeholder audio: {e}")
-            # Create empty file if all else fails
-            with open(output_file, 'wb') as f:
-                pass
+                wf.setnchannels(audio.channels)
+                wf.setsampwidth(audio.sample_width)
+                wf.setframerate(audio.sample_rate)
+                wf.writeframes(audio.data)
         return output_file
+    except Exception as e:
+        print(f"Error saving speech: {e}")
+        return ""
+
+
+def benchmark_tts_cache(replies: int = 50, phrases: int = 10) -> Dict[str, float]:
+    """
+    Measures the speech cache on a stream of replies drawn from a few phrases.
+    
+    Args:
+        replies: Number of replies to synthesize
+        phrases: Number of distinct phrases they are drawn from
+        
+    Returns:
+        Dictionary with cache statistics and the mean cost of a miss and a hit
+        in milliseconds
+    """
+    global _tts_cache
+    directory = tempfile.mkdtemp(prefix="tts_cache_")
+    previous, _tts_cache = _tts_cache, TTSCache(directory)
+    rng = np.random.default_rng(0)
+    texts = [f"Reply number {i}, moving the arm" for i in range(phrases)]
     
+    miss_time = hit_time = 0.0
     try:
-        # Create gTTS object
-        tts = gTTS(text=text, lang=lang, slow=False)
+        for index in rng.integers(0, phrases, replies):
+            misses = _tts_cache.misses
+            start = time.perf_counter()
+            synthesize(texts[index])
+            elapsed = time.perf_counter() - start
+            if _tts_cache.misses > misses:
+                miss_time += elapsed
+            else:
+                hit_time += elapsed
+        stats = _tts_cache.stats()
+    finally:
+        _tts_cache = previous
+        shutil.rmtree(directory, ignore_errors=True)
+    
+    hits = stats["memory_hits"] + stats["disk_hits"]
+    return dict(stats,
+                miss_ms=1000 * miss_time / stats["misses"] if stats["misses"] else 0.0,
+                hit_ms=1000 * hit_time / hits if hits else 0.0)
+
+
+def benchmark_audio_path(seconds: float = 3.0, runs: int = 20,
+                         output_file: str = "temp/speech_benchmark.wav") -> Dict[str, float]:
+    """
+    Compares handing a recording to the recognizer through a WAV file and in memory.
+    
+    Args:
+        seconds: Length of the recording
+        runs: Number of repetitions
+        output_file: WAV file used for the file round trip
         
-        # Save to file
-        tts.save(output_file)
-        return output_file
-    except Exception as e:
-        print(f"Error in text-to-speech conversion: {e}")
-        return ""
+    Returns:
+        Dictionary with the mean cost of each path in milliseconds
+    """
+    sample_rate = AUDIO_CONFIG.get("sample_rate", 16000)
+    rng = np.random.default_rng(0)
+    audio = AudioBuffer(bytearray(rng.normal(0, 1000, int(seconds * sample_rate)).astype(np.int16).tobytes()),
+                        sample_rate, 1)
+    
+    start = time.perf_counter()
+    for _ in range(runs):
+        audio.save(output_file)
+        if SR_AVAILABLE:
+            with sr.AudioFile(output_file) as source:
+                sr.Recognizer().record(source)
+        else:
+            # What sr.AudioFile does: parse the WAV and read all frames
+            with wave.open(output_file, "rb") as wf:
+                wf.readframes(wf.getnframes())
+    file_time = (time.perf_counter() - start) / runs
+    os.remove(output_file)
+    
+    start = time.perf_counter()
+    for _ in range(runs):
+        if SR_AVAILABLE:
+            audio.to_audio_data()
+        else:
+            bytes(audio.data)
+    memory_time = (time.perf_counter() - start) / runs
+    
+    return {
+        "seconds": seconds,
+        "file_ms": file_time * 1000,
+        "memory_ms": memory_time * 1000,
+        "saved_ms": (file_time - memory_time) * 1000
+    }
+
+
+def benchmark_streaming_tts(sentences: Tuple[int, ...] = (1, 2, 4, 8), latency: float = 0.2,
+                            per_char: float = 0.004) -> Dict[int, Dict[str, float]]:
+    """
+    Compares time to first audio when a reply is synthesized whole and in units.
+    
+    Synthesis is simulated with a fixed request latency plus a cost per
+    character, similar to an online service.
+    
+    Args:
+        sentences: Reply lengths to measure, in sentences
+        latency: Simulated latency of one synthesis request in seconds
+        per_char: Simulated synthesis time per character in seconds
+        
+    Returns:
+        Dictionary mapping reply length to the time to first audio and to the
+        end of playback of each approach in milliseconds
+    """
+    class TimingSink(BufferSink):
+        def __init__(self):
+            super().__init__()
+            self.first_write = None
+        
+        def write(self, data: bytes, sound: Sound) -> None:
+            if self.first_write is None:
+                self.first_write = time.perf_counter()
+            super().write(data, sound)
+    
+    def slow_synthesize(unit: str, lang: str) -> Sound:
+        time.sleep(latency + per_char * len(unit))
+        return _placeholder_sound(unit)
+    
+    sentence = "The arm is moving the green block onto the basketball now."
+    results = {}
+    for count in sentences:
+        text = " ".join([sentence] * count)
+        row = {}
+        for name, units in (("whole", [text]), ("streamed", split_utterance(text))):
+            engine = PlaybackEngine(TimingSink())
+            done = Future()
+            start = time.perf_counter()
+            _speak_units(units, "en", engine, engine.generation, slow_synthesize, done)
+            row[f"{name}_first_ms"] = (engine.sink.first_write - start) * 1000
+            row[f"{name}_total_ms"] = (time.perf_counter() - start) * 1000
+            engine.shutdown()
+        results[count] = row
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in benchmark_audio_path().items():
+        print(f"{name}: {value:.3f}")
+    for name, value in benchmark_tts_cache().items():
+        print(f"{name}: {value:.3f}")
+    for count, row in benchmark_streaming_tts().items():
+        print(f"{count} sentences: " + ", ".join(f"{name} {value:.0f}" for name, value in row.items()))
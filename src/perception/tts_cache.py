@@ -0,0 +1,216 @@
+"""
+Text-to-Speech Cache Module for Embodied Agent
+
+This module caches synthesized speech so repeated replies are not sent to
+the speech service again. Entries are addressed by a hash of the normalized
+text, the language and the voice settings. Decoded PCM of recently used
+entries is kept in an in-memory LRU; all entries are stored on disk under a
+size cap, evicting the least recently used files first.
+
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+
+# Import system configuration
+from config import TTS_CONFIG
+from perception.playback import Sound, load_wav
+
+# Age after which a temporary file is taken to be left over from a crashed writer (seconds)
+STALE_TEMP_AGE = 3600
+
+
+def cache_key(text: str, lang: str, settings: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Content address of a synthesized phrase.
+
+    Args:
+        text: Text to speak (whitespace and case differences are ignored)
+        lang: Language code
+        settings: Voice settings that change the audio
+
+    Returns:
+        Hex digest identifying the audio
+    """
+    normalized = " ".join(text.split()).lower()
+    payload = json.dumps([normalized, lang, settings or {}], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """
+    Two-level cache of synthesized speech.
+
+    Values are either a decoded Sound, stored on disk as a WAV file, or
+    encoded audio bytes that could not be decoded (stored as an .mp3 file and
+    returned as its path).
+
+    Args:
+        directory: Directory of the on-disk store
+        max_bytes: Size cap of the on-disk store
+        memory_items: Number of decoded sounds kept in memory
+    """
+
+    def __init__(self, directory: str = None, max_bytes: int = None, memory_items: int = None):
+        self.directory = directory or TTS_CONFIG["cache_dir"]
+        self.max_bytes = max_bytes or int(TTS_CONFIG["cache_max_mb"] * 1024 * 1024)
+        self.memory_items = memory_items or TTS_CONFIG["memory_items"]
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, key + extension)
+
+    def get(self, key: str) -> Optional[Union[Sound, str]]:
+        """
+        Look up a phrase.
+
+        Args:
+            key: Key from cache_key
+
+        Returns:
+            The decoded sound, the path of an encoded file, or None on a miss
+        """
+        with self._lock:
+            sound = self._memory.get(key)
+            if sound is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return sound
+
+        for extension in (".wav", ".mp3"):
+            path = self._path(key, extension)
+            if not os.path.exists(path):
+                continue
+            try:
+                # Touch the file so eviction sees it as recently used
+                os.utime(path)
+                value = load_wav(path) if extension == ".wav" else path
+            except (OSError, EOFError, ValueError) as e:
+                print(f"Error reading cached speech {path}: {e}")
+                continue
+            with self._lock:
+                self.disk_hits += 1
+                if isinstance(value, Sound):
+                    self._remember(key, value)
+            return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, sound: Optional[Sound] = None,
+            encoded: Optional[bytes] = None) -> Optional[Union[Sound, str]]:
+        """
+        Store a synthesized phrase.
+
+        Args:
+            key: Key from cache_key
+            sound: Decoded audio
+            encoded: Encoded audio, stored if there is no decoded audio
+
+        Returns:
+            The cached value as get() would return it
+        """
+        if sound is not None:
+            path = self._path(key, ".wav")
+            _write_atomic(path, lambda f: _write_sound(f, sound))
+            with self._lock:
+                self._remember(key, sound)
+            value = sound
+        elif encoded is not None:
+            path = self._path(key, ".mp3")
+            _write_atomic(path, lambda f: f.write(encoded))
+            value = path
+        else:
+            return None
+        self._evict()
+        return value
+
+    def _remember(self, key: str, sound: Sound) -> None:
+        # Called with the lock held
+        self._memory[key] = sound
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tmp"):
+                _remove_stale(path)
+            elif name.endswith((".wav", ".mp3")):
+                try:
+                    status = os.stat(path)
+                except OSError:
+                    continue    # Evicted by another thread meanwhile
+                entries.append((status.st_mtime, status.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Summarize cache effectiveness.
+
+        Returns:
+            Dictionary with memory hits, disk hits, misses and the hit rate
+        """
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+        }
+
+
+def _write_sound(f, sound: Sound) -> None:
+    import wave
+    with wave.open(f, "wb") as wf:
+        wf.setnchannels(sound.channels)
+        wf.setsampwidth(sound.sample_width)
+        wf.setframerate(sound.sample_rate)
+        wf.writeframes(sound.data)
+
+
+def _write_atomic(path: str, write) -> None:
+    # Write next to the target and rename, so readers never see a partial file
+    f = tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or ".", prefix=".",
+                                    suffix=".tmp", delete=False)
+    try:
+        with f:
+            write(f)
+        os.replace(f.name, path)
+    except BaseException:
+        try:
+            os.remove(f.name)
+        except OSError:
+            pass
+        raise
+
+
+def _remove_stale(path: str) -> None:
+    try:
+        if time.time() - os.stat(path).st_mtime > STALE_TEMP_AGE:
+            os.remove(path)
+    except OSError:
+        pass    # Renamed or removed by its writer meanwhile
@@ -0,0 +1,22 @@
+"""
+Test configuration for Embodied Agent
+
+The modules import each other as top-level packages from src/ and read
+config.py from the repository root; tests always drive the simulated arm,
+on the wall clock so a running motion can be preempted from another thread.
+
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+os.environ["ROBOT_BACKEND"] = "sim"
+
+import config  # noqa: E402
+
+config.ROBOT_CONFIG["sim_realtime"] = True
@@ -0,0 +1,41 @@
+from agent.agent_coordinator import parse_visual_instruction, parse_visual_instructions
+from models.llm_interface import _vision_fallback
+
+SCENE = {"start": "red block", "start_xyxy": [[100, 120], [140, 160]],
+         "end": "plate", "end_xyxy": [[400, 300], [480, 380]]}
+
+
+def test_located_objects_map_to_robot_coordinates():
+    plan = parse_visual_instruction("put the red block on the plate", SCENE)
+    assert plan["start_coords"] == [120, 140] and plan["end_coords"] == [440, 340]
+    assert plan["source"] is not None and plan["target"] is not None
+    assert plan["source"] != plan["target"]
+
+
+def test_failed_vision_call_locates_nothing():
+    plan = parse_visual_instruction("put the red block on the plate", _vision_fallback(0))
+    assert plan["source"] is None and plan["target"] is None
+
+
+def test_unusable_boxes_are_rejected():
+    cases = [
+        dict(SCENE, start="unknown"),
+        dict(SCENE, end_xyxy=SCENE["start_xyxy"]),
+        dict(SCENE, start_xyxy=[[100, 120], [100, 160]]),
+        dict(SCENE, end_xyxy=[[400, 300]]),
+        dict(SCENE, end_xyxy="somewhere"),
+        "I cannot identify the objects in the image due to an error.",
+    ]
+    for coordinates in cases:
+        plan = parse_visual_instruction("move it", coordinates)
+        assert plan["source"] is None and plan["target"] is None, coordinates
+
+
+def test_batch_parsing_skips_unlocated_moves():
+    fallback_move = _vision_fallback(0)
+    detections = {"moves": [SCENE, fallback_move, dict(SCENE, start="green block",
+                                                      start_xyxy=[[200, 100], [230, 140]])]}
+    tasks = parse_visual_instructions("put the blocks on the plate", detections)
+    assert [t["start_object"] for t in tasks] == ["red block", "green block"]
+    assert parse_visual_instructions("move", _vision_fallback(2)) == []
+    assert parse_visual_instructions("move", {"moves": [fallback_move]}) == []
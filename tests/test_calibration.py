@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from perception.calibration import CameraCalibration, fit_homography
+
+
+def _project(H, points):
+    h = np.column_stack([points, np.ones(len(points))]) @ H.T
+    return h[:, :2] / h[:, 2:]
+
+
+def test_fit_recovers_a_known_homography():
+    H = np.array([[0.02, -0.25, 330.0],
+                  [-0.24, 0.01, 120.0],
+                  [1e-5, -2e-5, 1.0]])
+    pixels = np.array([[40, 30], [600, 40], [620, 450], [30, 460], [320, 240], [150, 380]], float)
+    world = _project(H, pixels)
+    fitted = fit_homography(pixels, world)
+    np.testing.assert_allclose(fitted, H, rtol=1e-6, atol=1e-9)
+
+
+def test_raised_points_are_pulled_toward_the_camera():
+    calibration = CameraCalibration(np.eye(3), [0.0, 0.0, 400.0], 0.0)
+    xy = calibration.pixels_to_robot([[200.0, 100.0]], heights=200.0)
+    np.testing.assert_allclose(xy, [[100.0, 50.0]])
+
+
+def test_too_few_correspondences_are_rejected():
+    with pytest.raises(ValueError):
+        fit_homography([[0, 0], [1, 0], [0, 1]], [[0, 0], [1, 0], [0, 1]])
@@ -0,0 +1,40 @@
+import numpy as np
+
+from action.demonstration import DemonstrationRecorder
+from action.simulator import SimClock, SimulatedMyCobot
+from action.trajectory_store import read_trajectory
+
+
+def _moving_arm():
+    arm = SimulatedMyCobot(SimClock())
+    arm.send_angles([60, 0, 0, 0, 0, 0], 50)
+    return arm, arm._joint_motion.duration
+
+
+def test_samples_are_timed_on_the_robot_clock():
+    arm, duration = _moving_arm()
+    recorder = DemonstrationRecorder(arm, rate=20, max_duration=2.0)
+    recorder.start()
+    recorder._thread.join(5.0)
+    recorder.stop()
+
+    times, angles = recorder.samples()
+    np.testing.assert_allclose(times, np.arange(len(times)) / 20.0)
+    assert len(times) == 41
+    # The recording shows the joint arriving when the simulated move ends
+    arrived = times[np.argmax(angles[:, 0] >= 59.99)]
+    assert duration <= arrived < duration + 1 / 20.0
+    assert np.all(np.diff(angles[:, 0]) >= -1e-3)
+
+
+def test_recording_streams_to_a_trajectory_file(tmp_path):
+    arm, _ = _moving_arm()
+    path = str(tmp_path / "demo.traj")
+    recorder = DemonstrationRecorder(arm, rate=20, max_duration=1.0, path=path, chunk=8)
+    recorder.start()
+    recorder._thread.join(5.0)
+    count = recorder.stop()
+
+    trajectory = read_trajectory(path)
+    assert count == len(trajectory.times) == 21
+    assert trajectory.rate == 20
@@ -0,0 +1,49 @@
+import time
+
+from perception.playback import BufferSink, PlaybackEngine, Sound
+
+
+def _tone(seconds, rate=16000):
+    return Sound(b"\1\0" * int(seconds * rate), rate, 1, 2)
+
+
+def test_sounds_play_in_order():
+    sink = BufferSink()
+    engine = PlaybackEngine(sink, chunk_size=256)
+    first = engine.play(Sound(b"\1\0" * 300, 16000, 1, 2))
+    second = engine.play(Sound(b"\2\0" * 200, 16000, 1, 2))
+    assert first.result(1) and second.result(1)
+    assert bytes(sink.buffer) == b"\1\0" * 300 + b"\2\0" * 200
+    assert not engine.busy()
+    engine.shutdown()
+
+
+def test_stop_cuts_off_and_drops_queued_sounds():
+    engine = PlaybackEngine(BufferSink(realtime=True), chunk_size=256)
+    playing = engine.play(_tone(2.0))
+    queued = engine.play(_tone(2.0))
+    time.sleep(0.1)
+    assert engine.busy()
+
+    start = time.monotonic()
+    engine.stop()
+    assert playing.result(1) is False
+    assert queued.result(1) is False
+    # Preempted within a chunk (16 ms at 16 kHz)
+    assert time.monotonic() - start < 0.2
+    time.sleep(0.05)
+    assert not engine.busy()
+    engine.shutdown()
+
+
+def test_sounds_of_an_older_generation_are_dropped():
+    sink = BufferSink()
+    engine = PlaybackEngine(sink)
+    generation = engine.generation
+    engine.stop()
+    assert engine.generation == generation + 1
+
+    assert engine.play(_tone(0.1), generation).result(1) is False
+    assert engine.play(_tone(0.1)).result(1) is True
+    assert len(sink.buffer) == len(_tone(0.1).data)
+    engine.shutdown()
@@ -0,0 +1,47 @@
+import threading
+import time
+
+import pytest
+
+import action.robot_control as robot_control
+from action.execution import MotionCancelled
+
+
+@pytest.fixture
+def arm():
+    if robot_control.robot is None:
+        pytest.skip("simulated arm not available")
+    robot_control.resume_motion()
+    yield robot_control.robot
+    robot_control.resume_motion()
+
+
+def test_preempt_stops_a_running_gesture(arm):
+    outcome = {}
+
+    def run():
+        try:
+            robot_control.head_dance()
+            outcome["result"] = "finished"
+        except MotionCancelled as e:
+            outcome["result"] = str(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    time.sleep(0.5)
+    latencies = robot_control.preempt_motion("new instruction")
+    thread.join(5.0)
+
+    assert not thread.is_alive()
+    assert outcome["result"] == "new instruction"
+    assert latencies["abort_latency"] is not None
+    assert latencies["safe_state_latency"] < 0.5
+
+
+def test_motion_is_refused_until_resumed(arm):
+    robot_control.preempt_motion("stop")
+    with pytest.raises(MotionCancelled):
+        arm.send_angles([0] * 6, 20)
+
+    robot_control.resume_motion()
+    arm.send_angles([0] * 6, 20)
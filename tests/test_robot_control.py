@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+import action.robot_control as robot_control
+
+
+@pytest.fixture
+def arm():
+    if robot_control.robot is None:
+        pytest.skip("simulated arm not available")
+    robot_control.resume_motion()
+    robot_control.robot.send_angles([0] * 6, 100)
+    robot_control.robot.wait_until_idle()
+    return robot_control.robot
+
+
+@pytest.mark.parametrize("joint", [1, 4, 6])
+def test_rotate_joint_moves_the_named_joint(arm, joint):
+    robot_control.rotate_joint(joint, 20)
+    expected = np.zeros(6)
+    expected[joint - 1] = 20
+    np.testing.assert_allclose(arm.get_angles(), expected, atol=0.5)
+
+
+@pytest.fixture(scope="module")
+def small_table(tmp_path_factory):
+    from action.ik_table import build_ik_table, load_ik_table
+    path = str(tmp_path_factory.mktemp("ik") / "ik_table.npy")
+    build_ik_table(heights=[70, 90], step=20, path=path)
+    return load_ik_table(path)
+
+
+def test_streamed_move_starts_from_the_current_joints(arm, small_table, monkeypatch):
+    monkeypatch.setattr(robot_control, "get_ik_table", lambda: small_table)
+    start, ok = small_table.lookup(np.array([[200.0, 0.0, 90.0]]))
+    assert ok.all()
+    arm.send_angles(start[0].tolist(), 100)
+    arm.wait_until_idle()
+
+    assert robot_control._stream_path([200.0, 0.0, 90.0], [[200.0, 40.0, 90.0]])
+    np.testing.assert_allclose(arm.get_coords()[:3], [200, 40, 90], atol=2.0)
+
+
+def test_streaming_refuses_a_different_ik_branch(arm, small_table, monkeypatch):
+    monkeypatch.setattr(robot_control, "get_ik_table", lambda: small_table)
+    start, _ = small_table.lookup(np.array([[200.0, 0.0, 90.0]]))
+    other = start[0].copy()
+    other[5] += 90
+    arm.send_angles(other.tolist(), 100)
+    arm.wait_until_idle()
+
+    assert not robot_control._stream_path([200.0, 0.0, 90.0], [[200.0, 40.0, 90.0]])
+    np.testing.assert_allclose(arm.get_angles(), other, atol=0.1)
@@ -0,0 +1,39 @@
+import itertools
+
+import numpy as np
+
+from action.sequencing import order_tasks, tour_length
+
+
+def test_order_is_a_permutation():
+    rng = np.random.default_rng(0)
+    picks = rng.uniform(-200, 200, (12, 2))
+    places = rng.uniform(-200, 200, (12, 2))
+    order = order_tasks(picks, places, start=[200, 0])
+    assert sorted(order) == list(range(12))
+
+
+def test_small_instances_are_optimal():
+    rng = np.random.default_rng(1)
+    for _ in range(5):
+        picks = rng.uniform(-200, 200, (6, 2))
+        places = rng.uniform(-200, 200, (6, 2))
+        start = [200, 0]
+        best = min(tour_length(p, picks, places, start) for p in itertools.permutations(range(6)))
+        found = tour_length(order_tasks(picks, places, start), picks, places, start)
+        # 2-opt is a local search; it stays close to the optimum on tiny instances
+        assert found <= best * 1.1 + 1e-6
+
+
+def test_improvement_never_lengthens_the_greedy_tour():
+    rng = np.random.default_rng(2)
+    picks = rng.uniform(-200, 200, (20, 3))
+    places = rng.uniform(-200, 200, (20, 3))
+    greedy = order_tasks(picks, places, improve=False)
+    improved = order_tasks(picks, places)
+    assert tour_length(improved, picks, places) <= tour_length(greedy, picks, places) + 1e-9
+
+
+def test_trivial_inputs():
+    assert order_tasks(np.empty((0, 2)), np.empty((0, 2))) == []
+    assert order_tasks([[0, 0]], [[1, 1]]) == [0]
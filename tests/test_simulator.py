@@ -0,0 +1,30 @@
+import numpy as np
+
+from action.simulator import SimClock, SimulatedMyCobot
+
+
+def test_send_angle_uses_one_based_joint_ids():
+    arm = SimulatedMyCobot(SimClock())
+    arm.send_angles([0] * 6, 100)
+    arm.wait_until_idle()
+    arm.send_angle(1, 30, 100)
+    arm.wait_until_idle()
+    np.testing.assert_allclose(arm.get_angles(), [30, 0, 0, 0, 0, 0], atol=0.1)
+
+    # Out-of-range ids are ignored like on the arm
+    arm.send_angle(0, 45, 100)
+    arm.wait_until_idle()
+    np.testing.assert_allclose(arm.get_angles(), [30, 0, 0, 0, 0, 0], atol=0.1)
+
+
+def test_coordinate_moves_follow_the_configured_linear_speed():
+    arm = SimulatedMyCobot(SimClock())
+    arm.send_angles([0, -30, -60, 0, 0, 0], 100)
+    arm.wait_until_idle()
+    start = np.array(arm.get_coords())
+    target = start.copy()
+    target[1] += 100
+    arm.send_coords(target.tolist(), 50)
+    duration = arm.wait_until_idle()
+    # 100 mm at half of the 200 mm/s full-speed setting
+    assert abs(duration - 1.0) < 0.3
@@ -0,0 +1,78 @@
+import numpy as np
+
+from perception.speech import Endpointer, FrameMeter, ScriptedBackend
+
+RATE = 16000
+CHUNK = 1024
+
+
+def _audio(*parts):
+    # parts: (seconds, amplitude) pairs of a 300 Hz tone (silence for amplitude 0)
+    pieces = []
+    for seconds, amplitude in parts:
+        t = np.arange(int(seconds * RATE)) / RATE
+        pieces.append((np.sin(2 * np.pi * 300 * t) * amplitude).astype(np.int16))
+    return np.concatenate(pieces).tobytes()
+
+
+def _chunks(audio):
+    step = CHUNK * 2
+    return [audio[i:i + step] for i in range(0, len(audio), step)]
+
+
+def _endpointer(**kwargs):
+    options = dict(sample_rate=RATE, channels=1, threshold=700, pre_roll=0.3,
+                   trailing_silence=0.8, speech_timeout=5.0)
+    options.update(kwargs)
+    return Endpointer(**options)
+
+
+def test_utterance_ends_after_trailing_silence():
+    endpointer = _endpointer()
+    audio = _audio((1.0, 0), (1.5, 8000), (3.0, 0))
+    ended_at = None
+    for index, chunk in enumerate(_chunks(audio)):
+        if endpointer.feed(chunk):
+            ended_at = (index + 1) * CHUNK / RATE
+            break
+    assert endpointer.started and not endpointer.timed_out
+    # Speech stops at 2.5 s; the end is detected 0.8 s later, within a chunk
+    assert 3.3 <= ended_at <= 3.3 + 2 * CHUNK / RATE
+
+
+def test_pre_roll_is_kept():
+    captured = []
+    endpointer = _endpointer(on_audio=captured.append)
+    fed = 0
+    for chunk in _chunks(_audio((1.0, 0), (0.5, 8000), (1.0, 0))):
+        fed += len(chunk)
+        if endpointer.feed(chunk):
+            break
+    assert bytes(endpointer.audio()) == b"".join(captured)
+    # The kept audio ends with the last chunk fed and reaches back into the
+    # silence before the onset at 1.0 s by about the pre-roll
+    first_kept = (fed - len(endpointer.audio())) // 2
+    assert first_kept <= RATE * 1.0 - (0.3 * RATE - CHUNK)
+    assert first_kept >= RATE * 1.0 - (0.3 * RATE + 2 * CHUNK)
+
+
+def test_silence_times_out():
+    endpointer = _endpointer(speech_timeout=1.0)
+    results = [endpointer.feed(chunk) for chunk in _chunks(_audio((2.0, 0)))]
+    assert endpointer.timed_out and not endpointer.started
+    assert len(endpointer.audio()) == 0
+    assert results.index(True) == int(np.ceil(1.0 * RATE / CHUNK)) - 1
+
+
+def test_frame_meter_carries_the_remainder():
+    meter = FrameMeter(320)
+    frames = sum(len(meter.feed(chunk)) for chunk in _chunks(_audio((2.0, 0))))
+    assert frames == 2 * RATE // 320
+
+
+def test_scripted_backend_counts_all_speech():
+    backend = ScriptedBackend("one two three four five", words_per_second=2.5)
+    backend.start(RATE, 1)
+    partials = [backend.accept(chunk) for chunk in _chunks(_audio((2.0, 8000)))]
+    assert abs(backend.speech - 2.0) < 1e-9
+    assert [p for p in partials if p][-1] == "one two three four five"
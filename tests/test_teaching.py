@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+import pytest
+
+import action.teaching as teaching
+from action.teaching_library import TeachingLibrary
+from action.trajectory_store import PART_SUFFIX, TrajectoryWriter, write_trajectory
+
+
+@pytest.fixture
+def teaching_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(teaching, "TEACHING_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(teaching, "library", TeachingLibrary(str(tmp_path), describe=teaching._describe_file))
+    return tmp_path
+
+
+def test_recovery_saves_an_interrupted_recording(teaching_dir):
+    times = np.arange(60) / 30.0
+    angles = np.column_stack([np.sin(times) * 30] * 6)
+    writer = TrajectoryWriter(teaching._raw_path(7), rate=30.0, sync_interval=0.0)
+    writer.append(times, angles)
+    writer._file.close()    # Crash before close()
+
+    assert teaching.recover_teachings() == 1
+    assert os.path.exists(teaching_dir / "teaching_7.traj")
+    assert [entry["id"] for entry in teaching.library.entries()] == [7]
+
+
+def test_recovery_discards_empty_recordings(teaching_dir):
+    write_trajectory(teaching._raw_path(8), np.zeros(0), np.zeros((0, 6)), rate=30.0)
+    TrajectoryWriter(teaching._raw_path(9), rate=30.0)._file.close()
+
+    assert teaching.recover_teachings() == 0
+    assert sorted(os.listdir(teaching_dir)) == []
+    # Nothing is left to fail on in the next session
+    assert teaching.recover_teachings() == 0
+
+
+def test_empty_recordings_are_not_saved(teaching_dir):
+    with pytest.raises(ValueError):
+        teaching._save_recording(10, np.zeros(0), np.zeros((0, 6)), 30.0)
+    assert not (teaching_dir / "teaching_10.traj").exists()
@@ -0,0 +1,45 @@
+import numpy as np
+
+from action.motion_primitives import interpolate_cubic
+from action.trajectory_compression import simplify_trajectory
+
+
+def _demonstration(seconds=10.0, rate=30.0, seed=0):
+    rng = np.random.default_rng(seed)
+    times = np.arange(int(seconds * rate)) / rate
+    # Smooth motion with sensor noise well inside the tolerance
+    angles = np.column_stack([40 * np.sin(0.5 * times * (joint + 1)) for joint in range(6)])
+    return times, angles + rng.normal(0, 0.05, angles.shape)
+
+
+def test_replay_stays_within_the_tolerance():
+    times, angles = _demonstration()
+    tolerance = np.array([0.5, 0.5, 0.5, 1.0, 1.0, 1.0])
+    kept_times, kept_angles, stats = simplify_trajectory(times, angles, tolerance)
+
+    replayed = interpolate_cubic(kept_times, kept_angles, times)
+    assert np.all(np.abs(replayed - angles).max(axis=0) <= tolerance + 1e-9)
+    np.testing.assert_allclose(stats["max_error"], np.abs(replayed - angles).max(axis=0))
+    assert stats["kept"] < stats["samples"] / 3
+
+
+def test_tighter_tolerance_keeps_more_samples():
+    times, angles = _demonstration()
+    _, loose, _ = simplify_trajectory(times, angles, 2.0)
+    _, tight, _ = simplify_trajectory(times, angles, 0.2)
+    assert len(tight) > len(loose)
+
+
+def test_endpoints_are_kept_and_duplicates_dropped():
+    times = np.array([0.0, 0.0, 0.5, 1.0])
+    angles = np.array([[0] * 6, [0] * 6, [5] * 6, [10] * 6], dtype=float)
+    kept_times, kept_angles, stats = simplify_trajectory(times, angles, 0.5)
+    assert stats["samples"] == 3
+    assert kept_times[0] == 0.0 and kept_times[-1] == 1.0
+    np.testing.assert_array_equal(kept_angles[-1], angles[-1])
+
+
+def test_empty_recording():
+    kept_times, kept_angles, stats = simplify_trajectory(np.zeros(0), np.zeros((0, 6)))
+    assert len(kept_times) == 0 and kept_angles.shape == (0, 6)
+    assert stats["samples"] == stats["kept"] == 0
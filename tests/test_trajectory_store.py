@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from action.trajectory_store import (PART_SUFFIX, SAMPLE_DTYPE, TrajectoryWriter,
+                                     read_trajectory, recover_trajectory, write_trajectory)
+
+
+def _samples(count):
+    times = np.arange(count) / 30.0
+    angles = np.column_stack([np.sin(times + joint) * 90 for joint in range(6)])
+    return times, angles
+
+
+def test_write_read_round_trip(tmp_path):
+    times, angles = _samples(100)
+    path = write_trajectory(str(tmp_path / "a.traj"), times, angles, rate=30.0, created=123.0)
+    trajectory = read_trajectory(path)
+    np.testing.assert_array_equal(trajectory.times, times)
+    np.testing.assert_allclose(trajectory.angles, angles, atol=1e-4)
+    assert trajectory.rate == 30.0
+    assert trajectory.created == 123.0
+
+
+def test_writer_appends_in_chunks(tmp_path):
+    times, angles = _samples(70)
+    writer = TrajectoryWriter(str(tmp_path / "b.traj"), rate=30.0, sync_interval=0.0)
+    for start in range(0, 70, 32):
+        writer.append(times[start:start + 32], angles[start:start + 32])
+    trajectory = read_trajectory(writer.close())
+    assert len(trajectory.times) == 70
+    np.testing.assert_allclose(trajectory.angles, angles, atol=1e-4)
+    assert not (tmp_path / ("b.traj" + PART_SUFFIX)).exists()
+
+
+def test_recover_cuts_off_a_partial_record(tmp_path):
+    times, angles = _samples(40)
+    writer = TrajectoryWriter(str(tmp_path / "c.traj"), rate=30.0, sync_interval=0.0)
+    writer.append(times, angles)
+    # Simulate a crash in the middle of writing the next record
+    writer._file.write(b"\0" * (SAMPLE_DTYPE.itemsize // 2))
+    writer._file.close()
+
+    path = recover_trajectory(writer.part_path)
+    trajectory = read_trajectory(path)
+    assert len(trajectory.times) == 40
+    np.testing.assert_array_equal(trajectory.times, times)
+
+
+def test_recover_rejects_other_files(tmp_path):
+    part = tmp_path / ("d.traj" + PART_SUFFIX)
+    part.write_bytes(b"not a trajectory" * 8)
+    with pytest.raises(ValueError):
+        recover_trajectory(str(part))
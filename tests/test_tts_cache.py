@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from perception.playback import Sound
+from perception.tts_cache import TTSCache, _write_atomic, cache_key
+
+
+def _sound(fill, frames=1000):
+    return Sound(bytes([fill, 0]) * frames, 16000, 1, 2)
+
+
+def test_keys_ignore_case_and_whitespace():
+    assert cache_key("Hello  world", "en") == cache_key("hello world ", "en")
+    assert cache_key("hello world", "en") != cache_key("hello world", "de")
+    assert cache_key("hello", "en", {"slow": True}) != cache_key("hello", "en")
+
+
+def test_memory_lru_and_disk_fallback(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=10 ** 6, memory_items=2)
+    for name, fill in (("a", 1), ("b", 2), ("c", 3)):
+        cache.put(name, sound=_sound(fill))
+
+    # "a" fell out of memory but is still on disk
+    assert cache.get("c") == _sound(3)
+    assert cache.get("a") == _sound(1)
+    assert (cache.memory_hits, cache.disk_hits) == (1, 1)
+    # Reading "a" from disk made it recent again, so "b" is now the oldest in memory
+    assert cache.get("a") is not None and cache.memory_hits == 2
+    assert cache.get("missing") is None and cache.misses == 1
+
+
+def test_disk_store_evicts_least_recently_used(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=10 ** 6, memory_items=1)
+    cache.put("a", sound=_sound(0))
+    cache.max_bytes = int(os.path.getsize(tmp_path / "a.wav") * 2.5)
+    for index, name in enumerate(("a", "b", "c")):
+        cache.put(name, sound=_sound(index))
+        # Distinct modification times regardless of filesystem resolution
+        os.utime(tmp_path / f"{name}.wav", (index, index))
+    cache.put("d", sound=_sound(9))
+
+    assert sorted(os.listdir(tmp_path)) == ["c.wav", "d.wav"]
+
+
+def test_encoded_audio_is_returned_as_a_path(tmp_path):
+    cache = TTSCache(str(tmp_path))
+    path = cache.put("k", encoded=b"ID3 mp3 data")
+    assert path.endswith(".mp3") and cache.get("k") == path
+
+
+def test_failed_write_leaves_no_temporary_file(tmp_path):
+    def fail(f):
+        f.write(b"partial")
+        raise RuntimeError("disk full")
+
+    with pytest.raises(RuntimeError):
+        _write_atomic(str(tmp_path / "k.wav"), fail)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,49 @@
+import pytest
+
+from config import CAMERA_CONFIG, ROBOT_CONFIG, WORKSPACE_CONFIG
+from action.workspace import OccupancyGrid
+
+FLOOR = CAMERA_CONFIG["table_height"] + WORKSPACE_CONFIG["clutter_height"] + WORKSPACE_CONFIG["clearance"]
+
+
+def test_unmapped_workspace_uses_the_safe_height():
+    grid = OccupancyGrid()
+    assert grid.transit_height([100, -100], [100, 100]) == ROBOT_CONFIG["safe_height"]
+
+
+def test_low_objects_stay_under_the_clutter_floor():
+    grid = OccupancyGrid()
+    grid.add_box([100, 0], [40, 40], CAMERA_CONFIG["object_height"])
+    grid.mark_mapped()
+    assert grid.transit_height([100, -100], [100, 100]) == pytest.approx(FLOOR)
+
+
+def test_mapped_obstacle_raises_the_path():
+    grid = OccupancyGrid()
+    grid.add_box([100, 0], [40, 40], 100)
+    grid.mark_mapped()
+
+    over = grid.transit_height([100, -100], [100, 100])
+    assert over == pytest.approx(CAMERA_CONFIG["table_height"] + 100 + WORKSPACE_CONFIG["clearance"])
+    assert over > FLOOR
+    # A path that passes well clear of the obstacle stays at the floor
+    assert grid.transit_height([-100, -100], [-100, 100]) == pytest.approx(FLOOR)
+    # A carried object adds its own height
+    assert grid.transit_height([100, -100], [100, 100], payload_height=20) == pytest.approx(over + 20)
+
+
+def test_stacked_object_raises_the_path():
+    grid = OccupancyGrid()
+    height = CAMERA_CONFIG["object_height"]
+    grid.add_box([100, 0], [40, 40], height)
+    grid.add_box([100, 0], [40, 40], height, base=CAMERA_CONFIG["table_height"] + height * 2)
+    grid.mark_mapped()
+    assert grid.transit_height([100, -100], [100, 100]) > FLOOR
+
+
+def test_removed_obstacle_no_longer_raises_the_path():
+    grid = OccupancyGrid()
+    grid.add_box([100, 0], [40, 40], 100)
+    grid.remove_box([100, 0], [40, 40], 100)
+    grid.mark_mapped()
+    assert grid.transit_height([100, -100], [100, 100]) == pytest.approx(FLOOR)